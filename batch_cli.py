@@ -0,0 +1,165 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import file_handler
+import history_store
+import knowledge_base
+from bitset_engine import compile_rules
+
+# Basis aturan terkompilasi per proses worker, diisi oleh _init_worker
+_worker_state = None
+
+
+def _init_worker(kb_file, with_history, node_counter=None):
+    global _worker_state
+    if node_counter is not None:
+        file_handler.assign_worker_node(node_counter)
+    kb = knowledge_base.load_knowledge_base(kb_file, headless=True)
+    if kb is None:
+        raise SystemExit(1)
+    _worker_state = (compile_rules(kb.gejala_list, kb.rules, kb.solusi), {g["id"]: g["nama"] for g in kb.gejala_list}, with_history)
+
+
+def parse_record(line):
+    """Membaca satu baris JSONL: daftar id gejala atau objek {"id": ..., "gejala": [...]}."""
+    return parse_patient(json.loads(line))
+
+
+def parse_patient(record):
+    """Memeriksa satu data pasien yang sudah di-decode dan mengembalikan (id, daftar id gejala)."""
+    record_id, gejala = None, record
+    if isinstance(record, dict):
+        record_id, gejala = record.get("id"), record.get("gejala")
+    if not isinstance(gejala, list) or not all(isinstance(gid, str) for gid in gejala):
+        raise ValueError("baris harus berupa daftar id gejala atau objek dengan kunci 'gejala'")
+    return record_id, gejala
+
+
+def result_fields(result):
+    """Field keluaran untuk satu DiagnosisResult."""
+    return {
+        "diagnosis": result.diagnosis_str,
+        "tingkat_keyakinan": result.max_confidence,
+        "kesimpulan": result.conclusions,
+        "rekomendasi": result.recommendations,
+    }
+
+
+def diagnose_chunk(chunk):
+    """Mendiagnosis satu potongan (nomor_baris, teks) dan mengembalikan baris hasil serta entri riwayat."""
+    rule_base, nama_gejala, with_history = _worker_state
+    outputs = [None] * len(chunk)
+    parsed = []
+    for pos, (line_no, line) in enumerate(chunk):
+        try:
+            record_id, gejala = parse_record(line)
+        except ValueError as e:
+            outputs[pos] = {"baris": line_no, "error": str(e)}
+            continue
+        parsed.append((pos, line_no, record_id, set(gejala)))
+
+    results = rule_base.diagnose_batch(rule_base.encode_rows([gejala for _, _, _, gejala in parsed]))
+    # Pasien dengan pola gejala sama berbagi objek hasil, jadi field turunannya cukup dibuat sekali
+    fields_by_result = {}
+    entries = []
+    tanggal = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for (pos, line_no, record_id, gejala), result in zip(parsed, results):
+        fields = fields_by_result.get(id(result))
+        if fields is None:
+            fields = fields_by_result[id(result)] = result_fields(result)
+        output = {"baris": line_no}
+        if record_id is not None:
+            output["id"] = record_id
+        output.update(fields)
+        unknown = sorted(g for g in gejala if g not in nama_gejala)
+        if unknown:
+            output["gejala_tidak_dikenal"] = unknown
+        outputs[pos] = output
+        if with_history:
+            entries.append(file_handler.create_history_entry(
+                [nama_gejala[gid] for gid in rule_base.gejala_ids if gid in gejala], result, tanggal
+            ))
+    return [json.dumps(output, ensure_ascii=False) for output in outputs], entries
+
+
+def _read_chunks(stream, chunk_size):
+    numbered = ((line_no, line) for line_no, line in enumerate(stream, 1) if line.strip())
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered_results(chunks, kb_file, workers, with_history):
+    """Menghasilkan hasil per potongan sesuai urutan input dengan jumlah tugas tertunda yang dibatasi."""
+    if workers <= 1:
+        _init_worker(kb_file, with_history)
+        yield from map(diagnose_chunk, chunks)
+        return
+    # Nomor node id entri riwayat yang berbeda untuk setiap worker (lihat file_handler.new_entry_id)
+    node_counter = multiprocessing.Value('i', file_handler.entry_node())
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(kb_file, with_history, node_counter)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(diagnose_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_batch(input_stream, output_stream, kb_file, workers=1, chunk_size=1000, riwayat_file=None):
+    """Mendiagnosis aliran JSONL dan menulis satu baris hasil per baris input."""
+    store = history_store.open_history_store(riwayat_file) if riwayat_file else None
+    total = 0
+    try:
+        chunks = _read_chunks(input_stream, chunk_size)
+        for lines, entries in _ordered_results(chunks, kb_file, workers, store is not None):
+            output_stream.write("\n".join(lines) + "\n")
+            total += len(lines)
+            if entries:
+                store.append_many(entries)
+        output_stream.flush()
+    finally:
+        if store is not None:
+            store.close()
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diagnosis massal tanpa GUI (JSONL masuk, JSONL keluar).")
+    parser.add_argument("input", nargs="?", default="-", help="file JSONL input (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="file JSONL output (default: stdout)")
+    parser.add_argument("--kb", default="gejala_penyakit.json", help="file basis pengetahuan")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="jumlah proses worker")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="jumlah baris per tugas worker")
+    parser.add_argument("--simpan-riwayat", metavar="FILE", help="tambahkan hasil ke store riwayat ini (.jsonl, .db, atau .json)")
+    args = parser.parse_args(argv)
+
+    # Mengompilasi (dan menyimpan ke cache) sekali sebelum worker dimulai
+    if knowledge_base.load_knowledge_base(args.kb, headless=True) is None:
+        return 1
+
+    input_stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        total = run_batch(input_stream, output_stream, args.kb, args.workers, args.chunk_size, args.simpan_riwayat)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+    print(f"✓ {total} baris diproses", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+VERSI_BASELINE = 1
+# Selisih relatif yang masih dianggap derau pengukuran
+TOLERANSI_REGRESI = 0.20
+# Selisih latensi di bawah ini (ms) tidak dilaporkan sebagai regresi
+SELISIH_MINIMUM_MS = 0.01
+KATEGORI_GEJALA = ("Gejala Umum", "Gejala Pernapasan", "Gejala Lainnya")
+NAMA_BENCHMARK = (
+    "inferensi", "riwayat_simpan", "riwayat_muat", "riwayat_jsonl_tambah", "riwayat_jsonl_muat",
+    "indeks_riwayat", "filter_riwayat", "ekspor_csv", "ekspor_parquet", "ekspor_pdf",
+)
+# Benchmark yang memerlukan pustaka opsional; dilewati bila pustakanya tidak terpasang
+DEPENDENSI_OPSIONAL = {"ekspor_parquet": "pyarrow", "ekspor_pdf": "reportlab"}
+
+
+def generate_knowledge_base(n_gejala=200, n_aturan=2000, kedalaman=3, seed=0):
+    """
+    Membuat basis pengetahuan sintetis dengan skema gejala/aturan/solusi.
+
+    Aturan disusun berlapis: lapis pertama hanya memakai gejala, setiap lapis
+    berikutnya memakai minimal satu kesimpulan lapis sebelumnya, sehingga
+    rantai penalaran terpanjang sepanjang `kedalaman`. Lapis terakhir
+    menyimpulkan kemungkinan_* dan setiap penyakit punya satu aturan saran.
+    """
+    rnd = random.Random(seed)
+    kedalaman = max(1, kedalaman)
+    gejala = [
+        {"id": f"gejala_{i:04d}", "nama": f"Gejala {i}", "deskripsi": f"Gejala sintetis nomor {i}",
+         "kategori": KATEGORI_GEJALA[i % len(KATEGORI_GEJALA)]}
+        for i in range(n_gejala)
+    ]
+    per_lapis = max(2, n_aturan // kedalaman)
+    n_penyakit = max(1, per_lapis // 4)
+    lapis = [[g["id"] for g in gejala]]
+    for d in range(1, kedalaman):
+        lapis.append([f"antara_{d}_{i}" for i in range(max(1, per_lapis // 4))])
+    lapis.append([f"kemungkinan_penyakit_{i}" for i in range(n_penyakit)])
+
+    aturan, tersedia = [], list(lapis[0])
+    for d in range(1, kedalaman + 1):
+        kesimpulan = lapis[d]
+        jumlah = per_lapis - n_penyakit if d == kedalaman else per_lapis
+        for i in range(max(jumlah, len(kesimpulan))):
+            kondisi = {rnd.choice(lapis[d - 1])}
+            kondisi.update(rnd.sample(tersedia, min(len(tersedia), rnd.randint(0, 2))))
+            aturan.append({
+                "conditions": sorted(kondisi), "conclusion": kesimpulan[i % len(kesimpulan)],
+                "bobot": round(rnd.uniform(0.4, 0.95), 2),
+            })
+        tersedia.extend(kesimpulan)
+    solusi = {}
+    for i, penyakit in enumerate(lapis[-1]):
+        aturan.append({"conditions": [penyakit], "conclusion": f"saran_penyakit_{i}", "bobot": 1.0})
+        solusi[f"saran_penyakit_{i}"] = f"Saran penanganan untuk penyakit {i}"
+    rnd.shuffle(aturan)
+    return {"gejala": gejala, "aturan": aturan, "solusi": solusi}
+
+
+def generate_symptom_sets(data, n, seed=0, min_gejala=2, max_gejala=8):
+    """Membuat `n` pilihan gejala acak (daftar id) dari basis pengetahuan `data`."""
+    rnd = random.Random(seed)
+    ids = [g["id"] for g in data["gejala"]]
+    return [rnd.sample(ids, rnd.randint(min(min_gejala, len(ids)), min(max_gejala, len(ids)))) for _ in range(n)]
+
+
+def generate_history(data, n, seed=0, variasi=256, mulai=datetime(2024, 1, 1), rentang_hari=365):
+    """
+    Membuat `n` entri riwayat sintetis (terlama lebih dulu) dengan format
+    yang sama seperti entri buatan aplikasi. Diagnosis dihitung dengan mesin
+    inferensi untuk `variasi` pilihan gejala acak, lalu dipakai bergantian
+    dengan tanggal yang tersebar merata dalam `rentang_hari`.
+    """
+    import file_handler
+    from inference_engine import InferenceEngine
+
+    engine = InferenceEngine(data["aturan"], data["solusi"])
+    nama = {g["id"]: g["nama"] for g in data["gejala"]}
+    pool = []
+    for gejala_terpilih in generate_symptom_sets(data, variasi, seed):
+        result = engine.diagnose(gejala_terpilih)
+        pool.append(file_handler.create_history_entry([nama[gid] for gid in gejala_terpilih], result, tanggal=""))
+    rnd = random.Random(seed)
+    langkah = timedelta(days=rentang_hari) / max(1, n)
+    entries = []
+    for i in range(n):
+        entry = dict(rnd.choice(pool))
+        entry["id"] = i + 1
+        entry["tanggal"] = (mulai + langkah * i).strftime("%Y-%m-%d %H:%M:%S")
+        entries.append(entry)
+    return entries
+
+
+def _percentile(sorted_values, q):
+    """Persentil nearest-rank dari daftar yang sudah terurut."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _run(fn, ulang, memori):
+    """
+    Menjalankan `fn` sebanyak `ulang` kali. `fn` mengembalikan (jumlah operasi,
+    daftar latensi per operasi dalam detik atau None). Waktu diambil dari
+    putaran tercepat; puncak memori diukur dengan tracemalloc pada satu
+    putaran terpisah agar tidak memperlambat pengukuran waktu.
+    """
+    best = None
+    for _ in range(ulang):
+        start = time.perf_counter()
+        ops, latencies = fn()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, ops, latencies)
+    elapsed, ops, latencies = best
+    hasil = {"operasi": ops, "detik": round(elapsed, 6), "throughput": round(ops / elapsed, 2) if elapsed else None}
+    if latencies:
+        latencies = sorted(latencies)
+        hasil["latensi_ms"] = {
+            f"p{q}": round(_percentile(latencies, q) * 1000, 4) for q in (50, 95, 99)
+        }
+        hasil["latensi_ms"]["maks"] = round(latencies[-1] * 1000, 4)
+    if memori:
+        tracemalloc.start()
+        try:
+            fn()
+            hasil["memori_puncak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    return hasil
+
+
+def _benchmarks(data, entries, symptom_sets, workdir, pdf_entries):
+    """Menyusun fungsi benchmark per nama; masing-masing mengembalikan (operasi, latensi)."""
+    import file_handler
+    import history_store
+    from export_manager import export_csv_stream
+    from history_index import NAMA_BULAN, HistoryIndex
+    from inference_engine import InferenceEngine
+    from inference_trace import InferenceTrace
+    from main import DiagnosisApp
+
+    engine = InferenceEngine(data["aturan"], data["solusi"])
+    nama = {g["id"]: g["nama"] for g in data["gejala"]}
+    json_file = os.path.join(workdir, "riwayat.json")
+    jsonl_file = os.path.join(workdir, "riwayat.jsonl")
+    newest_first = entries[::-1]
+
+    def inferensi():
+        # Logika thread pekerja run_diagnosis: inferensi, jejak lengkap, dan teks hasil
+        latencies = []
+        for gejala_terpilih in symptom_sets:
+            start = time.perf_counter()
+            result = engine.diagnose(gejala_terpilih)
+            trace = InferenceTrace.from_result(result, engine.rules, [nama[gid] for gid in gejala_terpilih])
+            trace.render()
+            DiagnosisApp.format_result(result)
+            latencies.append(time.perf_counter() - start)
+        return len(symptom_sets), latencies
+
+    def riwayat_simpan():
+        file_handler.save_history(json_file, entries, headless=True)
+        return len(entries), None
+
+    def riwayat_muat():
+        return len(file_handler.load_history(json_file, headless=True)), None
+
+    def riwayat_jsonl_tambah():
+        if os.path.exists(jsonl_file):
+            os.remove(jsonl_file)
+        store = history_store.JsonlHistoryStore(jsonl_file)
+        try:
+            store.append_many(entries)
+        finally:
+            store.close()
+        return len(entries), None
+
+    def riwayat_jsonl_muat():
+        store = history_store.JsonlHistoryStore(jsonl_file)
+        try:
+            return len(store.load()), None
+        finally:
+            store.close()
+
+    def indeks_riwayat():
+        HistoryIndex(newest_first)
+        return len(entries), None
+
+    index = HistoryIndex(newest_first)
+    bulan = list(NAMA_BULAN.values())
+    tanggal = sorted({entry["tanggal"][:10] for entry in entries[::max(1, len(entries) // 50)]})
+    queries = [dict(text=g["nama"].lower()) for g in data["gejala"][:20]]
+    queries += [dict(text="penyakit 1"), dict(text="tidak ada"), dict(text="zzz")]
+    queries += [dict(month=m) for m in bulan]
+    queries += [dict(date_from=a, date_to=b) for a, b in zip(tanggal, tanggal[len(tanggal) // 2:])]
+    queries += [dict(text="gejala 1", month=m) for m in bulan[:3]]
+
+    def filter_riwayat():
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            len(index.search(**query))
+            latencies.append(time.perf_counter() - start)
+        return len(queries), latencies
+
+    def ekspor_csv():
+        export_csv_stream(newest_first, os.path.join(workdir, "riwayat.csv"), total=len(entries))
+        return len(entries), None
+
+    def ekspor_parquet():
+        import parquet_export
+        parquet_export.write_parquet(newest_first, os.path.join(workdir, "riwayat.parquet"), total=len(entries))
+        return len(entries), None
+
+    def ekspor_pdf():
+        import pdf_report
+        subset = newest_first[:pdf_entries]
+        pdf_report.generate_pdf_report(subset, os.path.join(workdir, "riwayat.pdf"), total=len(subset))
+        return len(subset), None
+
+    return {
+        "inferensi": inferensi, "riwayat_simpan": riwayat_simpan, "riwayat_muat": riwayat_muat,
+        "riwayat_jsonl_tambah": riwayat_jsonl_tambah, "riwayat_jsonl_muat": riwayat_jsonl_muat,
+        "indeks_riwayat": indeks_riwayat, "filter_riwayat": filter_riwayat,
+        "ekspor_csv": ekspor_csv, "ekspor_parquet": ekspor_parquet, "ekspor_pdf": ekspor_pdf,
+    }
+
+
+def run_benchmarks(parameter, names=NAMA_BENCHMARK, ulang=3, memori=True, log=None):
+    """Menjalankan benchmark terpilih dan mengembalikan dokumen hasil (siap disimpan sebagai baseline)."""
+    data = generate_knowledge_base(parameter["gejala"], parameter["aturan"], parameter["kedalaman"], parameter["seed"])
+    entries = generate_history(data, parameter["riwayat"], parameter["seed"])
+    symptom_sets = generate_symptom_sets(data, parameter["diagnosis"], parameter["seed"] + 1)
+    hasil = {}
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as workdir:
+        benchmarks = _benchmarks(data, entries, symptom_sets, workdir, parameter["pdf"])
+        for name in NAMA_BENCHMARK:
+            if name not in names:
+                continue
+            if name in DEPENDENSI_OPSIONAL:
+                try:
+                    importlib.import_module(DEPENDENSI_OPSIONAL[name])
+                except ImportError:
+                    if log:
+                        log(f"⚠ {name} dilewati: {DEPENDENSI_OPSIONAL[name]} tidak terpasang")
+                    continue
+            hasil[name] = _run(benchmarks[name], ulang, memori)
+            if log:
+                log(format_row(name, hasil[name]))
+    return {
+        "versi": VERSI_BASELINE,
+        "dibuat": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameter": parameter,
+        "hasil": hasil,
+    }
+
+
+def format_row(name, hasil):
+    line = f"  {name:<22}{hasil['operasi']:>9} op{hasil['detik'] * 1000:>11.1f} ms{hasil['throughput'] or 0:>13.1f} op/s"
+    if "latensi_ms" in hasil:
+        lat = hasil["latensi_ms"]
+        line += f"  p50 {lat['p50']:.3f} / p95 {lat['p95']:.3f} / p99 {lat['p99']:.3f} ms"
+    if "memori_puncak_kb" in hasil:
+        line += f"  memori {hasil['memori_puncak_kb'] / 1024:.1f} MB"
+    return line
+
+
+def compare(baseline, current, toleransi=TOLERANSI_REGRESI):
+    """
+    Membandingkan hasil dengan baseline dan mengembalikan daftar regresi:
+    waktu total, latensi p50/p95/p99, atau puncak memori yang naik melebihi `toleransi`.
+    """
+    regresi = []
+    for name, now in current["hasil"].items():
+        before = baseline["hasil"].get(name)
+        if before is None:
+            continue
+        metrics = [("detik", before["detik"], now["detik"], 0)]
+        for q in ("p50", "p95", "p99"):
+            if q in before.get("latensi_ms", {}) and q in now.get("latensi_ms", {}):
+                metrics.append((f"latensi {q} (ms)", before["latensi_ms"][q], now["latensi_ms"][q], SELISIH_MINIMUM_MS))
+        if "memori_puncak_kb" in before and "memori_puncak_kb" in now:
+            metrics.append(("memori puncak (KB)", before["memori_puncak_kb"], now["memori_puncak_kb"], 0))
+        for metric, old, new, minimum in metrics:
+            if new > old * (1 + toleransi) and new - old > minimum:
+                regresi.append(f"{name}: {metric} {old:g} → {new:g} (+{(new / old - 1) * 100 if old else 100:.0f}%)")
+    return regresi
+
+
+def main(argv=None):
+    """Benchmark jalur utama, mis. `python benchmark.py --riwayat 100000 --simpan baseline.json`."""
+    parser = argparse.ArgumentParser(description="Benchmark inferensi, riwayat, pencarian, dan ekspor dengan data sintetis.")
+    parser.add_argument("--gejala", type=int, default=200, help="jumlah gejala sintetis")
+    parser.add_argument("--aturan", type=int, default=2000, help="jumlah aturan sintetis")
+    parser.add_argument("--kedalaman", type=int, default=3, help="panjang rantai aturan")
+    parser.add_argument("--riwayat", type=int, default=10000, help="jumlah entri riwayat sintetis")
+    parser.add_argument("--diagnosis", type=int, default=1000, help="jumlah diagnosis untuk benchmark inferensi")
+    parser.add_argument("--pdf", type=int, default=1000, help="jumlah entri untuk benchmark ekspor PDF")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ulang", type=int, default=3, help="jumlah pengulangan; waktu tercepat yang dicatat")
+    parser.add_argument("--hanya", nargs="+", choices=NAMA_BENCHMARK, default=NAMA_BENCHMARK, help="benchmark yang dijalankan")
+    parser.add_argument("--tanpa-memori", action="store_true", help="lewati pengukuran puncak memori (tracemalloc)")
+    parser.add_argument("--simpan", help="tulis hasil sebagai baseline JSON")
+    parser.add_argument("--bandingkan", help="bandingkan dengan baseline JSON; kode keluar 1 bila ada regresi")
+    parser.add_argument("--toleransi", type=float, default=TOLERANSI_REGRESI, help="kenaikan relatif yang ditoleransi")
+    parser.add_argument("--tulis-kb", help="hanya tulis basis pengetahuan sintetis ke file ini")
+    parser.add_argument("--tulis-riwayat", help="hanya tulis riwayat sintetis (format JSON lama) ke file ini")
+    args = parser.parse_args(argv)
+
+    parameter = {
+        "gejala": args.gejala, "aturan": args.aturan, "kedalaman": args.kedalaman, "riwayat": args.riwayat,
+        "diagnosis": args.diagnosis, "pdf": args.pdf, "seed": args.seed,
+    }
+    if args.tulis_kb or args.tulis_riwayat:
+        data = generate_knowledge_base(args.gejala, args.aturan, args.kedalaman, args.seed)
+        if args.tulis_kb:
+            with open(args.tulis_kb, 'w', encoding='utf-8') as file:
+                json.dump(data, file, indent=2, ensure_ascii=False)
+        if args.tulis_riwayat:
+            with open(args.tulis_riwayat, 'w', encoding='utf-8') as file:
+                json.dump(generate_history(data, args.riwayat, args.seed)[::-1], file, ensure_ascii=False)
+        return 0
+
+    baseline = None
+    if args.bandingkan:
+        with open(args.bandingkan, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline.get("versi") != VERSI_BASELINE or baseline.get("parameter") != parameter:
+            print(f"✗ Baseline {args.bandingkan} dibuat dengan versi/parameter berbeda: {baseline.get('parameter')}", file=sys.stderr)
+            return 2
+
+    print(f"⏱ BENCHMARK {parameter}")
+    current = run_benchmarks(parameter, args.hanya, max(1, args.ulang), not args.tanpa_memori, log=print)
+    if args.simpan:
+        with open(args.simpan, 'w', encoding='utf-8') as file:
+            json.dump(current, file, indent=2, ensure_ascii=False)
+        print(f"✓ Baseline disimpan ke {args.simpan}")
+    if baseline is not None:
+        regresi = compare(baseline, current, args.toleransi)
+        for line in regresi:
+            print(f"❌ {line}")
+        if regresi:
+            return 1
+        print(f"✓ Tidak ada regresi terhadap {args.bandingkan} (toleransi {args.toleransi * 100:.0f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+try:
+    import numpy as np
+except ImportError:  # numpy opsional, fallback ke bitset integer Python
+    np = None
+
+from inference_engine import BATAS_ITERASI, DiagnosisResult
+
+
+class BitsetRuleBase:
+    """
+    Basis aturan yang dikompilasi menjadi bitmask.
+
+    Setiap simbol (gejala lalu simbol turunan) mendapat satu posisi bit dan
+    setiap aturan menjadi mask kondisi + bit kesimpulan. Dipakai untuk
+    diagnosis massal; semantik iterasinya sama dengan InferenceEngine.
+    """
+
+    def __init__(self, gejala_list, rules, solusi, max_iterations=BATAS_ITERASI):
+        self.solusi = solusi
+        self.max_iterations = max_iterations
+        self.gejala_ids = list(dict.fromkeys(g["id"] for g in gejala_list))
+        self.symbols = list(self.gejala_ids)
+        self.bit = {sym: i for i, sym in enumerate(self.symbols)}
+        for rule in rules:
+            for sym in list(rule["conditions"]) + [rule["conclusion"]]:
+                if sym not in self.bit:
+                    self.bit[sym] = len(self.symbols)
+                    self.symbols.append(sym)
+
+        self.condition_masks = []
+        self.conclusion_bits = []
+        self.weights = []
+        for rule in rules:
+            mask = 0
+            for cond in rule["conditions"]:
+                mask |= 1 << self.bit[cond]
+            self.condition_masks.append(mask)
+            self.conclusion_bits.append(self.bit[rule["conclusion"]])
+            self.weights.append(rule.get("bobot", 1.0))
+        self.kemungkinan = [self.symbols[b].startswith("kemungkinan_") for b in self.conclusion_bits]
+
+        self.words = max(1, (len(self.symbols) + 63) // 64)
+        if np is not None:
+            self.condition_words = np.array(
+                [[(mask >> (64 * w)) & 0xFFFFFFFFFFFFFFFF for w in range(self.words)] for mask in self.condition_masks],
+                dtype=np.uint64,
+            ).reshape(len(rules), self.words)
+
+    def encode(self, gejala_terpilih):
+        """Mengubah daftar id gejala menjadi bitmask integer."""
+        mask = 0
+        for gid in gejala_terpilih:
+            bit = self.bit.get(gid)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def encode_rows(self, daftar_gejala):
+        """Mengubah banyak daftar id gejala menjadi matriks flag (baris x gejala)."""
+        column = {gid: i for i, gid in enumerate(self.gejala_ids)}
+        rows = []
+        for gejala_terpilih in daftar_gejala:
+            row = [0] * len(self.gejala_ids)
+            for gid in gejala_terpilih:
+                if gid in column:
+                    row[column[gid]] = 1
+            rows.append(row)
+        return rows
+
+    def diagnose_mask(self, mask):
+        """Forward chaining untuk satu pasien dengan bitset integer."""
+        facts, conclusions, iteration = mask, {}, 0
+        while True:
+            iteration += 1
+            new_facts_found = False
+            for idx, cond_mask in enumerate(self.condition_masks):
+                bit = 1 << self.conclusion_bits[idx]
+                if not facts & bit and facts & cond_mask == cond_mask:
+                    facts |= bit
+                    new_facts_found = True
+                    if self.kemungkinan[idx]:
+                        conclusions[self.symbols[self.conclusion_bits[idx]]] = self.weights[idx]
+            if iteration > self.max_iterations:
+                return facts, conclusions, iteration, True
+            if not new_facts_found:
+                return facts, conclusions, iteration, False
+
+    def diagnose_batch(self, matrix):
+        """
+        Menjalankan forward chaining untuk N pasien sekaligus.
+
+        `matrix` berisi satu baris flag gejala per pasien dengan urutan kolom
+        sesuai `gejala_ids`. Mengembalikan satu DiagnosisResult per baris.
+        """
+        if np is not None and self.gejala_ids:
+            return self._diagnose_batch_numpy(np.asarray(matrix, dtype=bool).reshape(-1, len(self.gejala_ids)))
+
+        masks = [sum(1 << i for i, flag in enumerate(row) if flag) for row in matrix]
+        memo = {}
+        results = []
+        for mask in masks:
+            if mask not in memo:
+                memo[mask] = self._result(*self.diagnose_mask(mask))
+            results.append(memo[mask])
+        return results
+
+    def _diagnose_batch_numpy(self, matrix):
+        # Pola gejala yang sama cukup dihitung sekali; baris dipadatkan ke byte
+        # agar np.unique bekerja pada satu kolom, bukan perbandingan per kolom.
+        packed = np.ascontiguousarray(np.packbits(matrix, axis=1))
+        keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        unique_rows = matrix[first]
+        n = len(unique_rows)
+        facts = np.zeros((n, self.words), dtype=np.uint64)
+        for col in range(len(self.gejala_ids)):
+            word, offset = divmod(col, 64)
+            facts[unique_rows[:, col], word] |= np.uint64(1 << offset)
+
+        weights, fire_order = {}, {}
+        iterations = np.zeros(n, dtype=np.int64)
+        limit_reached = np.zeros(n, dtype=bool)
+        active = np.arange(n)
+        iteration = 0
+        while len(active):
+            iteration += 1
+            iterations[active] = iteration
+            sub = facts[active]
+            changed = np.zeros(len(active), dtype=bool)
+            for idx, conclusion_bit in enumerate(self.conclusion_bits):
+                word, offset = divmod(conclusion_bit, 64)
+                bit = np.uint64(1 << offset)
+                cond = self.condition_words[idx]
+                ready = ((sub[:, word] & bit) == 0) & ((sub & cond) == cond).all(axis=1)
+                if ready.any():
+                    sub[ready, word] |= bit
+                    changed |= ready
+                    if self.kemungkinan[idx]:
+                        rows = active[ready]
+                        weights.setdefault(conclusion_bit, np.full(n, np.nan))[rows] = self.weights[idx]
+                        fire_order.setdefault(conclusion_bit, np.zeros(n, dtype=np.int64))[rows] = iteration * len(self.conclusion_bits) + idx
+            facts[active] = sub
+            if iteration > self.max_iterations:
+                limit_reached[active] = True
+                break
+            active = active[changed]
+
+        unique_results = []
+        for row in range(n):
+            mask = 0
+            for word in range(self.words):
+                mask |= int(facts[row, word]) << (64 * word)
+            # Urutan kesimpulan mengikuti urutan penembakan seperti InferenceEngine
+            fired_bits = sorted(
+                (bit for bit, column in weights.items() if not np.isnan(column[row])),
+                key=lambda bit: fire_order[bit][row],
+            )
+            conclusions = {self.symbols[bit]: float(weights[bit][row]) for bit in fired_bits}
+            unique_results.append(self._result(mask, conclusions, int(iterations[row]), bool(limit_reached[row])))
+        return [unique_results[i] for i in inverse.ravel()]
+
+    def _result(self, mask, conclusions, iterations, limit_reached):
+        facts = {sym for i, sym in enumerate(self.symbols) if mask >> i & 1}
+        return DiagnosisResult(facts, conclusions, [], iterations, limit_reached, self.solusi, traced=False)
+
+
+def compile_rules(gejala_list, rules, solusi, max_iterations=BATAS_ITERASI):
+    """Mengompilasi basis pengetahuan menjadi BitsetRuleBase."""
+    return BitsetRuleBase(gejala_list, rules, solusi, max_iterations)
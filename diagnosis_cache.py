@@ -0,0 +1,151 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import knowledge_base
+from inference_engine import InferenceEngine
+from inference_trace import JEJAK_MATI
+
+# Katalog dengan gejala sebanyak ini atau kurang boleh dihitung penuh (2^n kombinasi)
+BATAS_TABEL_KEBENARAN = 16
+
+
+def file_hash(file_path):
+    """Menghitung hash SHA-256 dari isi file."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DiagnosisCache:
+    """
+    Cache hasil diagnosis dengan kunci himpunan gejala yang dipilih.
+
+    Entri dibuang secara LRU bila melebihi `maxsize`. Dengan `precompute=True`
+    dan katalog kecil, seluruh tabel kebenaran dibangun saat basis
+    pengetahuan dimuat. Cache dikosongkan otomatis ketika hash isi file
+    basis pengetahuan berubah.
+    """
+
+    def __init__(self, kb_file, engine, gejala_ids, maxsize=4096, precompute=False, kb_hash=None, auto_reload=True, metrics=None):
+        self.kb_file = kb_file
+        self.engine = engine
+        self.gejala_ids = list(gejala_ids)
+        self.maxsize = maxsize
+        self.precompute = precompute
+        # False bila pemuatan ulang diurus pemanggil (lihat kb_watcher) lewat swap()
+        self.auto_reload = auto_reload
+        # metrics.Metrics opsional; None berarti tanpa instrumentasi
+        self.metrics = metrics
+        self.hits = self.misses = self.invalidations = 0
+        self._entries = OrderedDict()
+        # Diagnosis dapat dijalankan dari thread pekerja GUI
+        self._lock = threading.Lock()
+        self._signature = self._file_signature()
+        self.kb_hash = kb_hash or file_hash(kb_file)
+        if precompute:
+            self.build_truth_table()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.kb_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check_knowledge_base(self):
+        """Memuat ulang aturan bila isi file basis pengetahuan berubah. Mengembalikan True jika cache dikosongkan."""
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        digest = file_hash(self.kb_file)
+        if digest == self.kb_hash:
+            return False
+        kb = knowledge_base.load_knowledge_base(self.kb_file, headless=True)
+        if kb is None:
+            # File sedang disunting/tidak valid: tetap pakai aturan lama
+            return False
+        self._swap(kb)
+        return True
+
+    def swap(self, kb):
+        """Mengganti basis pengetahuan secara atomik di antara dua diagnosis dan mengosongkan cache."""
+        with self._lock:
+            self._signature = self._file_signature()
+            self._swap(kb)
+
+    def _swap(self, kb):
+        self.kb_hash = kb.digest
+        if kb.engine.max_iterations == self.engine.max_iterations:
+            self.engine = kb.engine
+        else:
+            self.engine = InferenceEngine(kb.rules, kb.solusi, self.engine.max_iterations)
+        self.gejala_ids = kb.gejala_ids
+        if self.metrics is not None:
+            self.metrics.set_rules(self.engine.rules)
+        self.clear()
+        self.invalidations += 1
+        if self.precompute:
+            self.build_truth_table()
+
+    def build_truth_table(self):
+        """Menghitung semua kombinasi gejala bila katalognya cukup kecil."""
+        n = len(self.gejala_ids)
+        if n > BATAS_TABEL_KEBENARAN:
+            return False
+        for mask in range(1 << n):
+            key = frozenset(gid for i, gid in enumerate(self.gejala_ids) if mask >> i & 1)
+            self._entries[key] = self.engine.diagnose(key)
+        return True
+
+    def diagnose(self, gejala_terpilih, cancel_event=None, trace=None):
+        """
+        Mengembalikan DiagnosisResult dari cache atau menjalankan inferensi bila
+        belum ada. Dengan `trace` 'off' event penembakan tidak dicatat; hasil
+        tanpa event tersebut dihitung ulang bila kemudian diminta dengan jejak.
+        """
+        with self._lock:
+            if self.auto_reload:
+                self.check_knowledge_base()
+            start = time.perf_counter()
+            key = frozenset(gejala_terpilih)
+            result = self._entries.get(key)
+            if result is not None and not result.traced and trace != JEJAK_MATI:
+                result = None
+            cached = result is not None
+            if cached:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+                # Metrik per aturan membutuhkan event penembakan, apa pun tingkat jejaknya
+                result = self.engine.diagnose(key, cancel_event, trace if self.metrics is None else None)
+                self._entries[key] = result
+                if len(self._entries) > max(self.maxsize, self._table_size()):
+                    self._entries.popitem(last=False)
+            if self.metrics is not None:
+                self.metrics.record_diagnosis(self.engine, result, time.perf_counter() - start, cached)
+            return result
+
+    def _table_size(self):
+        n = len(self.gejala_ids)
+        return 1 << n if self.precompute and n <= BATAS_TABEL_KEBENARAN else 0
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "invalidations": self.invalidations,
+            "kb_hash": self.kb_hash,
+        }
@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import file_handler
+import history_store
+import knowledge_base
+from batch_cli import parse_patient, result_fields
+from bitset_engine import compile_rules
+
+# Alamat bawaan: hanya dapat diakses dari mesin yang sama
+HOST_BAWAAN = "127.0.0.1"
+PORT_BAWAAN = 8765
+# Micro-batch: jumlah pasien maksimum dan waktu tunggu maksimum (ms) sebelum engine dijalankan
+BATCH_MAKS = 256
+TUNDA_BATCH_MS = 2.0
+BATAS_BODY = 10 * 1024 * 1024
+# Jumlah latensi terakhir yang disimpan untuk persentil
+JENDELA_STATISTIK = 10000
+
+_STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """Permintaan tidak valid; dijawab dengan kode status `status`."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q / 100))]
+
+
+class ServiceStats:
+    """Jumlah permintaan, latensi, throughput, dan ukuran micro-batch layanan."""
+
+    def __init__(self, window=JENDELA_STATISTIK):
+        self.started = time.monotonic()
+        self.requests = {}
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self.completed = deque(maxlen=window)
+        self.batches = self.batched_rows = self.max_batch = 0
+        self.patients = 0
+
+    def record_request(self, path, status, seconds):
+        self.requests[path] = self.requests.get(path, 0) + 1
+        if status >= 400:
+            self.errors += 1
+        self.latencies.append(seconds)
+        self.completed.append(time.monotonic())
+
+    def record_batch(self, rows):
+        self.batches += 1
+        self.batched_rows += rows
+        self.max_batch = max(self.max_batch, rows)
+
+    def snapshot(self):
+        now = time.monotonic()
+        uptime = now - self.started
+        total = sum(self.requests.values())
+        latencies = sorted(self.latencies)
+        recent = sum(1 for stamp in self.completed if now - stamp <= 60)
+        return {
+            "uptime_detik": round(uptime, 1),
+            "permintaan": dict(self.requests),
+            "error": self.errors,
+            "pasien": self.patients,
+            "latensi_ms": {f"p{q}": round(_percentile(latencies, q) * 1000, 3) if latencies else None for q in (50, 95, 99)},
+            "throughput_per_detik": {
+                "rata_rata": round(total / uptime, 2) if uptime else 0.0,
+                "60_detik_terakhir": round(recent / min(60.0, uptime), 2) if uptime else 0.0,
+            },
+            "micro_batch": {
+                "jumlah": self.batches,
+                "rata_rata_pasien": round(self.batched_rows / self.batches, 2) if self.batches else 0.0,
+                "maks_pasien": self.max_batch,
+            },
+        }
+
+
+class DiagnosisService:
+    """
+    Layanan HTTP/JSON lokal di atas asyncio (tanpa dependensi tambahan).
+
+    Basis pengetahuan dimuat dan dikompilasi sekali. Permintaan dari banyak
+    klien yang datang berdekatan digabung menjadi satu micro-batch untuk
+    BitsetRuleBase.diagnose_batch, yang dijalankan di satu thread engine agar
+    event loop tetap melayani koneksi. Bila `riwayat_file` diberikan, setiap
+    hasil dicatat lewat satu penulis riwayat yang menulis berurutan.
+    """
+
+    def __init__(self, kb, riwayat_file=None, max_batch=BATCH_MAKS, batch_delay_ms=TUNDA_BATCH_MS):
+        self.kb = kb
+        self.rule_base = compile_rules(kb.gejala_list, kb.rules, kb.solusi)
+        self.nama_gejala = {g["id"]: g["nama"] for g in kb.gejala_list}
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay_ms / 1000
+        self.store = history_store.open_history_store(riwayat_file) if riwayat_file else None
+        self.stats = ServiceStats()
+        self.history_written = 0
+        self._engine_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="engine")
+        self._writer_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="riwayat")
+        self._pending = None
+        self._history = None
+        self._tasks = []
+        self._server = None
+        self._routes = {
+            "/diagnosis": ("POST", self._handle_diagnosis),
+            "/diagnosis/batch": ("POST", self._handle_batch),
+            "/kueri": ("POST", self._handle_kueri),
+            "/gejala": ("GET", self._handle_gejala),
+            "/statistik": ("GET", self._handle_statistik),
+            "/sehat": ("GET", lambda body: {"status": "ok", "aturan": len(self.kb.rules)}),
+        }
+
+    async def start(self, host=HOST_BAWAAN, port=PORT_BAWAAN):
+        self._pending = asyncio.Queue()
+        self._history = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._batcher())]
+        if self.store is not None:
+            self._tasks.append(asyncio.create_task(self._history_writer()))
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Berhenti menerima koneksi, menuntaskan antrean riwayat, lalu menutup store."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.store is not None:
+            await self._history.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._engine_executor.shutdown()
+        self._writer_executor.shutdown()
+        if self.store is not None:
+            self.store.close()
+
+    # --- micro-batch dan riwayat ---
+
+    def diagnose_rows(self, rows):
+        """Mendiagnosis banyak himpunan id gejala sekaligus (dipanggil di thread engine)."""
+        return self.rule_base.diagnose_batch(self.rule_base.encode_rows(rows))
+
+    async def diagnose(self, rows):
+        """Mengantrekan daftar himpunan gejala dan menunggu hasilnya dari micro-batch berikutnya."""
+        future = asyncio.get_running_loop().create_future()
+        await self._pending.put((rows, future))
+        return await future
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self._pending.get()]
+            rows = len(items[0][0])
+            deadline = loop.time() + self.batch_delay
+            while rows < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._pending.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                items.append(item)
+                rows += len(item[0])
+            batch = [row for item_rows, _ in items for row in item_rows]
+            try:
+                results = await loop.run_in_executor(self._engine_executor, self.diagnose_rows, batch)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.stats.record_batch(len(batch))
+            position = 0
+            for item_rows, future in items:
+                if not future.done():
+                    future.set_result(results[position:position + len(item_rows)])
+                position += len(item_rows)
+
+    def _queue_history(self, rows, results):
+        if self.store is None:
+            return
+        for gejala, result in zip(rows, results):
+            nama = [self.nama_gejala[gid] for gid in self.rule_base.gejala_ids if gid in gejala]
+            self._history.put_nowait(file_handler.create_history_entry(nama, result))
+
+    async def _history_writer(self):
+        # Satu-satunya penulis riwayat: entri dari banyak permintaan ditulis berurutan per kelompok
+        loop = asyncio.get_running_loop()
+        while True:
+            entries = [await self._history.get()]
+            while not self._history.empty() and len(entries) < 1000:
+                entries.append(self._history.get_nowait())
+            try:
+                await loop.run_in_executor(self._writer_executor, self.store.append_many, entries)
+                self.history_written += len(entries)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠ Gagal menyimpan {len(entries)} entri riwayat: {e}", file=sys.stderr)
+            for _ in entries:
+                self._history.task_done()
+
+    # --- endpoint ---
+
+    def _output(self, record_id, gejala, result):
+        output = {} if record_id is None else {"id": record_id}
+        output.update(result_fields(result))
+        unknown = sorted(gid for gid in gejala if gid not in self.nama_gejala)
+        if unknown:
+            output["gejala_tidak_dikenal"] = unknown
+        return output
+
+    async def _handle_diagnosis(self, body):
+        try:
+            record_id, gejala = parse_patient(body)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        rows = [set(gejala)]
+        results = await self.diagnose(rows)
+        self.stats.patients += 1
+        self._queue_history(rows, results)
+        return self._output(record_id, rows[0], results[0])
+
+    async def _handle_batch(self, body):
+        if isinstance(body, dict):
+            body = body.get("pasien")
+        if not isinstance(body, list):
+            raise RequestError(400, "body harus berupa daftar pasien atau objek dengan kunci 'pasien'")
+        outputs, parsed = [None] * len(body), []
+        for pos, record in enumerate(body):
+            try:
+                record_id, gejala = parse_patient(record)
+            except ValueError as e:
+                outputs[pos] = {"indeks": pos, "error": str(e)}
+                continue
+            parsed.append((pos, record_id, set(gejala)))
+        rows = [gejala for _, _, gejala in parsed]
+        results = await self.diagnose(rows) if rows else []
+        self.stats.patients += len(rows)
+        self._queue_history(rows, results)
+        for (pos, record_id, gejala), result in zip(parsed, results):
+            outputs[pos] = self._output(record_id, gejala, result)
+        return {"hasil": outputs}
+
+    async def _handle_kueri(self, body):
+        """Kueri tujuan: {"gejala": [...], "tujuan": [...]}; tanpa "tujuan" berarti solusi yang berlaku."""
+        try:
+            _, gejala = parse_patient(body)
+        except ValueError as e:
+            raise RequestError(400, str(e))
+        goals = body.get("tujuan") if isinstance(body, dict) else None
+        if isinstance(goals, str):
+            goals = [goals]
+        if goals is not None and (not isinstance(goals, list) or not all(isinstance(goal, str) for goal in goals)):
+            raise RequestError(400, "'tujuan' harus berupa nama kesimpulan atau daftar nama kesimpulan")
+        engine = self.kb.engine
+        unknown = engine.unknown_goals(goals or ())
+        if unknown:
+            raise RequestError(400, f"tujuan tidak disimpulkan oleh aturan mana pun: {', '.join(unknown)}")
+        results = await asyncio.get_running_loop().run_in_executor(
+            self._engine_executor, engine.query_many, goals or list(self.kb.solusi), set(gejala)
+        )
+        output = {goal: {
+            "terdukung": result.supported,
+            "bobot": result.weight,
+            "aturan_relevan": result.relevant_rules,
+            "rantai": [
+                {"rule": idx + 1, "iterasi": iteration, "kondisi": list(engine.rules[idx]["conditions"]),
+                 "kesimpulan": conclusion, "bobot": weight}
+                for iteration, idx, conclusion, weight in result.chain
+            ],
+        } for goal, result in results.items()}
+        if goals:
+            return {"hasil": output}
+        return {"solusi": [self.kb.solusi[key] for key, result in results.items() if result.supported], "hasil": output}
+
+    def _handle_gejala(self, body):
+        return {"gejala": self.kb.gejala_list}
+
+    def _handle_statistik(self, body):
+        snapshot = self.stats.snapshot()
+        if self.store is not None:
+            snapshot["riwayat"] = {"antre": self._history.qsize(), "ditulis": self.history_written}
+        return snapshot
+
+    async def _dispatch(self, method, path, raw_body):
+        route = self._routes.get(path)
+        if route is None:
+            raise RequestError(404, f"endpoint {path} tidak ada")
+        expected, handler = route
+        if method != expected:
+            raise RequestError(405, f"{path} hanya menerima {expected}")
+        body = None
+        if expected == "POST":
+            try:
+                body = json.loads(raw_body)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise RequestError(400, f"JSON tidak valid: {e}")
+        payload = handler(body)
+        return await payload if asyncio.iscoroutine(payload) else payload
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                start = time.perf_counter()
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                parts = request_line.split()
+                method, path, version = parts if len(parts) == 3 else ("", "", "HTTP/1.0")
+                path = path.split("?", 1)[0]
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    if not method:
+                        raise RequestError(400, "baris permintaan tidak valid")
+                    try:
+                        length = int(headers.get("content-length") or 0)
+                    except ValueError:
+                        raise RequestError(400, "Content-Length tidak valid")
+                    if length > BATAS_BODY:
+                        keep_alive = False
+                        raise RequestError(413, f"body melebihi {BATAS_BODY} byte")
+                    raw_body = await reader.readexactly(length) if length else b""
+                    status, payload = 200, await self._dispatch(method, path, raw_body)
+                except RequestError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except asyncio.IncompleteReadError:
+                    return
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                self.stats.record_request(path, status, time.perf_counter() - start)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            return
+        finally:
+            writer.close()
+
+
+async def serve(kb, host, port, riwayat_file=None, max_batch=BATCH_MAKS, batch_delay_ms=TUNDA_BATCH_MS):
+    service = DiagnosisService(kb, riwayat_file, max_batch, batch_delay_ms)
+    address = await service.start(host, port)
+    print(f"✓ Layanan diagnosis berjalan di http://{address[0]}:{address[1]} (Ctrl+C untuk berhenti)", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+        stats = service.stats.snapshot()
+        print(
+            f"📊 {sum(stats['permintaan'].values())} permintaan, {stats['pasien']} pasien, "
+            f"p50 {stats['latensi_ms']['p50']} ms, p99 {stats['latensi_ms']['p99']} ms, "
+            f"{stats['micro_batch']['jumlah']} micro-batch (rata-rata {stats['micro_batch']['rata_rata_pasien']} pasien)",
+            file=sys.stderr
+        )
+
+
+def main(argv=None):
+    """Menjalankan layanan, mis. `python diagnosis_service.py --port 8765 --simpan-riwayat riwayat_diagnosis.jsonl`."""
+    parser = argparse.ArgumentParser(description="Layanan diagnosis HTTP/JSON lokal.")
+    parser.add_argument("--host", default=HOST_BAWAAN, help=f"alamat yang didengarkan (bawaan {HOST_BAWAAN})")
+    parser.add_argument("--port", type=int, default=PORT_BAWAAN, help=f"port (bawaan {PORT_BAWAAN})")
+    parser.add_argument("--kb", default="gejala_penyakit.json", help="file basis pengetahuan")
+    parser.add_argument("--simpan-riwayat", metavar="FILE", help="catat setiap hasil ke store riwayat ini (.jsonl, .db, atau .json)")
+    parser.add_argument("--batch-maks", type=int, default=BATCH_MAKS, help="jumlah pasien maksimum per micro-batch")
+    parser.add_argument("--tunda-ms", type=float, default=TUNDA_BATCH_MS, help="waktu tunggu maksimum untuk mengumpulkan micro-batch")
+    args = parser.parse_args(argv)
+
+    kb = knowledge_base.load_knowledge_base(args.kb, headless=True)
+    if kb is None:
+        return 1
+    try:
+        asyncio.run(serve(kb, args.host, args.port, args.simpan_riwayat, max(1, args.batch_maks), args.tunda_ms))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
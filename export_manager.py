@@ -1,12 +1,138 @@
-from tkinter import filedialog, messagebox
-import pandas as pd
-from datetime import datetime
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
+import argparse
+import csv
+import importlib.util
+import os
+import queue
+import sys
+import threading
+import time
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+CSV_COLUMNS = ['Tanggal', 'Diagnosis', 'Tingkat_Keyakinan', 'Gejala', 'Rekomendasi']
+
+
+class ExportCancelled(Exception):
+    """Ekspor dihentikan oleh pengguna."""
+
+
+def _csv_row(entry):
+    return [
+        entry['tanggal'],
+        entry['diagnosis'],
+        f"{entry['tingkat_keyakinan']*100:.1f}%",
+        '; '.join(entry['gejala']),
+        '; '.join(entry['rekomendasi']) if entry['rekomendasi'] else 'Tidak ada'
+    ]
+
+
+def export_csv_stream(entries, filename, total=None, progress=None, cancel_event=None, chunk_size=1000):
+    """
+    Menulis entri riwayat ke CSV secara bertahap per potongan.
+
+    Tata letak kolom dan encoding `utf-8-sig` sama dengan ekspor lama. File
+    ditulis ke `<nama>.part` lalu diganti namanya, sehingga ekspor yang batal
+    atau gagal tidak meninggalkan file setengah jadi.
+    """
+    part_file = f"{filename}.part"
+    written = 0
+    try:
+        with open(part_file, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file, lineterminator=os.linesep)
+            writer.writerow(CSV_COLUMNS)
+            chunk = []
+            for entry in entries:
+                chunk.append(_csv_row(entry))
+                if len(chunk) >= chunk_size:
+                    writer.writerows(chunk)
+                    written += len(chunk)
+                    chunk.clear()
+                    if progress:
+                        progress(written, total)
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled()
+            writer.writerows(chunk)
+            written += len(chunk)
+        os.replace(part_file, filename)
+    except BaseException:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    if progress:
+        progress(written, total)
+    return written
+
+
+class ProgressDialog:
+    """Jendela kecil berisi progress bar dan tombol batal untuk ekspor di latar belakang."""
+
+    def __init__(self, root, title, total, on_cancel):
+        self.window = tk.Toplevel(root)
+        self.window.title(title)
+        self.window.geometry("360x130")
+        self.window.transient(root)
+        self.window.resizable(False, False)
+        self.label = ttk.Label(self.window, text="Menyiapkan ekspor...")
+        self.label.pack(padx=15, pady=(15, 5), anchor='w')
+        self.bar = ttk.Progressbar(self.window, length=330, mode='determinate', maximum=max(total, 1))
+        self.bar.pack(padx=15, pady=5)
+        ttk.Button(self.window, text="Batal", command=on_cancel).pack(pady=5)
+        self.window.protocol("WM_DELETE_WINDOW", on_cancel)
+
+    def update(self, done, total):
+        self.bar.config(value=done)
+        self.label.config(text=f"Mengekspor {done} dari {total} entri...")
+
+    def close(self):
+        self.window.destroy()
+
 
 class ExportManager:
+    def __init__(self, root=None, metrics=None):
+        self.root = root
+        self.metrics = metrics
+
+    def _run_in_background(self, title, total, work, on_success, metric=None):
+        """
+        Menjalankan `work(progress, cancel_event)` di thread terpisah. Progres dan
+        hasil dikirim lewat queue dan dibaca di thread Tk dengan root.after.
+        Durasi ekspor yang berhasil dicatat ke histogram `metric` bila metrik aktif.
+        """
+        events = queue.Queue()
+        cancel_event = threading.Event()
+        dialog = ProgressDialog(self.root, title, total, cancel_event.set)
+
+        def target():
+            try:
+                start = time.perf_counter()
+                result = work(lambda done, _total: events.put(('progress', done)), cancel_event)
+                if self.metrics is not None and metric:
+                    self.metrics.observe(metric, time.perf_counter() - start)
+                events.put(('done', result))
+            except ExportCancelled:
+                events.put(('cancelled', None))
+            except Exception as e:
+                events.put(('error', e))
+
+        def poll():
+            try:
+                while True:
+                    kind, value = events.get_nowait()
+                    if kind == 'progress':
+                        dialog.update(value, total)
+                        continue
+                    dialog.close()
+                    if kind == 'done':
+                        on_success(value)
+                    elif kind == 'error':
+                        messagebox.showerror("Error", f"Gagal mengekspor data:\n{str(value)}")
+                    return
+            except queue.Empty:
+                self.root.after(100, poll)
+
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(100, poll)
+
     def export_to_csv(self, filtered_data):
         """Export riwayat diagnosis ke file CSV."""
         if not filtered_data:
@@ -20,20 +146,15 @@ class ExportManager:
         )
         if not filename: return
 
-        try:
-            export_data = [{
-                'Tanggal': entry['tanggal'],
-                'Diagnosis': entry['diagnosis'],
-                'Tingkat_Keyakinan': f"{entry['tingkat_keyakinan']*100:.1f}%",
-                'Gejala': '; '.join(entry['gejala']),
-                'Rekomendasi': '; '.join(entry['rekomendasi']) if entry['rekomendasi'] else 'Tidak ada'
-            } for entry in filtered_data]
-            
-            df = pd.DataFrame(export_data)
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
-            messagebox.showinfo("Sukses", f"Data berhasil diekspor ke:\n{filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal mengekspor data:\n{str(e)}")
+        total = len(filtered_data)
+        # Batasi ke jumlah entri saat tombol ditekan, walau riwayat bertambah selama ekspor
+        entries = (entry for _, entry in zip(range(total), filtered_data))
+        self._run_in_background(
+            "Export ke CSV", total,
+            lambda progress, cancel_event: export_csv_stream(entries, filename, total, progress, cancel_event),
+            lambda _: messagebox.showinfo("Sukses", f"Data berhasil diekspor ke:\n{filename}"),
+            metric="ekspor_csv"
+        )
 
     def export_to_pdf(self, filtered_data):
         """Export riwayat diagnosis ke file PDF."""
@@ -48,48 +169,108 @@ class ExportManager:
         )
         if not filename: return
 
-        try:
-            doc = SimpleDocTemplate(filename, pagesize=letter)
-            styles = getSampleStyleSheet()
-            cell_style = ParagraphStyle(name='CellStyle', parent=styles['Normal'], alignment=0, leading=12)
-            header_style = ParagraphStyle(name='HeaderStyle', parent=styles['Normal'], fontName='Helvetica-Bold', textColor=colors.whitesmoke, alignment=0, leading=12)
-            story = []
-            
-            story.append(Paragraph("Riwayat Diagnosis Flu", styles['Title']))
-            story.append(Spacer(1, 12))
-            story.append(Paragraph(f"Diekspor pada: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
-            story.append(Spacer(1, 12))
-            
-            table_headers = [Paragraph(h, header_style) for h in ['Tanggal', 'Diagnosis', 'Keyakinan', 'Gejala Utama']]
-            table_data = [table_headers]
-            
-            for entry in filtered_data:
-                gejala_summary = ', '.join(entry['gejala'][:3])
-                if len(entry['gejala']) > 3:
-                    gejala_summary += f" (+{len(entry['gejala'])-3} lainnya)"
-                
-                row_data = [
-                    Paragraph(entry['tanggal'][:16], cell_style),
-                    Paragraph(entry['diagnosis'], cell_style),
-                    Paragraph(f"{entry['tingkat_keyakinan']*100:.1f}%", cell_style),
-                    Paragraph(gejala_summary, cell_style)
-                ]
-                table_data.append(row_data)
-            
-            table = Table(table_data, colWidths=[90, 170, 60, 180])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ]))
-            
-            story.append(table)
-            doc.build(story)
-            messagebox.showinfo("Sukses", f"Data berhasil diekspor ke:\n{filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Gagal mengekspor PDF:\n{str(e)}")
\ No newline at end of file
+        summary_only = messagebox.askyesno(
+            "Mode Laporan",
+            "Buat laporan ringkasan saja (jumlah kasus per diagnosis dan per bulan)?\n\n"
+            "Pilih 'No' untuk laporan lengkap berisi seluruh riwayat."
+        )
+
+        total = len(filtered_data)
+        entries = (entry for _, entry in zip(range(total), filtered_data))
+
+        def work(progress, cancel_event):
+            # reportlab baru diimpor di sini, di thread latar belakang, saat PDF pertama kali dibuat
+            import pdf_report
+            try:
+                return pdf_report.generate_in_process(entries, filename, total, summary_only, progress, cancel_event)
+            except pdf_report.ReportCancelled:
+                raise ExportCancelled()
+
+        self._run_in_background(
+            "Export ke PDF", total, work,
+            lambda _: messagebox.showinfo("Sukses", f"Data berhasil diekspor ke:\n{filename}"),
+            metric="ekspor_pdf"
+        )
+
+    def export_to_parquet(self, filtered_data):
+        """Export riwayat diagnosis ke file Parquet (kolom list dan timestamp bertipe) untuk analitik."""
+        if not filtered_data:
+            messagebox.showwarning("Peringatan", "Tidak ada data untuk diekspor!")
+            return
+        if importlib.util.find_spec("pyarrow") is None:
+            messagebox.showwarning("Peringatan", "Ekspor Parquet memerlukan pustaka pyarrow:\n\npip install pyarrow")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".parquet",
+            filetypes=[("Parquet files", "*.parquet"), ("All files", "*.*")],
+            title="Simpan Riwayat sebagai Parquet"
+        )
+        if not filename: return
+
+        total = len(filtered_data)
+        entries = (entry for _, entry in zip(range(total), filtered_data))
+
+        def work(progress, cancel_event):
+            # pyarrow baru diimpor di sini, di thread latar belakang
+            import parquet_export
+            try:
+                return parquet_export.write_parquet(entries, filename, total, progress, cancel_event)
+            except parquet_export.ParquetCancelled:
+                raise ExportCancelled()
+
+        self._run_in_background(
+            "Export ke Parquet", total, work,
+            lambda _: messagebox.showinfo("Sukses", f"Data berhasil diekspor ke:\n{filename}"),
+            metric="ekspor_parquet"
+        )
+
+
+def main(argv=None):
+    """
+    Ekspor tanpa GUI untuk dijadwalkan, mis. `python export_manager.py pdf laporan.pdf --ringkasan`
+    atau sinkronisasi malam `python export_manager.py parquet ekspor/ --inkremental`.
+    """
+    import history_store
+
+    parser = argparse.ArgumentParser(description="Ekspor riwayat diagnosis tanpa GUI.")
+    parser.add_argument("format", choices=["csv", "pdf", "parquet"], help="format ekspor")
+    parser.add_argument("output", help="file tujuan (direktori tujuan untuk --inkremental)")
+    parser.add_argument("--riwayat", default="riwayat_diagnosis.jsonl", help="store riwayat (.jsonl, .db, atau .json)")
+    parser.add_argument("--ringkasan", action="store_true", help="PDF hanya berisi ringkasan per diagnosis dan per bulan")
+    parser.add_argument("--inkremental", action="store_true",
+                        help="parquet: hanya entri baru sejak ekspor inkremental terakhir, sebagai file bagian baru di direktori OUTPUT")
+    args = parser.parse_args(argv)
+    if args.inkremental and args.format != "parquet":
+        parser.error("--inkremental hanya untuk format parquet")
+    if args.format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        print("✗ Ekspor Parquet memerlukan pustaka pyarrow (pip install pyarrow)", file=sys.stderr)
+        return 1
+
+    store = history_store.open_history_store(args.riwayat)
+    try:
+        if args.inkremental:
+            import parquet_export
+            try:
+                count, part_file = parquet_export.export_incremental(store, args.output)
+            except ValueError as e:
+                print(f"✗ Ekspor inkremental tidak dapat dilanjutkan: {e}. Lakukan ekspor penuh ke direktori baru.", file=sys.stderr)
+                return 1
+            print(f"✓ {count} entri baru diekspor" + (f" ke {part_file}" if part_file else ""), file=sys.stderr)
+            return 0
+        if args.format == "pdf":
+            import pdf_report
+            count = pdf_report.generate_pdf_report(store.iter_entries(), args.output, summary_only=args.ringkasan)
+        elif args.format == "parquet":
+            import parquet_export
+            count = parquet_export.write_parquet(store.iter_entries(), args.output)
+        else:
+            count = export_csv_stream(store.iter_entries(), args.output)
+    finally:
+        store.close()
+    print(f"✓ {count} entri diekspor ke {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
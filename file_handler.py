@@ -1,40 +1,147 @@
 import json
 import os
+import re
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime
 from tkinter import messagebox
 
-def load_app_data(file_path):
-    """Memuat data gejala, aturan, dan solusi dari file JSON utama."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        print(f"✓ Data aplikasi berhasil dimuat dari {file_path}")
-        return data.get("gejala", []), data.get("aturan", []), data.get("solusi", {})
-    except FileNotFoundError:
-        messagebox.showerror("Error Kritis", f"File data '{file_path}' tidak ditemukan! Aplikasi akan ditutup.")
-        return None, None, None
-    except json.JSONDecodeError:
-        messagebox.showerror("Error Kritis", f"Format file data '{file_path}' tidak valid! Aplikasi akan ditutup.")
-        return None, None, None
-
-def load_history(file_path):
+def _report_info(message, headless):
+    # Mode headless menulis status ke stderr agar stdout tetap bersih untuk hasil
+    print(message, file=sys.stderr if headless else sys.stdout)
+
+def _report_error(title, message, headless):
+    if headless:
+        print(f"✗ {title}: {message}", file=sys.stderr)
+    else:
+        messagebox.showerror(title, message)
+
+def load_history(file_path, headless=False):
     """Memuat riwayat diagnosis dari file JSON."""
     try:
         if os.path.exists(file_path):
             with open(file_path, 'r', encoding='utf-8') as file:
                 riwayat = json.load(file)
-            print(f"✓ Riwayat dimuat: {len(riwayat)} entri")
+            _report_info(f"✓ Riwayat dimuat: {len(riwayat)} entri", headless)
             return riwayat
     except (FileNotFoundError, json.JSONDecodeError):
-        print("⚠ Riwayat tidak dapat dimuat, akan dibuat file baru.")
+        _report_info("⚠ Riwayat tidak dapat dimuat, akan dibuat file baru.", headless)
     return []
 
-def save_history(file_path, data):
+def save_history(file_path, data, headless=False):
     """Menyimpan riwayat diagnosis ke file JSON."""
     try:
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, indent=4, ensure_ascii=False)
-        print("✓ Riwayat berhasil disimpan")
+        # Tulis ke file sementara lalu ganti, agar file lama tidak rusak bila proses terhenti
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(list(data), file, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, file_path)
+        _report_info("✓ Riwayat berhasil disimpan", headless)
         return True
     except Exception as e:
-        messagebox.showerror("Error", f"Gagal menyimpan riwayat: {str(e)}")
-        return False
\ No newline at end of file
+        _report_error("Error", f"Gagal menyimpan riwayat: {str(e)}", headless)
+        return False
+
+# Tata letak id entri (63 bit): milidetik sejak EPOCH_ID_MS | nomor node | urutan
+EPOCH_ID_MS = 1577836800000  # 2020-01-01 UTC; cukup sampai sekitar tahun 2089
+BIT_NODE = 12
+BIT_URUTAN = 10
+
+_id_lock = threading.Lock()
+_id_node = None
+_id_ms = 0
+_id_seq = 0
+
+def _reset_entry_ids():
+    # Proses anak hasil fork tidak boleh memakai node dan urutan milik induknya
+    global _id_lock, _id_node, _id_ms, _id_seq
+    _id_lock = threading.Lock()
+    _id_node, _id_ms, _id_seq = None, 0, 0
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_entry_ids)
+
+def entry_node():
+    """Nomor node id proses ini; dipilih acak saat pertama kali dibutuhkan."""
+    global _id_node
+    with _id_lock:
+        if _id_node is None:
+            _id_node = secrets.randbits(BIT_NODE)
+        return _id_node
+
+def set_entry_node(node):
+    """Menetapkan nomor node id proses ini, mis. agar setiap worker batch pasti berbeda."""
+    global _id_node
+    with _id_lock:
+        _id_node = node % (1 << BIT_NODE)
+
+def assign_worker_node(counter):
+    """
+    Initializer worker: mengambil nomor node berikutnya dari `counter`
+    (multiprocessing.Value bersama), sehingga worker dalam satu pool tidak
+    pernah berbagi node.
+    """
+    with counter.get_lock():
+        counter.value += 1
+        node = counter.value
+    set_entry_node(node)
+
+def new_entry_id():
+    """
+    Id entri riwayat yang unik: milidetik sejak EPOCH_ID_MS di bit atas, lalu
+    12 bit nomor node per proses dan 10 bit urutan. Bila urutan habis dalam
+    satu milidetik, id berikutnya menunggu milidetik baru, sehingga id dalam
+    satu proses selalu naik. Proses berbeda hanya dapat bentrok bila nomor
+    nodenya sama; worker batch diberi nomor berbeda lewat assign_worker_node.
+    Entri lama tanpa id diberi id negatif sesuai urutannya (lihat history_store).
+    """
+    global _id_node, _id_ms, _id_seq
+    with _id_lock:
+        if _id_node is None:
+            _id_node = secrets.randbits(BIT_NODE)
+        now = int(time.time() * 1000)
+        if now > _id_ms:
+            _id_ms, _id_seq = now, 0
+        else:
+            _id_seq += 1
+            if _id_seq >> BIT_URUTAN:
+                while now <= _id_ms:
+                    time.sleep(0.0001)
+                    now = int(time.time() * 1000)
+                _id_ms, _id_seq = now, 0
+        return (_id_ms - EPOCH_ID_MS) << (BIT_NODE + BIT_URUTAN) | _id_node << BIT_URUTAN | _id_seq
+
+def legacy_entry_id(ordinal):
+    """Id untuk entri lama tanpa id, dari urutannya (0 = terlama)."""
+    return -(ordinal + 1)
+
+# Awal rentang id entri yang dimigrasikan dari file riwayat array JSON lama
+AWAL_ID_MIGRASI = 1 << 40
+
+def migrated_entry_id(ordinal):
+    """
+    Id tetap untuk entri file riwayat lama yang dimigrasikan, dari urutannya
+    (0 = terlama). Rentangnya terpisah dari legacy_entry_id agar tidak bentrok
+    dengan entri tanpa id yang sudah ada di store.
+    """
+    return -(ordinal + 1) - AWAL_ID_MIGRASI
+
+def create_history_entry(gejala_nama, result, tanggal=None, jejak=None):
+    """Membuat satu entri riwayat dari nama gejala dan DiagnosisResult, beserta jejak inferensinya bila ada."""
+    entry = {
+        "id": new_entry_id(),
+        "tanggal": tanggal or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "gejala": gejala_nama, "diagnosis": result.diagnosis_str,
+        "tingkat_keyakinan": result.max_confidence, "rekomendasi": list(result.recommendations)
+    }
+    if jejak is not None:
+        entry["jejak"] = jejak.to_dict()
+    return entry
+
+_DIAGNOSIS_LABEL = re.compile(r'(.+?) \((\d+(?:\.\d+)?)%\)(?:, |$)')
+
+def parse_diagnosis_labels(diagnosis):
+    """Memecah teks diagnosis riwayat menjadi daftar (nama diagnosis, bobot)."""
+    return [(nama, float(persen) / 100) for nama, persen in _DIAGNOSIS_LABEL.findall(diagnosis)]
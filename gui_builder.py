@@ -1,9 +1,17 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 
+from history_index import NAMA_BULAN
+from history_view import HistoryTreeView
+from inference_trace import NAMA_TINGKAT_JEJAK
+from symptom_picker import SymptomPicker, Tooltip
+
 class GuiBuilder:
     def __init__(self, app):
         self.app = app
+        # Satu jendela tooltip untuk seluruh aplikasi
+        self.tooltip = Tooltip(app.root)
+        self.symptom_picker = None
 
     def create_main_tabs(self):
         style = ttk.Style()
@@ -17,15 +25,20 @@ class GuiBuilder:
 
         self.app.tab_diagnosis = ttk.Frame(self.app.notebook)
         self.app.tab_riwayat = ttk.Frame(self.app.notebook)
+        self.app.tab_analitik = ttk.Frame(self.app.notebook)
         self.app.tab_info = ttk.Frame(self.app.notebook)
 
         self.app.notebook.add(self.app.tab_diagnosis, text="🔍 Diagnosis")
         self.app.notebook.add(self.app.tab_riwayat, text="📋 Riwayat Diagnosis")
+        self.app.notebook.add(self.app.tab_analitik, text="📈 Analitik")
         self.app.notebook.add(self.app.tab_info, text="ℹ️ Info Penyakit")
 
         self.create_diagnosis_tab()
         self.create_riwayat_tab()
+        self.create_analitik_tab()
         self.create_info_tab()
+        # Ringkasan analitik baru digambar saat tabnya dibuka
+        self.app.notebook.bind("<<NotebookTabChanged>>", lambda e: self.app.update_analitik_view())
 
     def create_diagnosis_tab(self):
         main_canvas = tk.Canvas(self.app.tab_diagnosis, highlightthickness=0)
@@ -43,29 +56,19 @@ class GuiBuilder:
         ttk.Label(header_frame, text="🏥 Sistem Pakar Diagnosis Flu", font=("Arial", 18, "bold")).pack()
         ttk.Label(header_frame, text="Pilih gejala yang Anda alami:", font=("Arial", 12)).pack(pady=5)
 
-        gejala_outer_frame = ttk.Frame(scrollable_container)
-        gejala_outer_frame.pack(fill='x', expand=True, padx=5, pady=5)
-        gejala_outer_frame.grid_columnconfigure((0, 1, 2), weight=1)
-        
-        kategori_frames = {}
-        for i, nama_kategori in enumerate(["Gejala Umum", "Gejala Pernapasan", "Gejala Lainnya"]):
-            frame = ttk.LabelFrame(gejala_outer_frame, text=f"📌 {nama_kategori}", padding=(10, 5))
-            frame.grid(row=0, column=i, sticky="nsew", padx=5, pady=5)
-            kategori_frames[nama_kategori] = frame
-        
-        for gejala in self.app.gejala_list:
-            kategori = gejala.get("kategori", "Gejala Lainnya")
-            if kategori in kategori_frames:
-                var = tk.BooleanVar()
-                self.app.gejala_vars[gejala["id"]] = var
-                cb = ttk.Checkbutton(kategori_frames[kategori], text=gejala["nama"], variable=var)
-                cb.pack(anchor='w', padx=5, pady=2)
-                self.create_tooltip(cb, gejala.get("deskripsi", "Tidak ada deskripsi"))
+        self.gejala_outer_frame = ttk.LabelFrame(scrollable_container, text="📌 Daftar Gejala", padding=(5, 5))
+        self.gejala_outer_frame.pack(fill='x', expand=True, padx=10, pady=5)
+        self.build_gejala_panel()
 
         btn_frame = ttk.Frame(scrollable_container)
         btn_frame.pack(fill='x', padx=10, pady=10)
-        ttk.Button(btn_frame, text="🔍 Mulai Diagnosis", command=self.app.run_diagnosis, style="Accent.TButton").pack(side='left', padx=5)
-        ttk.Button(btn_frame, text="🔄 Reset Form", command=self.app.reset_form).pack(side='left', padx=5)
+        self.app.diagnosis_button = ttk.Button(btn_frame, text="🔍 Mulai Diagnosis", command=self.app.run_diagnosis, style="Accent.TButton")
+        self.app.diagnosis_button.pack(side='left', padx=5)
+        self.app.reset_button = ttk.Button(btn_frame, text="🔄 Reset Form", command=self.app.reset_form)
+        self.app.reset_button.pack(side='left', padx=5)
+        self.app.trace_level_var = tk.StringVar(value='Lengkap')
+        ttk.Combobox(btn_frame, textvariable=self.app.trace_level_var, values=list(NAMA_TINGKAT_JEJAK), state="readonly", width=10).pack(side='right', padx=5)
+        ttk.Label(btn_frame, text="Detail log:").pack(side='right')
 
         result_frame = ttk.LabelFrame(scrollable_container, text="📊 Hasil Diagnosis")
         result_frame.pack(fill='x', expand=True, padx=10, pady=10)
@@ -84,6 +87,14 @@ class GuiBuilder:
         self.app.result_text.pack(fill='both', expand=True, padx=5, pady=5)
         self.app.reset_form()
 
+    def build_gejala_panel(self):
+        """Membangun panel gejala, atau hanya mengganti katalognya bila panel sudah ada (pilihan yang masih ada dipertahankan)."""
+        if self.symptom_picker is not None:
+            self.symptom_picker.set_catalogue(self.app.gejala_list)
+            return
+        self.symptom_picker = SymptomPicker(self.gejala_outer_frame, self.app.gejala_list, self.app.gejala_selection, self.tooltip)
+        self.symptom_picker.pack(fill='both', expand=True)
+
     def create_riwayat_tab(self):
         # Frame Pencarian
         search_frame = ttk.LabelFrame(self.app.tab_riwayat, text="🔍 Pencarian & Filter")
@@ -92,7 +103,7 @@ class GuiBuilder:
         search_input_frame.pack(fill='x', padx=5, pady=5)
         
         # Widget Pencarian Teks
-        ttk.Label(search_input_frame, text="Cari diagnosis:").pack(side='left', padx=5)
+        ttk.Label(search_input_frame, text="Cari diagnosis/gejala:").pack(side='left', padx=5)
         self.app.search_var = tk.StringVar()
         self.app.search_var.trace('w', self.app.filter_riwayat)
         search_entry = ttk.Entry(search_input_frame, textvariable=self.app.search_var, width=30)
@@ -102,10 +113,21 @@ class GuiBuilder:
         ttk.Label(search_input_frame, text="Filter bulan:").pack(side='left', padx=(20, 5))
         self.app.month_filter_var = tk.StringVar()
         month_combo = ttk.Combobox(search_input_frame, textvariable=self.app.month_filter_var, width=15, state="readonly")
-        month_combo['values'] = ['Semua', 'Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli', 'Agustus', 'September', 'Oktober', 'November', 'Desember']
+        month_combo['values'] = ['Semua'] + list(NAMA_BULAN)
         month_combo.pack(side='left', padx=5)
         ttk.Button(search_input_frame, text="🗑️ Clear", command=self.app.clear_filters).pack(side='left', padx=5)
 
+        # Widget Rentang Tanggal (format YYYY-MM-DD, boleh awalan seperti 2025-03)
+        date_range_frame = ttk.Frame(search_frame)
+        date_range_frame.pack(fill='x', padx=5, pady=(0, 5))
+        ttk.Label(date_range_frame, text="Dari tanggal:").pack(side='left', padx=5)
+        self.app.date_from_var = tk.StringVar()
+        ttk.Entry(date_range_frame, textvariable=self.app.date_from_var, width=12).pack(side='left', padx=5)
+        ttk.Label(date_range_frame, text="Sampai:").pack(side='left', padx=(20, 5))
+        self.app.date_to_var = tk.StringVar()
+        ttk.Entry(date_range_frame, textvariable=self.app.date_to_var, width=12).pack(side='left', padx=5)
+        ttk.Label(date_range_frame, text="(YYYY-MM-DD)", font=("Arial", 8)).pack(side='left', padx=5)
+
         # --- PEMBUATAN WIDGET UTAMA (TREEVIEW) DILAKUKAN DI SINI ---
         tree_frame = ttk.Frame(self.app.tab_riwayat)
         tree_frame.pack(fill='both', expand=True, padx=10, pady=5)
@@ -117,29 +139,68 @@ class GuiBuilder:
         self.app.tree.column('tanggal', width=180, anchor='center')
         self.app.tree.column('diagnosis', width=400)
         self.app.tree.column('tingkat_keyakinan', width=150, anchor='center')
-        tree_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.app.tree.yview)
-        self.app.tree.configure(yscrollcommand=tree_scrollbar.set)
+        tree_scrollbar = ttk.Scrollbar(tree_frame, orient='vertical')
         self.app.tree.pack(side='left', fill='both', expand=True)
         tree_scrollbar.pack(side='right', fill='y')
+        # Hanya baris yang terlihat yang dibuat sebagai item Treeview
+        self.app.history_view = HistoryTreeView(
+            self.app.tree, tree_scrollbar, lambda entry_id: self.app.history_index.get(entry_id)
+        )
         self.app.tree.bind("<Double-1>", self.app.show_riwayat_detail)
+        self.app.tree.bind("<Delete>", lambda e: self.app.hapus_entri())
         
         # Frame Tombol Aksi
         action_frame = ttk.Frame(self.app.tab_riwayat)
         action_frame.pack(fill='x', padx=10, pady=5)
         ttk.Button(action_frame, text="📄 Export ke CSV", command=lambda: self.app.export_manager.export_to_csv(self.app.filtered_riwayat), style="Success.TButton").pack(side='left', padx=5)
         ttk.Button(action_frame, text="📑 Export ke PDF", command=lambda: self.app.export_manager.export_to_pdf(self.app.filtered_riwayat), style="Success.TButton").pack(side='left', padx=5)
+        ttk.Button(action_frame, text="📊 Export ke Parquet", command=lambda: self.app.export_manager.export_to_parquet(self.app.filtered_riwayat), style="Success.TButton").pack(side='left', padx=5)
         ttk.Button(action_frame, text="🗑️ Hapus Semua Riwayat", command=self.app.hapus_riwayat, style="Warning.TButton").pack(side='right', padx=5)
+        ttk.Button(action_frame, text="❌ Hapus Entri Terpilih", command=self.app.hapus_entri, style="Warning.TButton").pack(side='right', padx=5)
         self.app.info_label = ttk.Label(action_frame, text="", font=("Arial", 9))
         self.app.info_label.pack(side='right', padx=20)
         
         # --- PERUBAHAN KUNCI ADA DI SINI ---
         # Atur trace dan nilai default SETELAH semua widget (terutama self.app.tree) dibuat
         self.app.month_filter_var.trace('w', self.app.filter_riwayat)
+        self.app.date_from_var.trace('w', self.app.filter_riwayat)
+        self.app.date_to_var.trace('w', self.app.filter_riwayat)
         month_combo.set('Semua') # Pemicu pertama kali terjadi di sini, tapi sekarang aman
         
         # Panggil update_riwayat_tree secara manual untuk memastikan data awal dimuat jika riwayat sudah ada
         self.app.update_riwayat_tree()
 
+    def create_analitik_tab(self):
+        header_frame = ttk.Frame(self.app.tab_analitik)
+        header_frame.pack(fill='x', padx=10, pady=5)
+        self.app.analitik_label = ttk.Label(header_frame, text="⏳ Memuat ringkasan...", font=("Arial", 10, "bold"))
+        self.app.analitik_label.pack(side='left', padx=5)
+        self.app.rebuild_analitik_button = ttk.Button(header_frame, text="🔄 Bangun Ulang Ringkasan", command=self.app.rebuild_analitik)
+        self.app.rebuild_analitik_button.pack(side='right', padx=5)
+
+        grid_frame = ttk.Frame(self.app.tab_analitik)
+        grid_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        grid_frame.grid_columnconfigure((0, 1), weight=1)
+        grid_frame.grid_rowconfigure((0, 1), weight=1)
+
+        # Setiap tabel hanya memuat baris ringkasan yang jumlahnya terbatas
+        tables = {}
+        for row, column, key, title, headings in (
+            (0, 0, 'bulan', "📅 Diagnosis per Bulan", (('periode', 'Bulan', 110), ('jumlah', 'Jumlah', 70), ('teratas', 'Diagnosis Terbanyak', 260))),
+            (0, 1, 'hari', "🗓️ Diagnosis per Hari", (('periode', 'Tanggal', 110), ('jumlah', 'Jumlah', 70), ('teratas', 'Diagnosis Terbanyak', 260))),
+            (1, 0, 'gejala', "🤒 Gejala Tersering", (('gejala', 'Gejala', 220), ('jumlah', 'Jumlah', 70), ('persen', '% Diagnosis', 90))),
+            (1, 1, 'keyakinan', "📊 Distribusi Tingkat Keyakinan", (('rentang', 'Rentang', 100), ('jumlah', 'Jumlah', 70), ('grafik', '', 250))),
+        ):
+            frame = ttk.LabelFrame(grid_frame, text=title)
+            frame.grid(row=row, column=column, sticky="nsew", padx=5, pady=5)
+            tree = ttk.Treeview(frame, columns=[name for name, _, _ in headings], show='headings', height=10)
+            for name, text, width in headings:
+                tree.heading(name, text=text)
+                tree.column(name, width=width, anchor='w' if name in ('teratas', 'gejala', 'grafik') else 'center')
+            tree.pack(fill='both', expand=True, padx=5, pady=5)
+            tables[key] = tree
+        self.app.analitik_tables = tables
+
     def create_info_tab(self):
         info_text = scrolledtext.ScrolledText(self.app.tab_info, wrap=tk.WORD, width=80, height=20, font=("Arial", 11), bd=1, relief="solid")
         info_text.pack(padx=15, pady=15, fill="both", expand=True)
@@ -198,18 +259,4 @@ Flu adalah infeksi virus yang menyerang sistem pernapasan bagian atas dan bawah.
 ⚕️ KONSULTASI MEDIS:
 Selalu konsultasikan kondisi Anda dengan tenaga medis profesional untuk mendapatkan diagnosis dan pengobatan yang tepat. Sistem pakar ini hanya sebagai alat bantu awal dan tidak menggantikan konsultasi medis."""
         info_text.insert(tk.END, info_content)
-        info_text.config(state=tk.DISABLED)
-
-    def create_tooltip(self, widget, text):
-        def on_enter(event):
-            tooltip = tk.Toplevel(widget)
-            tooltip.wm_overrideredirect(True)
-            tooltip.wm_geometry(f"+{event.x_root+15}+{event.y_root+10}")
-            label = tk.Label(tooltip, text=text, background="#FFFACD", relief="solid", borderwidth=1, font=("Arial", 9), padx=5, pady=3)
-            label.pack()
-            widget.tooltip = tooltip
-        def on_leave(event):
-            if hasattr(widget, 'tooltip'):
-                widget.tooltip.destroy()
-        widget.bind("<Enter>", on_enter)
-        widget.bind("<Leave>", on_leave)
\ No newline at end of file
+        info_text.config(state=tk.DISABLED)
\ No newline at end of file
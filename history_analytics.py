@@ -0,0 +1,188 @@
+import argparse
+import heapq
+import json
+import os
+import sqlite3
+import sys
+
+import history_store
+from file_handler import parse_diagnosis_labels
+
+# Jumlah bin distribusi tingkat keyakinan (masing-masing selebar 10%)
+BIN_KEYAKINAN = 10
+# Jumlah bulan, hari, dan gejala yang ditampilkan di tab analitik
+BULAN_DITAMPILKAN = 12
+HARI_DITAMPILKAN = 30
+GEJALA_DITAMPILKAN = 15
+
+
+def analytics_path(riwayat_file):
+    """File ringkasan analitik yang disimpan di samping file riwayat."""
+    return f"{riwayat_file}.analitik.json"
+
+
+def _bump(counts, key, amount):
+    value = counts.get(key, 0) + amount
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+class HistoryAnalytics:
+    """
+    Ringkasan riwayat yang diperbarui per entri: jumlah entri dan jumlah per
+    diagnosis per hari dan per bulan, frekuensi gejala, dan distribusi
+    tingkat keyakinan. Entri dengan beberapa diagnosis dihitung sekali di
+    jumlah entri, tetapi sekali per diagnosis di rincian diagnosisnya.
+
+    Ringkasan disimpan bersama watermark store riwayat (lihat
+    history_store.*.read_appended), sehingga saat dibuka cukup membaca entri
+    yang ditambahkan sejak terakhir disimpan. Penghapusan entri dikurangkan
+    oleh pemanggil lewat remove(); rebuild() menghitung ulang dari awal.
+    """
+
+    def __init__(self, file_path=None):
+        self.file_path = file_path
+        self.reset()
+
+    def reset(self):
+        self.total = 0
+        self.per_day = {}
+        self.per_month = {}
+        self.entries_per_day = {}
+        self.entries_per_month = {}
+        self.symptoms = {}
+        self.confidence = [0] * BIN_KEYAKINAN
+        # Posisi store yang sudah tercakup; None berarti belum ada entri yang dibaca
+        self.watermark = None
+
+    @classmethod
+    def load(cls, file_path):
+        """Memuat ringkasan tersimpan; file yang hilang atau rusak menghasilkan ringkasan kosong."""
+        analytics = cls(file_path)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            analytics.total = data["jumlah"]
+            analytics.per_day = data["per_hari"]
+            analytics.per_month = data["per_bulan"]
+            analytics.entries_per_day = data["entri_per_hari"]
+            analytics.entries_per_month = data["entri_per_bulan"]
+            analytics.symptoms = data["gejala"]
+            analytics.confidence = data["keyakinan"]
+            analytics.watermark = data["watermark"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError):
+            print(f"⚠ Ringkasan analitik {file_path} tidak dapat dibaca, akan dibangun ulang.")
+            analytics.reset()
+        return analytics
+
+    def save(self):
+        """Menulis ringkasan secara atomik (tulis ke .tmp lalu ganti)."""
+        if not self.file_path:
+            return
+        data = {
+            "watermark": self.watermark, "jumlah": self.total, "per_hari": self.per_day,
+            "per_bulan": self.per_month, "entri_per_hari": self.entries_per_day,
+            "entri_per_bulan": self.entries_per_month, "gejala": self.symptoms, "keyakinan": self.confidence,
+        }
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(tmp_path, self.file_path)
+
+    def _apply(self, entry, amount):
+        tanggal = entry["tanggal"]
+        names = [nama for nama, _ in parse_diagnosis_labels(entry["diagnosis"])] or [entry["diagnosis"]]
+        for buckets, totals, key in ((self.per_day, self.entries_per_day, tanggal[:10]),
+                                     (self.per_month, self.entries_per_month, tanggal[:7])):
+            counts = buckets.setdefault(key, {})
+            for nama in names:
+                _bump(counts, nama, amount)
+            if not counts:
+                del buckets[key]
+            _bump(totals, key, amount)
+        for gejala in entry["gejala"]:
+            _bump(self.symptoms, gejala, amount)
+        self.confidence[min(int(entry["tingkat_keyakinan"] * BIN_KEYAKINAN), BIN_KEYAKINAN - 1)] += amount
+        self.total += amount
+
+    def add(self, entry):
+        self._apply(entry, 1)
+
+    def remove(self, entry):
+        """Mengurangkan entri yang dihapus dari riwayat."""
+        self._apply(entry, -1)
+
+    def catch_up(self, store):
+        """
+        Menambahkan entri yang ditulis ke store sejak watermark; biayanya
+        sebanding dengan jumlah entri baru. Bila store sudah dikosongkan atau
+        ditulis ulang sejak itu, ringkasan dibangun ulang dari awal.
+        Mengembalikan jumlah entri yang ditambahkan.
+        """
+        try:
+            entries, watermark = store.read_appended(self.watermark)
+        except ValueError:
+            self.reset()
+            entries, watermark = store.read_appended(None)
+        for entry in entries:
+            self.add(entry)
+        self.watermark = watermark
+        return len(entries)
+
+    def rebuild(self, store):
+        """Menghitung ulang seluruh ringkasan dari isi store."""
+        self.reset()
+        return self.catch_up(store)
+
+    # --- tampilan; biayanya tergantung jumlah hari/gejala, bukan panjang riwayat ---
+
+    def recent_months(self, limit=BULAN_DITAMPILKAN):
+        """[(YYYY-MM, jumlah, [(diagnosis, jumlah), ...])] untuk `limit` bulan terakhir, terbaru di depan."""
+        return [(month, self.entries_per_month[month], _ranked(self.per_month.get(month, {})))
+                for month in heapq.nlargest(limit, self.entries_per_month)]
+
+    def recent_days(self, limit=HARI_DITAMPILKAN):
+        """[(YYYY-MM-DD, jumlah, [(diagnosis, jumlah), ...])] untuk `limit` hari terakhir, terbaru di depan."""
+        return [(day, self.entries_per_day[day], _ranked(self.per_day.get(day, {})))
+                for day in heapq.nlargest(limit, self.entries_per_day)]
+
+    def top_symptoms(self, limit=GEJALA_DITAMPILKAN):
+        return heapq.nlargest(limit, self.symptoms.items(), key=lambda item: item[1])
+
+    def confidence_distribution(self):
+        """[(batas bawah, batas atas, jumlah)] dalam persen."""
+        width = 100 // BIN_KEYAKINAN
+        return [(i * width, (i + 1) * width, count) for i, count in enumerate(self.confidence)]
+
+
+def _ranked(counts):
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def main(argv=None):
+    """Membangun ulang ringkasan analitik, mis. `python history_analytics.py riwayat_diagnosis.jsonl`."""
+    parser = argparse.ArgumentParser(description="Bangun ulang ringkasan analitik riwayat diagnosis")
+    parser.add_argument("riwayat", help="store riwayat (.jsonl, .db, atau .json)")
+    parser.add_argument("--lanjutkan", action="store_true",
+                        help="hanya tambahkan entri baru sejak watermark, bukan bangun ulang penuh")
+    args = parser.parse_args(argv)
+
+    try:
+        store = history_store.open_history_store(args.riwayat)
+        analytics = HistoryAnalytics.load(analytics_path(args.riwayat))
+        added = analytics.catch_up(store) if args.lanjutkan else analytics.rebuild(store)
+        store.close()
+        analytics.save()
+    except (OSError, sqlite3.Error) as e:
+        print(f"✗ Gagal membangun ringkasan analitik: {e}", file=sys.stderr)
+        return 1
+    print(f"✓ Ringkasan analitik diperbarui: {added} entri dibaca, total {analytics.total} entri -> {analytics.file_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+from array import array
+from bisect import bisect_left, bisect_right, insort
+
+from history_table import HistoryTable
+
+NAMA_BULAN = {
+    'Januari': '01', 'Februari': '02', 'Maret': '03', 'April': '04', 'Mei': '05', 'Juni': '06',
+    'Juli': '07', 'Agustus': '08', 'September': '09', 'Oktober': '10', 'November': '11', 'Desember': '12'
+}
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class HistoryResults:
+    """
+    Tampilan hasil pencarian (terbaru di depan) berupa array nomor urut atas
+    HistoryTable; dict entri baru disusun saat baris diakses.
+
+    Tanpa `seqs`, tampilan mencakup seluruh tabel saat dibuat kecuali nomor
+    urut di `removed`; baris ke-i dicari dengan pencarian biner atas daftar
+    entri terhapus, sehingga penghapusan tidak perlu menyalin daftar nomor
+    urut. Entri yang ditambahkan ke tabel setelahnya tidak ikut terlihat.
+    """
+
+    def __init__(self, entries, seqs=None, removed=()):
+        self._entries = entries
+        self._seqs = seqs
+        # Nomor urut entri terbaru saat tampilan dibuat
+        self._last = len(entries) - 1
+        # Posisi entri terhapus dihitung dari entri terbaru, terurut naik
+        self._removed = sorted(self._last - seq for seq in removed) if seqs is None else []
+
+    def __len__(self):
+        return self._last + 1 - len(self._removed) if self._seqs is None else len(self._seqs)
+
+    def _position(self, i):
+        # Posisi (dari entri terbaru) baris ke-i yang tidak terhapus
+        position = i
+        while True:
+            shifted = i + bisect_right(self._removed, position)
+            if shifted == position:
+                return position
+            position = shifted
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self._seqs is None:
+            return self._entries[self._last - self._position(i)]
+        return self._entries[self._seqs[len(self._seqs) - 1 - i]]
+
+    def __iter__(self):
+        if self._seqs is None:
+            last, removed = self._last, set(self._removed)
+            return (self._entries[last - position] for position in range(last + 1) if position not in removed)
+        return (self._entries[seq] for seq in reversed(self._seqs))
+
+
+class HistoryIndex:
+    """
+    Indeks riwayat yang diperbarui setiap kali entri ditambahkan.
+
+    Berisi bucket per bulan dan per tanggal, serta indeks terbalik dari teks
+    diagnosis dan nama gejala (yang nilainya sangat berulang) ke nomor urut
+    entri. Teks-teks unik itu sendiri diindeks dengan trigram sehingga
+    pencarian substring tidak perlu memindai seluruh riwayat.
+
+    Entri disimpan dalam HistoryTable berbentuk kolom, dan semua daftar
+    nomor urut berupa array, sehingga satu entri hanya memakan puluhan byte.
+    Id entri dicari dengan pencarian biner atas array id yang terurut; entri
+    yang dihapus hanya ditandai di set `_removed` (O(1)) dan disaring dari
+    hasil pencarian.
+    """
+
+    def __init__(self, entries=()):
+        self.clear()
+        # `entries` mengikuti urutan aplikasi (terbaru di depan) dan boleh berupa
+        # iterator: entri langsung dimasukkan ke tabel kolom, lalu urutannya dibalik
+        table = self._table
+        for entry in entries:
+            table.append(entry)
+        table.reverse()
+        order = sorted(range(len(table)), key=table.ids.__getitem__)
+        self._id_keys = array('q', (table.ids[seq] for seq in order))
+        self._id_seqs = array('l', order)
+        for seq in range(len(table)):
+            self._index(seq)
+
+    def clear(self):
+        self._table = HistoryTable()
+        self._by_month = {}
+        self._by_date = {}
+        self._dates = []
+        self._postings = {}
+        self._trigram_keys = {}
+        # Kunci teks (huruf kecil) per nomor teks di tabel
+        self._text_keys = {}
+        # Id entri terurut beserta nomor urutnya
+        self._id_keys = array('q')
+        self._id_seqs = array('l')
+        self._removed = set()
+
+    def __len__(self):
+        return len(self._table) - len(self._removed)
+
+    def _seq_of(self, entry_id):
+        position = bisect_left(self._id_keys, entry_id)
+        if position == len(self._id_keys) or self._id_keys[position] != entry_id:
+            return None
+        seq = self._id_seqs[position]
+        return None if seq in self._removed else seq
+
+    def get(self, entry_id):
+        """Entri dengan id `entry_id`, atau None bila tidak ada atau sudah dihapus."""
+        seq = self._seq_of(entry_id)
+        return None if seq is None else self._table.entry(seq)
+
+    def remove(self, entry_id):
+        """Menandai entri sebagai terhapus; mengembalikan entri tersebut atau None."""
+        seq = self._seq_of(entry_id)
+        if seq is None:
+            return None
+        self._removed.add(seq)
+        return self._table.entry(seq)
+
+    def add(self, entry):
+        """Menambahkan entri baru (lebih baru dari semua entri sebelumnya)."""
+        seq = self._table.append(entry)
+        entry_id = entry["id"]
+        if not self._id_keys or entry_id > self._id_keys[-1]:
+            self._id_keys.append(entry_id)
+            self._id_seqs.append(seq)
+        else:
+            position = bisect_left(self._id_keys, entry_id)
+            self._id_keys.insert(position, entry_id)
+            self._id_seqs.insert(position, seq)
+        self._index(seq)
+        return seq
+
+    def _index(self, seq):
+        table = self._table
+        tanggal = table.tanggal(seq)
+        month = self._by_month.get(tanggal[5:7])
+        if month is None:
+            month = self._by_month[tanggal[5:7]] = array('l')
+        month.append(seq)
+        date = tanggal[:10]
+        if date not in self._by_date:
+            self._by_date[date] = array('l')
+            insort(self._dates, date)
+        self._by_date[date].append(seq)
+        self._add_text(self._text_key(table.diagnoses[seq]), seq)
+        for string_id in table.combos[table.symptoms[seq]]:
+            self._add_text(self._text_key(string_id), seq)
+
+    def _text_key(self, string_id):
+        key = self._text_keys.get(string_id)
+        if key is None:
+            key = self._text_keys[string_id] = self._table.strings[string_id].lower()
+        return key
+
+    def _add_text(self, key, seq):
+        postings = self._postings.get(key)
+        if postings is None:
+            postings = self._postings[key] = array('l')
+            for trigram in _trigrams(key):
+                self._trigram_keys.setdefault(trigram, set()).add(key)
+        if not postings or postings[-1] != seq:
+            postings.append(seq)
+
+    def _match_text(self, text):
+        trigrams = _trigrams(text)
+        if trigrams:
+            candidates = None
+            for trigram in sorted(trigrams, key=lambda t: len(self._trigram_keys.get(t, ()))):
+                keys = self._trigram_keys.get(trigram)
+                if not keys:
+                    return set()
+                candidates = set(keys) if candidates is None else candidates & keys
+        else:
+            candidates = self._postings.keys()
+        matched = [self._postings[key] for key in candidates if text in key]
+        if len(matched) == 1:
+            return matched[0]
+        seqs = set()
+        for postings in matched:
+            seqs.update(postings)
+        return seqs
+
+    def _match_dates(self, date_from, date_to):
+        lo = bisect_left(self._dates, date_from) if date_from else 0
+        # Batas akhir boleh berupa awalan, mis. "2025-03" mencakup seluruh Maret
+        hi = bisect_right(self._dates, date_to + '\uffff') if date_to else len(self._dates)
+        if hi - lo == 1:
+            return self._by_date[self._dates[lo]]
+        seqs = set()
+        for date in self._dates[lo:hi]:
+            seqs.update(self._by_date[date])
+        return seqs
+
+    def search(self, text='', month=None, date_from=None, date_to=None):
+        """
+        Mencari entri yang diagnosis atau salah satu gejalanya mengandung `text`,
+        pada bulan `month` ('01'..'12') dan rentang tanggal yang diberikan.
+        Hasil berupa HistoryResults yang diurutkan dari yang terbaru.
+
+        Setiap filter berupa array posting yang terurut atau set nomor urut;
+        bila hanya ada satu array, hasilnya cukup salinan array tersebut.
+        """
+        text = text.strip().lower()
+        filters = []
+        if month:
+            filters.append(self._by_month.get(month, array('l')))
+        if date_from or date_to:
+            filters.append(self._match_dates(date_from, date_to))
+        if text:
+            filters.append(self._match_text(text))
+        if not filters:
+            return HistoryResults(self._table, removed=self._removed)
+        filters.sort(key=len)
+        if len(filters) == 1 and isinstance(filters[0], array):
+            if not self._removed:
+                return HistoryResults(self._table, filters[0][:])
+            return HistoryResults(self._table, array('l', (seq for seq in filters[0] if seq not in self._removed)))
+        seqs = set(filters[0]).intersection(*filters[1:])
+        seqs.difference_update(self._removed)
+        return HistoryResults(self._table, array('l', sorted(seqs)))
@@ -0,0 +1,426 @@
+import json
+import os
+import sqlite3
+import threading
+
+import file_handler
+
+
+def _read_lines_reversed(file_path, block_size=1 << 16):
+    """Membaca baris file dari akhir ke awal tanpa memuat seluruh file."""
+    with open(file_path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        remainder = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            file.seek(position)
+            lines = (file.read(step) + remainder).split(b'\n')
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if remainder.strip():
+            yield remainder
+
+
+def assign_legacy_ids(entries):
+    """
+    Memberi id ke entri lama tanpa id; `entries` urut dari yang terlama.
+    Penanda hapus dilewati dan tidak ikut dihitung dalam urutan. Mengembalikan
+    jumlah entri yang diberi id.
+    """
+    assigned, ordinal = 0, 0
+    for entry in entries:
+        if "hapus" in entry:
+            continue
+        if "id" not in entry:
+            entry["id"] = file_handler.legacy_entry_id(ordinal)
+            assigned += 1
+        ordinal += 1
+    return assigned
+
+
+class JsonHistoryStore:
+    """Format lama: seluruh riwayat disimpan sebagai satu array JSON (terbaru di depan)."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load(self):
+        riwayat = file_handler.load_history(self.file_path, headless=True)
+        assign_legacy_ids(riwayat[::-1])
+        return riwayat
+
+    def iter_entries(self):
+        yield from self.load()
+
+    def append(self, entry):
+        return self.append_many([entry])
+
+    def append_many(self, entries):
+        riwayat = self.load()
+        riwayat[0:0] = reversed(entries)
+        return file_handler.save_history(self.file_path, riwayat, headless=True)
+
+    def delete(self, entry_ids):
+        entry_ids = set(entry_ids)
+        riwayat = [entry for entry in self.load() if entry["id"] not in entry_ids]
+        return file_handler.save_history(self.file_path, riwayat, headless=True)
+
+    def watermark(self):
+        """Posisi akhir store: id entri terbesar (id baru selalu lebih besar dari id lama)."""
+        return max((entry["id"] for entry in self.load()), default=0)
+
+    def read_appended(self, watermark):
+        """Entri yang ditambahkan setelah `watermark` (None: sejak awal), urut dari yang terlama, beserta watermark barunya."""
+        entries = [entry for entry in reversed(self.load()) if watermark is None or entry["id"] > watermark]
+        if not entries:
+            return [], watermark
+        return entries, max(entry["id"] for entry in entries)
+
+    def clear(self):
+        return file_handler.save_history(self.file_path, [], headless=True)
+
+    def close(self):
+        pass
+
+
+class JsonlHistoryStore:
+    """
+    Riwayat append-only: satu entri JSON per baris, urut dari yang terlama.
+
+    Setiap penambahan adalah satu write ke akhir file yang diikuti fsync,
+    sehingga biayanya O(1) per entri. Menghapus satu entri juga hanya
+    menambahkan baris penanda `{"hapus": id}`. Baris terakhir yang terpotong
+    akibat crash dibuang saat file dibuka.
+    """
+
+    def __init__(self, file_path, durable=True):
+        self.file_path = file_path
+        self.durable = durable
+        self._lock = threading.Lock()
+        self._repair_tail()
+        self._upgrade_legacy_ids()
+
+    def _repair_tail(self):
+        if not os.path.exists(self.file_path):
+            return
+        with open(self.file_path, 'rb+') as file:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            if size == 0:
+                return
+            file.seek(size - 1)
+            if file.read(1) == b'\n':
+                return
+            # Cari akhir baris utuh terakhir dan potong sisa tulisan yang gagal
+            position = size
+            while position > 0:
+                step = min(1 << 16, position)
+                position -= step
+                file.seek(position)
+                newline = file.read(step).rfind(b'\n')
+                if newline != -1:
+                    position += newline + 1
+                    break
+            file.truncate(position)
+            print(f"⚠ Baris riwayat terakhir yang tidak lengkap dibuang dari {self.file_path}")
+
+    def _first_entry(self):
+        # Entri pertama (bukan penanda hapus) di file, atau None
+        with open(self.file_path, 'rb') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(record, dict) and "hapus" not in record:
+                    return record
+        return None
+
+    def _upgrade_legacy_ids(self):
+        # Entri tanpa id selalu lebih tua dari entri ber-id, jadi cukup periksa entri pertama
+        try:
+            first = self._first_entry()
+        except FileNotFoundError:
+            return
+        if first is None or "id" in first:
+            return
+        with self._lock:
+            entries = []
+            with open(self.file_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(record, dict):
+                        entries.append(record)
+            assigned = assign_legacy_ids(entries)
+            data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+            _atomic_write(self.file_path, data.encode('utf-8'))
+        print(f"✓ {assigned} entri riwayat lama diberi id di {self.file_path}")
+
+    def load(self):
+        return list(self.iter_entries())
+
+    def iter_entries(self):
+        """Menghasilkan entri dari yang terbaru tanpa memuat seluruh file."""
+        if not os.path.exists(self.file_path):
+            return
+        # Penanda hapus selalu lebih baru dari entri yang dihapusnya, jadi terbaca lebih dulu
+        deleted = set()
+        for line in _read_lines_reversed(self.file_path):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "hapus" in record:
+                deleted.add(record["hapus"])
+            elif record.get("id") not in deleted:
+                yield record
+
+    def append(self, entry):
+        return self.append_many([entry])
+
+    def append_many(self, entries):
+        """Menambahkan entri (urut dari yang terlama) dalam satu write + fsync."""
+        data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries).encode('utf-8')
+        if not data:
+            return True
+        with self._lock:
+            fd = os.open(self.file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                if self.durable:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+        return True
+
+    def delete(self, entry_ids):
+        """Menghapus entri dengan menambahkan penanda hapus, tanpa menulis ulang file."""
+        return self.append_many([{"hapus": entry_id} for entry_id in entry_ids])
+
+    def watermark(self):
+        """Posisi akhir store: ukuran file dalam byte."""
+        try:
+            return os.path.getsize(self.file_path)
+        except FileNotFoundError:
+            return 0
+
+    def read_appended(self, watermark):
+        """
+        Entri yang ditambahkan setelah offset `watermark` (None: sejak awal),
+        urut dari yang terlama, beserta offset barunya; hanya bagian akhir
+        file yang dibaca.
+        Entri yang dihapus di dalam rentang itu ikut dibuang, sedangkan penanda
+        hapus untuk entri sebelum `watermark` dilewati. ValueError bila file
+        sudah dikosongkan atau ditulis ulang sejak `watermark`.
+        """
+        watermark = watermark or 0
+        try:
+            file = open(self.file_path, 'rb')
+        except FileNotFoundError:
+            if watermark:
+                raise ValueError("file riwayat sudah tidak ada")
+            return [], 0
+        with file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() < watermark:
+                raise ValueError("file riwayat lebih pendek dari watermark")
+            if watermark:
+                file.seek(watermark - 1)
+                if file.read(1) != b'\n':
+                    raise ValueError("watermark tidak berada di batas baris")
+            file.seek(watermark)
+            data = file.read()
+        end = data.rfind(b'\n') + 1
+        entries = {}
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "hapus" in record:
+                entries.pop(record["hapus"], None)
+            else:
+                entries[record.get("id")] = record
+        return list(entries.values()), watermark + end
+
+    def clear(self):
+        with self._lock:
+            _atomic_write(self.file_path, b'')
+        return True
+
+    def close(self):
+        pass
+
+
+class SqliteHistoryStore:
+    """Riwayat dalam file SQLite tertanam dengan indeks pada tanggal dan diagnosis."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(file_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS riwayat ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " tanggal TEXT NOT NULL,"
+                " diagnosis TEXT NOT NULL,"
+                " tingkat_keyakinan REAL NOT NULL,"
+                " gejala TEXT NOT NULL,"
+                " rekomendasi TEXT NOT NULL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(riwayat)")}
+            if "jejak" not in columns:
+                # Database lama dibuat sebelum jejak inferensi disimpan
+                self._conn.execute("ALTER TABLE riwayat ADD COLUMN jejak TEXT")
+            if "entry_id" not in columns:
+                # Database lama dibuat sebelum entri memiliki id; baris lama memakai -rowid
+                self._conn.execute("ALTER TABLE riwayat ADD COLUMN entry_id INTEGER")
+                self._conn.execute("UPDATE riwayat SET entry_id = -id WHERE entry_id IS NULL")
+            self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_riwayat_entry_id ON riwayat (entry_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_riwayat_tanggal ON riwayat (tanggal)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_riwayat_diagnosis ON riwayat (diagnosis)")
+
+    @staticmethod
+    def _row_to_entry(row):
+        entry_id, tanggal, diagnosis, tingkat_keyakinan, gejala, rekomendasi, jejak = row
+        entry = {
+            "id": entry_id, "tanggal": tanggal, "gejala": json.loads(gejala), "diagnosis": diagnosis,
+            "tingkat_keyakinan": tingkat_keyakinan, "rekomendasi": json.loads(rekomendasi)
+        }
+        if jejak is not None:
+            entry["jejak"] = json.loads(jejak)
+        return entry
+
+    def load(self):
+        return list(self.iter_entries())
+
+    def iter_entries(self):
+        # Paginasi berdasarkan id agar kunci tidak ditahan selama pemanggil mengiterasi
+        last_id = None
+        while True:
+            with self._lock:
+                if last_id is None:
+                    batch = self._conn.execute(
+                        "SELECT id, entry_id, tanggal, diagnosis, tingkat_keyakinan, gejala, rekomendasi, jejak"
+                        " FROM riwayat ORDER BY id DESC LIMIT 1000"
+                    ).fetchall()
+                else:
+                    batch = self._conn.execute(
+                        "SELECT id, entry_id, tanggal, diagnosis, tingkat_keyakinan, gejala, rekomendasi, jejak"
+                        " FROM riwayat WHERE id < ? ORDER BY id DESC LIMIT 1000", (last_id,)
+                    ).fetchall()
+            if not batch:
+                return
+            last_id = batch[-1][0]
+            for row in batch:
+                yield self._row_to_entry(row[1:])
+
+    def append(self, entry):
+        return self.append_many([entry])
+
+    def append_many(self, entries):
+        rows = [(
+            entry.get("id") or file_handler.new_entry_id(), entry["tanggal"], entry["diagnosis"], entry["tingkat_keyakinan"],
+            json.dumps(entry["gejala"], ensure_ascii=False), json.dumps(entry["rekomendasi"], ensure_ascii=False),
+            json.dumps(entry["jejak"], ensure_ascii=False) if "jejak" in entry else None
+        ) for entry in entries]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO riwayat (entry_id, tanggal, diagnosis, tingkat_keyakinan, gejala, rekomendasi, jejak)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return True
+
+    def delete(self, entry_ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM riwayat WHERE entry_id = ?", [(entry_id,) for entry_id in entry_ids])
+        return True
+
+    def watermark(self):
+        """Posisi akhir store: rowid terakhir yang pernah dipakai (AUTOINCREMENT tidak memakai ulang rowid)."""
+        with self._lock:
+            row = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'riwayat'").fetchone()
+        return row[0] if row else 0
+
+    def read_appended(self, watermark):
+        """Entri dengan rowid setelah `watermark` (None: sejak awal), urut dari yang terlama, beserta watermark barunya."""
+        watermark = watermark or 0
+        if watermark > self.watermark():
+            raise ValueError("database riwayat lebih lama dari watermark")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, entry_id, tanggal, diagnosis, tingkat_keyakinan, gejala, rekomendasi, jejak"
+                " FROM riwayat WHERE id > ? ORDER BY id", (watermark,)
+            ).fetchall()
+        return [self._row_to_entry(row[1:]) for row in rows], rows[-1][0] if rows else watermark
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM riwayat")
+        return True
+
+    def close(self):
+        self._conn.close()
+
+
+def _atomic_write(file_path, data):
+    """Menulis file lewat file sementara + os.replace agar tidak pernah setengah jadi."""
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, file_path)
+
+
+def migrate_legacy_history(legacy_file, store):
+    """Memindahkan riwayat format array JSON lama ke store baru (sekali saja)."""
+    if not legacy_file or not os.path.exists(legacy_file):
+        return 0
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as file:
+            riwayat = json.load(file)
+    except (OSError, json.JSONDecodeError):
+        print(f"⚠ Riwayat lama {legacy_file} tidak dapat dibaca, migrasi dilewati.")
+        return 0
+    if not isinstance(riwayat, list):
+        return 0
+    # Format lama menyimpan entri terbaru di depan
+    riwayat.reverse()
+    # Id tetap dari urutan entri: bila proses terhenti sebelum file lama diganti
+    # namanya, migrasi berikutnya melewati entri yang sudah masuk ke store
+    for ordinal, entry in enumerate(riwayat):
+        entry.setdefault("id", file_handler.migrated_entry_id(ordinal))
+    existing = {entry["id"] for entry in store.iter_entries()}
+    riwayat = [entry for entry in riwayat if entry["id"] not in existing]
+    if riwayat:
+        store.append_many(riwayat)
+    os.replace(legacy_file, f"{legacy_file}.migrated")
+    print(f"✓ {len(riwayat)} entri riwayat dimigrasikan dari {legacy_file}")
+    return len(riwayat)
+
+
+def open_history_store(file_path, legacy_file=None):
+    """Membuka store riwayat sesuai ekstensi file (.jsonl, .db/.sqlite, atau .json lama)."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.jsonl':
+        store = JsonlHistoryStore(file_path)
+    elif extension in ('.db', '.sqlite', '.sqlite3'):
+        store = SqliteHistoryStore(file_path)
+    else:
+        return JsonHistoryStore(file_path)
+    if legacy_file and os.path.abspath(legacy_file) != os.path.abspath(file_path):
+        migrate_legacy_history(legacy_file, store)
+    return store
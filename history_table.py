@@ -0,0 +1,121 @@
+import json
+from array import array
+
+
+def _encode_tanggal(tanggal):
+    """'YYYY-MM-DD HH:MM:SS' -> bilangan YYYYMMDDhhmmss, atau None untuk format lain."""
+    if len(tanggal) != 19 or tanggal[4] + tanggal[7] + tanggal[10] + tanggal[13] + tanggal[16] != '-- ::':
+        return None
+    digits = tanggal[0:4] + tanggal[5:7] + tanggal[8:10] + tanggal[11:13] + tanggal[14:16] + tanggal[17:19]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    return int(digits)
+
+
+class HistoryTable:
+    """
+    Riwayat dalam bentuk kolom yang ringkas.
+
+    Setiap entri hanya berupa beberapa angka di array: id, tanggal sebagai
+    bilangan YYYYMMDDhhmmss, tingkat keyakinan, nomor teks diagnosis, nomor
+    kombinasi gejala, nomor kombinasi rekomendasi, dan nomor jejak. Teks,
+    kombinasi, dan jejak yang sama disimpan sekali saja, sehingga nama gejala
+    dan kalimat rekomendasi yang berulang di setiap entri tidak ikut
+    digandakan. Dict entri baru disusun saat ditampilkan atau diekspor.
+    """
+
+    def __init__(self):
+        self.ids = array('q')
+        self.stamps = array('q')
+        self.confidences = array('d')
+        self.diagnoses = array('l')
+        self.symptoms = array('l')
+        self.recommendations = array('l')
+        self.traces = array('l')
+        # Tabel intern: teks, kombinasi (tuple nomor teks), dan jejak (-1 = tanpa jejak)
+        self.strings = []
+        self._string_ids = {}
+        self.combos = []
+        self._combo_ids = {}
+        # Teks setiap kombinasi (objek string yang sama dengan tabel teks)
+        self._combo_texts = []
+        self._traces = []
+        self._trace_ids = {}
+        # Tanggal yang tidak berformat standar disimpan apa adanya; cap tanggalnya bernilai negatif
+        self._raw_tanggal = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, seq):
+        return self.entry(seq)
+
+    def intern(self, text):
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def intern_combo(self, texts):
+        key = tuple(self.intern(text) for text in texts)
+        combo_id = self._combo_ids.get(key)
+        if combo_id is None:
+            combo_id = self._combo_ids[key] = len(self.combos)
+            self.combos.append(key)
+            self._combo_texts.append(tuple(self.strings[string_id] for string_id in key))
+        return combo_id
+
+    def _intern_trace(self, jejak):
+        if jejak is None:
+            return -1
+        key = json.dumps(jejak, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        trace_id = self._trace_ids.get(key)
+        if trace_id is None:
+            trace_id = self._trace_ids[key] = len(self._traces)
+            self._traces.append(jejak)
+        return trace_id
+
+    def append(self, entry):
+        """Menambahkan satu entri riwayat (dict) di akhir tabel; mengembalikan nomor urutnya."""
+        seq = len(self.ids)
+        stamp = _encode_tanggal(entry["tanggal"])
+        if stamp is None:
+            self._raw_tanggal.append(entry["tanggal"])
+            stamp = -len(self._raw_tanggal)
+        self.ids.append(entry["id"])
+        self.stamps.append(stamp)
+        self.confidences.append(entry["tingkat_keyakinan"])
+        self.diagnoses.append(self.intern(entry["diagnosis"]))
+        self.symptoms.append(self.intern_combo(entry["gejala"]))
+        self.recommendations.append(self.intern_combo(entry["rekomendasi"]))
+        self.traces.append(self._intern_trace(entry.get("jejak")))
+        return seq
+
+    def reverse(self):
+        """Membalik urutan entri (untuk tabel yang diisi dari entri terbaru)."""
+        for column in (self.ids, self.stamps, self.confidences, self.diagnoses,
+                       self.symptoms, self.recommendations, self.traces):
+            column.reverse()
+
+    def tanggal(self, seq):
+        stamp = self.stamps[seq]
+        if stamp < 0:
+            return self._raw_tanggal[-stamp - 1]
+        digits = f"{stamp:014d}"
+        return f"{digits[:4]}-{digits[4:6]}-{digits[6:8]} {digits[8:10]}:{digits[10:12]}:{digits[12:]}"
+
+    def texts(self, combo_id):
+        return list(self._combo_texts[combo_id])
+
+    def entry(self, seq):
+        """Dict entri riwayat untuk nomor urut `seq`, dengan kunci yang sama seperti file riwayat."""
+        entry = {
+            "id": self.ids[seq], "tanggal": self.tanggal(seq), "gejala": self.texts(self.symptoms[seq]),
+            "diagnosis": self.strings[self.diagnoses[seq]], "tingkat_keyakinan": self.confidences[seq],
+            "rekomendasi": self.texts(self.recommendations[seq])
+        }
+        trace_id = self.traces[seq]
+        if trace_id >= 0:
+            entry["jejak"] = self._traces[trace_id]
+        return entry
@@ -0,0 +1,120 @@
+import math
+from tkinter import ttk
+
+
+class HistoryTreeView:
+    """
+    Treeview riwayat virtual.
+
+    Hanya baris yang terlihat yang dibuat sebagai item Tk; menggulir cukup
+    menggeser item-item tersebut dan membuat item untuk baris yang baru
+    terlihat dari `rows` (urutan apa pun yang mendukung len() dan indeks),
+    sehingga biaya render tidak bergantung pada panjang riwayat. Iid setiap
+    item adalah id entri, dan `lookup(id)` mengembalikan entri untuk id tersebut.
+    """
+
+    def __init__(self, tree, scrollbar, lookup):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.lookup = lookup
+        self.rows = []
+        self.offset = 0
+        self.visible = int(tree.cget('height'))
+        self.row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.configure(yscrollcommand='')
+        tree.bind('<MouseWheel>', self._on_mousewheel)
+        tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        tree.bind('<Button-5>', lambda e: self.scroll(3))
+        tree.bind('<Up>', lambda e: self._step_focus(-1))
+        tree.bind('<Down>', lambda e: self._step_focus(1))
+        tree.bind('<Prior>', lambda e: self.scroll(-self.visible))
+        tree.bind('<Next>', lambda e: self.scroll(self.visible))
+        tree.bind('<Home>', lambda e: self.scroll_to(0))
+        tree.bind('<End>', lambda e: self.scroll_to(len(self.rows)))
+        tree.bind('<Configure>', self._on_resize)
+
+    def set_rows(self, rows):
+        """Mengganti sumber baris dan menggambar ulang jendela yang terlihat."""
+        self.rows = rows
+        self.scroll_to(self.offset)
+
+    def notify_prepended(self, count=1):
+        """Dipanggil setelah entri baru ditambahkan di depan: baris yang sedang dilihat tetap di tempatnya."""
+        if self.offset > 0:
+            self.offset += count
+        self.render()
+
+    def entry_for(self, iid):
+        """Mengembalikan entri riwayat untuk item Treeview yang diklik."""
+        if not iid:
+            return None
+        return self.lookup(int(iid))
+
+    def _on_mousewheel(self, event):
+        # Windows mengirim kelipatan 120, macOS nilai kecil (mis. ±1): bulatkan menjauhi nol
+        if not event.delta:
+            return 'break'
+        notches = math.copysign(math.ceil(abs(event.delta) / 120), event.delta)
+        return self.scroll(-3 * int(notches))
+
+    def scroll(self, delta):
+        self.scroll_to(self.offset + delta)
+        return 'break'
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.rows) - self.visible))
+        self.render()
+        return 'break'
+
+    def render(self):
+        count = max(0, min(self.visible, len(self.rows) - self.offset))
+        entries = [self.rows[i] for i in range(self.offset, self.offset + count)]
+        iids = [str(entry["id"]) for entry in entries]
+        # Item yang masih terlihat dipindahkan (seleksi tetap), sisanya dihapus/dibuat
+        shown = set(iids)
+        stale = [iid for iid in self.tree.get_children() if iid not in shown]
+        if stale:
+            self.tree.delete(*stale)
+        for position, (iid, entry) in enumerate(zip(iids, entries)):
+            values = (entry["tanggal"], entry["diagnosis"], f"{entry['tingkat_keyakinan']*100:.1f}%")
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values)
+                self.tree.move(iid, '', position)
+            else:
+                self.tree.insert('', position, iid=iid, values=values)
+        total = len(self.rows)
+        if total <= self.visible:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total, (self.offset + count) / total)
+
+    def _step_focus(self, step):
+        # Navigasi keyboard di tepi jendela menggulir satu baris
+        children = self.tree.get_children()
+        if not children:
+            return None
+        edge = children[0] if step < 0 else children[-1]
+        if self.tree.focus() != edge:
+            return None
+        self.scroll(step)
+        children = self.tree.get_children()
+        edge = children[0] if step < 0 else children[-1]
+        self.tree.focus(edge)
+        self.tree.selection_set(edge)
+        return 'break'
+
+    def _on_scrollbar(self, action, *args):
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * len(self.rows)))
+        elif action == 'scroll':
+            amount, unit = int(args[0]), args[1]
+            self.scroll(amount * (self.visible if unit == 'pages' else 1))
+
+    def _on_resize(self, event):
+        # Perkiraan tinggi heading; sisanya dibagi rata per baris
+        visible = max(1, (event.height - 25) // self.row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.scroll_to(self.offset)
@@ -0,0 +1,329 @@
+import heapq
+from collections import OrderedDict
+from functools import cached_property
+
+from inference_trace import JEJAK_MATI
+
+# Batas iterasi yang sama dengan loop forward chaining lama di DiagnosisApp
+BATAS_ITERASI = 50
+# Jumlah rencana kueri tujuan yang dimemo per mesin (LRU)
+BATAS_RENCANA_TUJUAN = 256
+
+
+class DiagnosisCancelled(Exception):
+    """Proses inferensi dihentikan sebelum selesai."""
+
+
+class DiagnosisResult:
+    """Hasil satu kali proses forward chaining."""
+
+    def __init__(self, facts, conclusions, fired, iterations, limit_reached, solusi, traced=True):
+        self.facts = facts
+        self.conclusions = conclusions
+        self.fired = fired
+        # False bila event penembakan tidak dicatat (jejak 'off'); `fired` kosong
+        self.traced = traced
+        self.iterations = iterations
+        self.limit_reached = limit_reached
+        self.solusi = solusi
+
+    @cached_property
+    def diagnosis_results(self):
+        """Daftar (nama diagnosis, bobot) terurut dari keyakinan tertinggi."""
+        return sorted(
+            [(c.replace("kemungkinan_", "").replace("_", " ").title(), conf) for c, conf in self.conclusions.items()],
+            key=lambda x: x[1], reverse=True
+        )
+
+    @property
+    def recommendations(self):
+        return [self.solusi[key] for key in self.solusi if key in self.facts]
+
+    @cached_property
+    def diagnosis_str(self):
+        return ", ".join([f"{d} ({c*100:.1f}%)" for d, c in self.diagnosis_results]) or "Tidak ada diagnosis"
+
+    @property
+    def max_confidence(self):
+        return max(self.conclusions.values(), default=0)
+
+
+class GoalResult:
+    """Jawaban kueri tujuan: apakah `goal` terdukung, bobotnya, dan rantai aturan pendukungnya."""
+
+    def __init__(self, goal, weight, chain, relevant_rules):
+        self.goal = goal
+        self.weight = weight
+        # Event (iterasi, rule, kesimpulan, bobot) yang membentuk bukti, urut sesuai penembakan
+        self.chain = chain
+        self.relevant_rules = relevant_rules
+
+    @property
+    def supported(self):
+        return self.weight is not None
+
+    def explain(self, rules):
+        """Rantai pendukung sebagai baris teks, satu baris per aturan."""
+        if not self.supported:
+            return [f"❌ {self.goal} tidak dapat disimpulkan dari gejala yang dipilih"]
+        return [
+            f"✅ Rule {idx + 1}: JIKA ({', '.join(rules[idx]['conditions'])}) MAKA {conclusion} ({weight*100:.1f}%)"
+            for _, idx, conclusion, weight in self.chain
+        ]
+
+
+class _GoalPlan:
+    """Subgraf aturan yang dapat menyumbang ke sekumpulan tujuan, terurut sesuai nomor rule."""
+
+    __slots__ = ('rules', 'conditions', 'watchers')
+
+    def __init__(self, engine, rules):
+        self.rules = rules
+        self.conditions = {idx: engine._rule_conditions(idx) for idx in rules}
+        self.watchers = {}
+        for idx in rules:
+            for cond in self.conditions[idx]:
+                self.watchers.setdefault(cond, []).append(idx)
+
+
+class InferenceEngine:
+    """
+    Forward chaining berbasis agenda.
+
+    Aturan diindeks berdasarkan simbol kondisinya dan setiap aturan menyimpan
+    jumlah kondisi yang belum terpenuhi, sehingga fakta baru hanya menyentuh
+    aturan yang bergantung padanya. Urutan penembakan aturan (iterasi dan
+    nomor rule) sama persis dengan loop pemindaian ulang yang lama.
+
+    Kueri tujuan (query, query_many, query_solusi) hanya menjalankan aturan
+    yang dapat menyumbang ke tujuan menurut graf ketergantungan, sehingga
+    biayanya sebanding dengan subgraf tersebut, bukan seluruh basis aturan.
+    """
+
+    def __init__(self, rules, solusi, max_iterations=BATAS_ITERASI):
+        self.rules = rules
+        self.solusi = solusi
+        self.max_iterations = max_iterations
+        self._conclusions = [rule["conclusion"] for rule in rules]
+        self._weights = [rule.get("bobot", 1.0) for rule in rules]
+        self._condition_counts = []
+        self._watchers = {}
+        for idx, rule in enumerate(rules):
+            conditions = dict.fromkeys(rule["conditions"])
+            self._condition_counts.append(len(conditions))
+            for cond in conditions:
+                self._watchers.setdefault(cond, []).append(idx)
+
+    @classmethod
+    def from_compiled(cls, rules, solusi, conclusions, weights, condition_counts, watchers, max_iterations=BATAS_ITERASI):
+        """Membuat mesin dari indeks yang sudah dikompilasi (lihat knowledge_base) tanpa membaca dict aturan."""
+        engine = cls.__new__(cls)
+        engine.rules = rules
+        engine.solusi = solusi
+        engine.max_iterations = max_iterations
+        engine._conclusions = conclusions
+        engine._weights = weights
+        engine._condition_counts = condition_counts
+        engine._watchers = watchers
+        return engine
+
+    def with_weights(self, rules, solusi, weights):
+        """Mesin baru dengan bobot/solusi baru yang memakai bersama indeks aturan mesin ini."""
+        return InferenceEngine.from_compiled(
+            rules, solusi, self._conclusions, weights, self._condition_counts, self._watchers, self.max_iterations
+        )
+
+    @cached_property
+    def _producers(self):
+        producers = {}
+        for idx, conclusion in enumerate(self._conclusions):
+            producers.setdefault(conclusion, []).append(idx)
+        return producers
+
+    @cached_property
+    def _goal_plans(self):
+        return OrderedDict()
+
+    def unknown_goals(self, goals):
+        """Tujuan dalam `goals` yang tidak disimpulkan oleh aturan mana pun."""
+        return [goal for goal in goals if goal not in self._producers]
+
+    def _rule_conditions(self, idx):
+        return tuple(dict.fromkeys(self.rules[idx]["conditions"]))
+
+    def _plan(self, goals):
+        """
+        Subgraf relevan untuk `goals`, dimemo per himpunan tujuan (paling banyak
+        BATAS_RENCANA_TUJUAN, yang paling lama tidak dipakai dibuang):
+        penelusuran mundur dari tujuan lewat aturan penghasilnya, dan subtujuan
+        yang sudah pernah direncanakan langsung memakai himpunan aturan hasil memonya.
+        """
+        key = frozenset(goals)
+        plan = self._goal_plans.get(key)
+        if plan is not None:
+            self._goal_plans.move_to_end(key)
+            return plan
+        rules, seen, stack = set(), set(key), list(key)
+        while stack:
+            symbol = stack.pop()
+            known = self._goal_plans.get(frozenset((symbol,)))
+            if known is not None and symbol not in key:
+                rules.update(known.rules)
+                continue
+            for idx in self._producers.get(symbol, ()):
+                if idx in rules:
+                    continue
+                rules.add(idx)
+                for cond in self._rule_conditions(idx):
+                    if cond not in seen:
+                        seen.add(cond)
+                        stack.append(cond)
+        plan = self._goal_plans[key] = _GoalPlan(self, sorted(rules))
+        if len(self._goal_plans) > BATAS_RENCANA_TUJUAN:
+            self._goal_plans.popitem(last=False)
+        return plan
+
+    def query(self, goal, gejala_terpilih, cancel_event=None):
+        """Apakah `goal` (mis. 'kemungkinan_flu_berat') terdukung oleh gejala yang dipilih; mengembalikan GoalResult."""
+        return self.query_many([goal], gejala_terpilih, cancel_event)[goal]
+
+    def query_solusi(self, gejala_terpilih, cancel_event=None):
+        """Daftar (kunci, teks solusi, GoalResult) untuk solusi yang berlaku, sesuai urutan `solusi`."""
+        results = self.query_many(list(self.solusi), gejala_terpilih, cancel_event)
+        return [(key, self.solusi[key], results[key]) for key in self.solusi if results[key].supported]
+
+    def query_many(self, goals, gejala_terpilih, cancel_event=None):
+        """
+        Forward chaining terbatas pada subgraf relevan untuk `goals`. Aturan di
+        luar subgraf tidak dapat memengaruhi kapan aturan di dalamnya ditembakkan,
+        sehingga hasil, bobot, dan iterasinya sama dengan diagnose(); proses
+        berhenti begitu semua tujuan tercapai.
+        """
+        plan = self._plan(goals)
+        facts = set(gejala_terpilih)
+        unmet = {idx: sum(1 for cond in conds if cond not in facts) for idx, conds in plan.conditions.items()}
+        remaining = set(goals) - facts
+        first_fired = {}
+        current = [idx for idx in plan.rules if unmet[idx] == 0]
+        pending = []
+        iteration = 1
+        while remaining:
+            if cancel_event is not None and cancel_event.is_set():
+                raise DiagnosisCancelled()
+            new_facts_found = False
+            while current and remaining:
+                idx = heapq.heappop(current)
+                conclusion = self._conclusions[idx]
+                if conclusion in facts:
+                    continue
+                facts.add(conclusion)
+                new_facts_found = True
+                first_fired[conclusion] = (iteration, idx, conclusion, self._weights[idx])
+                remaining.discard(conclusion)
+                for dependent in plan.watchers.get(conclusion, ()):
+                    unmet[dependent] -= 1
+                    if unmet[dependent] == 0:
+                        if dependent > idx:
+                            heapq.heappush(current, dependent)
+                        else:
+                            pending.append(dependent)
+            if iteration > self.max_iterations or not new_facts_found:
+                break
+            iteration += 1
+            current, pending = pending, []
+            heapq.heapify(current)
+
+        results = {}
+        for goal in goals:
+            if goal not in first_fired:
+                # Tujuan yang sudah menjadi fakta awal (gejala terpilih) terdukung tanpa aturan
+                weight = 1.0 if goal in gejala_terpilih else None
+                results[goal] = GoalResult(goal, weight, [], len(plan.rules))
+                continue
+            # Rantai pendukung: aturan penghasil tujuan lalu penghasil setiap kondisinya, mundur
+            chain, stack, used = [], [goal], set()
+            while stack:
+                event = first_fired.get(stack.pop())
+                if event is None or event[1] in used:
+                    continue
+                used.add(event[1])
+                chain.append(event)
+                stack.extend(plan.conditions[event[1]])
+            chain.sort(key=lambda event: (event[0], event[1]))
+            results[goal] = GoalResult(goal, first_fired[goal][3], chain, len(plan.rules))
+        return results
+
+    @cached_property
+    def _unconditional(self):
+        return [idx for idx, count in enumerate(self._condition_counts) if count == 0]
+
+    def rule_activity(self, result):
+        """
+        Merekonstruksi kerja inferensi dari hasil akhirnya, tanpa instrumentasi
+        di dalam loop: (aturan yang dievaluasi, aturan yang ditembakkan, jumlah
+        pemeriksaan kondisi). Setiap fakta memeriksa aturan yang bergantung
+        padanya tepat satu kali, jadi aturan dievaluasi bila setidaknya satu
+        kondisinya diperiksa, terpenuhi seluruhnya atau tidak; aturan tanpa
+        kondisi dievaluasi dari agenda awal.
+        """
+        visited, checks = set(), 0
+        for fact in result.facts:
+            watchers = self._watchers.get(fact, ())
+            checks += len(watchers)
+            visited.update(watchers)
+        visited.update(self._unconditional)
+        return visited, [event[1] for event in result.fired], checks
+
+    def diagnose(self, gejala_terpilih, cancel_event=None, trace=None):
+        """
+        Menjalankan forward chaining dari gejala yang dipilih. Bila `cancel_event`
+        di-set, proses berhenti di batas iterasi berikutnya dengan DiagnosisCancelled.
+        Event (iterasi, rule, kesimpulan, bobot) dicatat di `fired` kecuali `trace`
+        bernilai 'off'.
+        """
+        record = trace != JEJAK_MATI
+        facts = set(gejala_terpilih)
+        unmet = self._condition_counts.copy()
+        for fact in facts:
+            for idx in self._watchers.get(fact, ()):
+                unmet[idx] -= 1
+
+        current = [idx for idx, count in enumerate(unmet) if count == 0]
+        pending = []
+        conclusions, fired = {}, []
+        iteration, limit_reached = 1, False
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise DiagnosisCancelled()
+            new_facts_found = False
+            while current:
+                idx = heapq.heappop(current)
+                conclusion = self._conclusions[idx]
+                if conclusion in facts:
+                    continue
+                facts.add(conclusion)
+                new_facts_found = True
+                if record:
+                    fired.append((iteration, idx, conclusion, self._weights[idx]))
+                if conclusion.startswith("kemungkinan_"):
+                    conclusions[conclusion] = self._weights[idx]
+                for dependent in self._watchers.get(conclusion, ()):
+                    unmet[dependent] -= 1
+                    if unmet[dependent] == 0:
+                        # Aturan setelah posisi pemindaian masih ikut di iterasi ini,
+                        # aturan sebelumnya baru terlihat pada iterasi berikutnya.
+                        if dependent > idx:
+                            heapq.heappush(current, dependent)
+                        else:
+                            pending.append(dependent)
+
+            if iteration > self.max_iterations:
+                limit_reached = True
+                break
+            if not new_facts_found:
+                break
+            iteration += 1
+            current, pending = pending, []
+            heapq.heapify(current)
+
+        return DiagnosisResult(facts, conclusions, fired, iteration, limit_reached, self.solusi, record)
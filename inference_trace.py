@@ -0,0 +1,91 @@
+# Tingkat detail jejak inferensi
+JEJAK_MATI = 'off'
+JEJAK_RINGKAS = 'summary'
+JEJAK_LENGKAP = 'full'
+TINGKAT_JEJAK = (JEJAK_MATI, JEJAK_RINGKAS, JEJAK_LENGKAP)
+NAMA_TINGKAT_JEJAK = {'Lengkap': JEJAK_LENGKAP, 'Ringkas': JEJAK_RINGKAS, 'Mati': JEJAK_MATI}
+
+
+class InferenceTrace:
+    """
+    Jejak forward chaining yang ringkas dan dapat diserialisasi.
+
+    Setiap event berupa tuple (iterasi, indeks rule, kesimpulan, bobot).
+    Tingkat 'summary' hanya menyimpan event yang menghasilkan diagnosis;
+    'full' menyimpan semua event beserta kondisi rule yang dipakai, sehingga
+    log dapat diputar ulang tanpa basis pengetahuan. Teks log baru disusun
+    saat render() dipanggil.
+    """
+
+    __slots__ = ('verbosity', 'gejala', 'events', 'iterations', 'limit_reached', 'conditions')
+
+    def __init__(self, verbosity, gejala, events, iterations, limit_reached, conditions=None):
+        self.verbosity = verbosity
+        self.gejala = gejala
+        self.events = events
+        self.iterations = iterations
+        self.limit_reached = limit_reached
+        self.conditions = conditions or {}
+
+    @classmethod
+    def from_result(cls, result, rules, gejala_nama, verbosity=JEJAK_LENGKAP):
+        """Membuat jejak dari DiagnosisResult; mengembalikan None untuk tingkat 'off'."""
+        if verbosity == JEJAK_MATI:
+            return None
+        if verbosity == JEJAK_RINGKAS:
+            events = [event for event in result.fired if event[2].startswith("kemungkinan_")]
+            return cls(verbosity, list(gejala_nama), events, result.iterations, result.limit_reached)
+        conditions = {idx: list(rules[idx]['conditions']) for _, idx, _, _ in result.fired}
+        return cls(verbosity, list(gejala_nama), list(result.fired), result.iterations, result.limit_reached, conditions)
+
+    def to_dict(self):
+        return {
+            "tingkat": self.verbosity,
+            "gejala": self.gejala,
+            "iterasi": self.iterations,
+            "batas_tercapai": self.limit_reached,
+            "event": [list(event) for event in self.events],
+            "kondisi": [[idx, conds] for idx, conds in self.conditions.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["tingkat"], data["gejala"], [tuple(event) for event in data["event"]],
+            data["iterasi"], data["batas_tercapai"], {idx: conds for idx, conds in data.get("kondisi", ())}
+        )
+
+    def render(self):
+        """Menyusun teks log sesuai tingkat detail jejak."""
+        lines = ["🔍 MEMULAI PROSES DIAGNOSIS\n", "="*50 + "\n\n", "📝 FAKTA AWAL (Gejala yang dipilih):\n"]
+        lines.extend(f"   ✓ {nama}\n" for nama in self.gejala)
+        lines.append("\n" + "="*50 + "\n")
+
+        if self.verbosity == JEJAK_LENGKAP:
+            lines.append("🔄 PROSES FORWARD CHAINING:\n\n")
+            per_iteration = {}
+            for event in self.events:
+                per_iteration.setdefault(event[0], []).append(event)
+            for iteration in range(1, self.iterations + 1):
+                lines.append(f"📍 Iterasi {iteration}:\n")
+                for _, rule_idx, conclusion, weight in per_iteration.get(iteration, []):
+                    conditions_text = ', '.join(self.conditions.get(rule_idx, ()))
+                    lines.append(f"   ✅ Rule {rule_idx + 1}: JIKA ({conditions_text}) MAKA {conclusion}\n")
+                    lines.append(f"      💡 Bobot keyakinan: {weight*100:.1f}%\n")
+                if iteration not in per_iteration:
+                    lines.append("   ❌ Tidak ada rule baru yang dapat diterapkan\n")
+                lines.append("\n")
+        else:
+            lines.append("🔄 RINGKASAN FORWARD CHAINING:\n\n")
+            for iteration, rule_idx, conclusion, weight in self.events:
+                lines.append(f"   ✅ Iterasi {iteration}, Rule {rule_idx + 1}: {conclusion} ({weight*100:.1f}%)\n")
+            lines.append("\n")
+        if self.limit_reached:
+            lines.append("⚠️ Batas iterasi tercapai, proses dihentikan.\n")
+
+        diagnoses = sum(1 for event in self.events if event[2].startswith("kemungkinan_"))
+        lines.append("="*50 + "\n")
+        lines.append("🏁 PROSES FORWARD CHAINING SELESAI\n")
+        lines.append(f"📊 Total iterasi: {self.iterations}\n")
+        lines.append(f"📋 Kesimpulan ditemukan: {diagnoses}\n")
+        return "".join(lines)
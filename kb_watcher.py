@@ -0,0 +1,80 @@
+import os
+
+import knowledge_base
+from diagnosis_cache import file_hash
+
+# Selang pemeriksaan file basis pengetahuan pada mode --watch-kb
+INTERVAL_PANTAU_KB_MS = 1000
+
+
+class KnowledgeBaseChange:
+    """Ringkasan perbedaan antara dua versi basis pengetahuan."""
+
+    def __init__(self, old, new):
+        self.catalogue_changed = old.gejala_list != new.gejala_list
+        self.structure_changed = (
+            old.symbols != new.symbols or old.condition_offsets != new.condition_offsets
+            or old.condition_ids != new.condition_ids or old.conclusion_ids != new.conclusion_ids
+        )
+        self.changed_rules = None if self.structure_changed else [
+            idx for idx, (a, b) in enumerate(zip(old.weights, new.weights)) if a != b
+        ]
+
+    def __str__(self):
+        if self.structure_changed:
+            detail = "struktur aturan berubah, dikompilasi ulang"
+        else:
+            detail = f"{len(self.changed_rules)} bobot aturan berubah"
+        if self.catalogue_changed:
+            detail += ", katalog gejala berubah"
+        return f"Basis pengetahuan dimuat ulang: {detail}"
+
+
+class KnowledgeBaseWatcher:
+    """
+    Memantau file basis pengetahuan dengan polling.
+
+    changed() hanya membandingkan mtime dan ukuran file sehingga murah untuk
+    dipanggil berkala; reload() membaca dan meng-hash isi file, lalu
+    mengompilasinya dengan memakai ulang hasil kompilasi sebelumnya bila
+    struktur aturannya tidak berubah.
+    """
+
+    def __init__(self, kb_file, kb):
+        self.kb_file = kb_file
+        self.kb = kb
+        self._signature = self._stat()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.kb_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def changed(self):
+        signature = self._stat()
+        return signature is not None and signature != self._signature
+
+    def reload(self):
+        """
+        Mengembalikan (kb_baru, KnowledgeBaseChange) bila isi file berubah, atau
+        None bila isinya sama atau tidak valid (aturan lama tetap dipakai).
+        Boleh dipanggil dari thread latar belakang; penukaran ke kb baru
+        dilakukan pemanggil.
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        try:
+            if file_hash(self.kb_file) == self.kb.digest:
+                return None
+        except OSError:
+            return None
+        kb = knowledge_base.load_knowledge_base(self.kb_file, headless=True, previous=self.kb)
+        if kb is None:
+            return None
+        change = KnowledgeBaseChange(self.kb, kb)
+        self.kb = kb
+        return kb, change
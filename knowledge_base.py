@@ -0,0 +1,422 @@
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import sys
+from array import array
+from collections.abc import Sequence
+from functools import cached_property
+
+import file_handler
+from inference_engine import InferenceEngine
+
+# Naikkan bila struktur KnowledgeBase berubah agar cache lama diabaikan
+VERSI_CACHE = 2
+DIREKTORI_CACHE = '.kb_cache'
+
+
+class KnowledgeBaseError(Exception):
+    """Basis pengetahuan tidak dapat dikompilasi."""
+
+
+class KnowledgeBaseIssue:
+    """Satu temuan validasi: `kind` berupa 'simbol', 'siklus', 'tak_terjangkau', atau 'solusi'."""
+
+    def __init__(self, kind, message, rules=()):
+        self.kind = kind
+        self.message = message
+        self.rules = list(rules)
+
+    def __str__(self):
+        return self.message
+
+
+class RuleList(Sequence):
+    """Tampilan daftar aturan (dict) yang dibuat dari array terkompilasi hanya saat diakses."""
+
+    def __init__(self, kb):
+        self._kb = kb
+
+    def __len__(self):
+        return len(self._kb.conclusion_ids)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        kb = self._kb
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        start, end = kb.condition_offsets[idx], kb.condition_offsets[idx + 1]
+        return {
+            "conditions": [kb.symbols[s] for s in kb.condition_ids[start:end]],
+            "conclusion": kb.symbols[kb.conclusion_ids[idx]],
+            "bobot": kb.weights[idx],
+        }
+
+
+class KnowledgeBase:
+    """
+    Basis pengetahuan yang sudah divalidasi dan dikompilasi.
+
+    Aturan disimpan sebagai array simbol bernomor: kondisi per aturan dan
+    indeks "watcher" (simbol -> aturan yang memakainya) dalam format CSR.
+    Hanya array-array ini beserta gejala, solusi, dan temuan validasi yang
+    disimpan ke cache disk (sebagai data JSON biasa), sehingga memuat ulang dari cache tidak perlu
+    mengurai JSON maupun membangun ulang ribuan dict. Mesin inferensi dan
+    daftar aturan dibuat dari array tersebut saat pertama kali dipakai.
+    """
+
+    _CORE = (
+        'gejala_list', 'solusi', 'digest', 'symbols', 'condition_offsets', 'condition_ids',
+        'conclusion_ids', 'weights', 'condition_counts', 'watcher_offsets', 'watcher_ids', 'issues'
+    )
+    # Tipe elemen array terkompilasi, untuk menyusun ulang dari cache
+    _ARRAYS = {
+        'condition_offsets': 'l', 'condition_ids': 'l', 'conclusion_ids': 'l', 'weights': 'd',
+        'condition_counts': 'l', 'watcher_offsets': 'l', 'watcher_ids': 'l'
+    }
+
+    def __init__(self, gejala_list, rules, solusi, digest):
+        self.gejala_list = gejala_list
+        self.solusi = solusi
+        self.digest = digest
+        symbol_ids = {g["id"]: i for i, g in enumerate(gejala_list)}
+        self.condition_offsets = array('l', [0])
+        self.condition_ids = array('l')
+        self.conclusion_ids = array('l')
+        self.weights = array('d')
+        self.condition_counts = array('l')
+        watchers = {}
+        for idx, rule in enumerate(rules):
+            conditions = [symbol_ids.setdefault(cond, len(symbol_ids)) for cond in rule["conditions"]]
+            self.condition_ids.extend(conditions)
+            self.condition_offsets.append(len(self.condition_ids))
+            self.conclusion_ids.append(symbol_ids.setdefault(rule["conclusion"], len(symbol_ids)))
+            self.weights.append(rule.get("bobot", 1.0))
+            distinct = dict.fromkeys(conditions)
+            self.condition_counts.append(len(distinct))
+            for symbol in distinct:
+                watchers.setdefault(symbol, []).append(idx)
+        self.symbols = list(symbol_ids)
+        self.watcher_offsets = array('l', [0])
+        self.watcher_ids = array('l')
+        for symbol in range(len(self.symbols)):
+            self.watcher_ids.extend(watchers.get(symbol, ()))
+            self.watcher_offsets.append(len(self.watcher_ids))
+        self.issues = self._validate()
+
+    def __getstate__(self):
+        # Atribut turunan (cached_property) tidak ikut disimpan ke cache
+        return {name: getattr(self, name) for name in self._CORE}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def to_cache(self):
+        """Isi cache disk: hanya list, angka, dan teks (tanpa objek Python)."""
+        state = self.__getstate__()
+        for name in self._ARRAYS:
+            state[name] = state[name].tolist()
+        state['issues'] = [[issue.kind, issue.message, issue.rules] for issue in self.issues]
+        return state
+
+    @classmethod
+    def from_cache(cls, state):
+        """Menyusun ulang KnowledgeBase dari to_cache(); ValueError/TypeError/KeyError bila isinya tidak sesuai."""
+        kb = cls.__new__(cls)
+        kb.__setstate__({name: state[name] for name in cls._CORE})
+        for name, typecode in cls._ARRAYS.items():
+            setattr(kb, name, array(typecode, state[name]))
+        kb.issues = [KnowledgeBaseIssue(kind, message, rules) for kind, message, rules in state['issues']]
+        if not (isinstance(kb.gejala_list, list) and isinstance(kb.solusi, dict) and isinstance(kb.symbols, list)):
+            raise TypeError("isi cache tidak valid")
+        count = len(kb.conclusion_ids)
+        if (len(kb.condition_offsets) != count + 1 or len(kb.weights) != count or len(kb.condition_counts) != count
+                or len(kb.watcher_offsets) != len(kb.symbols) + 1):
+            raise ValueError("panjang array cache tidak cocok")
+        return kb
+
+    @cached_property
+    def gejala_ids(self):
+        return [g["id"] for g in self.gejala_list]
+
+    @cached_property
+    def rules(self):
+        return RuleList(self)
+
+    @cached_property
+    def engine(self):
+        offsets, ids = self.watcher_offsets.tolist(), self.watcher_ids.tolist()
+        watchers = {
+            symbol: ids[offsets[s]:offsets[s + 1]]
+            for s, symbol in enumerate(self.symbols) if offsets[s] != offsets[s + 1]
+        }
+        return InferenceEngine.from_compiled(
+            self.rules, self.solusi, [self.symbols[s] for s in self.conclusion_ids],
+            self.weights.tolist(), self.condition_counts.tolist(), watchers
+        )
+
+    def same_structure(self, gejala_list, rules):
+        """True bila id gejala serta kondisi dan kesimpulan setiap aturan sama dengan basis ini."""
+        if [g["id"] for g in gejala_list] != self.gejala_ids or len(rules) != len(self.conclusion_ids):
+            return False
+        symbols, offsets, ids = self.symbols, self.condition_offsets, self.condition_ids
+        for idx, rule in enumerate(rules):
+            if rule["conclusion"] != symbols[self.conclusion_ids[idx]]:
+                return False
+            start, end = offsets[idx], offsets[idx + 1]
+            conditions = rule["conditions"]
+            if len(conditions) != end - start or any(c != symbols[s] for c, s in zip(conditions, ids[start:end])):
+                return False
+        return True
+
+    def with_updates(self, gejala_list, solusi, weights, digest):
+        """
+        Basis baru dengan katalog, solusi, dan bobot baru untuk struktur aturan
+        yang sama. Array indeks, temuan validasi struktur, dan indeks mesin
+        inferensi dipakai bersama sehingga tidak perlu dikompilasi ulang.
+        """
+        kb = KnowledgeBase.__new__(KnowledgeBase)
+        kb.__setstate__(self.__getstate__())
+        kb.gejala_list, kb.solusi, kb.digest = gejala_list, solusi, digest
+        kb.weights = array('d', weights)
+        kb.issues = [issue for issue in self.issues if issue.kind != 'solusi'] + kb._solusi_issues()
+        if 'engine' in self.__dict__:
+            kb.engine = self.engine.with_weights(kb.rules, solusi, kb.weights.tolist())
+        return kb
+
+    def watchers(self, symbol_id):
+        """Aturan yang memakai simbol bernomor `symbol_id` sebagai kondisi."""
+        return self.watcher_ids[self.watcher_offsets[symbol_id]:self.watcher_offsets[symbol_id + 1]]
+
+    def dependents(self, idx):
+        """Graf ketergantungan: aturan yang kondisinya memakai kesimpulan aturan `idx`."""
+        return self.watchers(self.conclusion_ids[idx])
+
+    def _validate(self):
+        issues = []
+        produced = set(self.conclusion_ids)
+        produced_names = {self.symbols[s] for s in produced}
+        known = set(self.gejala_ids) | produced_names
+        gejala_count = len(self.gejala_list)
+        for idx in range(len(self.conclusion_ids)):
+            for s in self.condition_ids[self.condition_offsets[idx]:self.condition_offsets[idx + 1]]:
+                if s >= gejala_count and s not in produced:
+                    suggestion = difflib.get_close_matches(self.symbols[s], known, n=1)
+                    hint = f" (maksud Anda '{suggestion[0]}'?)" if suggestion else ""
+                    issues.append(KnowledgeBaseIssue(
+                        'simbol', f"Rule {idx + 1}: simbol '{self.symbols[s]}' tidak dikenal{hint}", [idx]
+                    ))
+        for cycle in self._find_cycles():
+            nomor = ', '.join(str(idx + 1) for idx in cycle)
+            issues.append(KnowledgeBaseIssue('siklus', f"Siklus antar-aturan: rule {nomor}", cycle))
+        reachable = self._reachable_rules()
+        for idx in range(len(self.conclusion_ids)):
+            if idx not in reachable:
+                issues.append(KnowledgeBaseIssue(
+                    'tak_terjangkau', f"Rule {idx + 1} tidak pernah dapat ditembakkan", [idx]
+                ))
+        issues.extend(self._solusi_issues())
+        return issues
+
+    def _solusi_issues(self):
+        produced_names = {self.symbols[s] for s in set(self.conclusion_ids)}
+        return [
+            KnowledgeBaseIssue('solusi', f"Solusi '{key}' tidak disimpulkan oleh aturan mana pun")
+            for key in self.solusi if key not in produced_names
+        ]
+
+    def _reachable_rules(self):
+        """Aturan yang dapat ditembakkan bila semua gejala dipilih (penutupan forward chaining)."""
+        unmet = self.condition_counts.tolist()
+        reachable = {idx for idx, count in enumerate(unmet) if count == 0}
+        queue = list(range(len(self.gejala_list))) + [self.conclusion_ids[idx] for idx in reachable]
+        facts = set()
+        while queue:
+            symbol = queue.pop()
+            if symbol in facts:
+                continue
+            facts.add(symbol)
+            for idx in self.watchers(symbol):
+                unmet[idx] -= 1
+                if unmet[idx] == 0:
+                    reachable.add(idx)
+                    queue.append(self.conclusion_ids[idx])
+        return reachable
+
+    def _find_cycles(self):
+        """Komponen terhubung kuat (Tarjan, iteratif) yang membentuk siklus."""
+        index, low, on_stack, stack, cycles = {}, {}, set(), [], []
+        counter = 0
+        for start in range(len(self.conclusion_ids)):
+            if start in index:
+                continue
+            work = [(start, iter(self.dependents(start)))]
+            index[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(self.dependents(child))))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1 or node in self.dependents(node):
+                            cycles.append(sorted(component))
+        return cycles
+
+
+def _check_structure(data):
+    """Memeriksa bentuk data mentah; kesalahan di sini membuat basis pengetahuan tidak dapat dipakai."""
+    if not isinstance(data, dict):
+        raise KnowledgeBaseError("isi file harus berupa objek JSON")
+    gejala_list, rules, solusi = data.get("gejala", []), data.get("aturan", []), data.get("solusi", {})
+    seen = set()
+    for i, gejala in enumerate(gejala_list):
+        if not isinstance(gejala, dict) or not isinstance(gejala.get("id"), str) or "nama" not in gejala:
+            raise KnowledgeBaseError(f"gejala ke-{i + 1} harus memiliki 'id' dan 'nama'")
+        if gejala["id"] in seen:
+            raise KnowledgeBaseError(f"id gejala '{gejala['id']}' muncul lebih dari sekali")
+        seen.add(gejala["id"])
+    for i, rule in enumerate(rules):
+        if not isinstance(rule, dict) or not isinstance(rule.get("conditions"), list) or not isinstance(rule.get("conclusion"), str):
+            raise KnowledgeBaseError(f"rule {i + 1} harus memiliki 'conditions' (daftar) dan 'conclusion'")
+        for cond in rule["conditions"]:
+            if not isinstance(cond, str):
+                raise KnowledgeBaseError(f"rule {i + 1}: setiap kondisi harus berupa nama simbol (teks), bukan {cond!r}")
+        bobot = rule.get("bobot", 1.0)
+        if not isinstance(bobot, (int, float)) or not 0 <= bobot <= 1:
+            raise KnowledgeBaseError(f"rule {i + 1}: bobot harus berupa angka 0..1")
+    if not isinstance(solusi, dict):
+        raise KnowledgeBaseError("'solusi' harus berupa objek")
+    return gejala_list, rules, solusi
+
+
+def compile_knowledge_base(raw, digest=None, previous=None):
+    """
+    Mengompilasi isi file basis pengetahuan (bytes) menjadi KnowledgeBase.
+    Bila `previous` diberikan dan struktur aturannya tidak berubah (mis. hanya
+    bobot, solusi, atau teks gejala yang disunting), hasil kompilasinya dipakai ulang.
+    """
+    digest = digest or hashlib.sha256(raw).hexdigest()
+    try:
+        data = json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise KnowledgeBaseError(f"format JSON tidak valid: {e}")
+    gejala_list, rules, solusi = _check_structure(data)
+    if previous is not None and previous.same_structure(gejala_list, rules):
+        return previous.with_updates(gejala_list, solusi, [rule.get("bobot", 1.0) for rule in rules], digest)
+    return KnowledgeBase(gejala_list, rules, solusi, digest)
+
+
+def _cache_path(kb_file, digest):
+    directory = os.path.join(os.path.dirname(os.path.abspath(kb_file)), DIREKTORI_CACHE)
+    return os.path.join(directory, f"{os.path.basename(kb_file)}-{digest[:16]}.json")
+
+
+def _read_cache(path, digest):
+    # Cache berupa data JSON biasa: file yang rusak atau diubah hanya membuat kompilasi diulang
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            cache = json.load(file)
+        if cache["versi"] != VERSI_CACHE or cache["digest"] != digest:
+            return None
+        return KnowledgeBase.from_cache(cache["basis"])
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+
+def _write_cache(path, kb):
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"versi": VERSI_CACHE, "digest": kb.digest, "basis": kb.to_cache()}, file,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        # Hanya simpan hasil kompilasi versi terbaru dari file yang sama
+        prefix = os.path.basename(path).rsplit('-', 1)[0] + '-'
+        for name in os.listdir(directory):
+            if name.startswith(prefix) and name != os.path.basename(path):
+                os.remove(os.path.join(directory, name))
+    except OSError:
+        # Cache hanya percepatan; kegagalan menulis tidak menghentikan aplikasi
+        pass
+
+
+def load_knowledge_base(file_path, headless=False, use_cache=True, previous=None):
+    """
+    Memuat basis pengetahuan terkompilasi. Bila cache untuk hash isi file
+    sudah ada, hasil kompilasi dibaca langsung dari cache; bila belum, file
+    dikompilasi (memakai ulang `previous` bila bisa), divalidasi, lalu
+    disimpan ke cache. Mengembalikan None bila file tidak ada atau tidak valid.
+    """
+    akibat = "Aturan lama tetap dipakai." if previous is not None else "Aplikasi akan ditutup."
+    try:
+        with open(file_path, 'rb') as file:
+            raw = file.read()
+    except FileNotFoundError:
+        file_handler._report_error("Error Kritis", f"File data '{file_path}' tidak ditemukan! {akibat}", headless)
+        return None
+    digest = hashlib.sha256(raw).hexdigest()
+    path = _cache_path(file_path, digest)
+    kb = _read_cache(path, digest) if use_cache else None
+    if kb is None:
+        try:
+            kb = compile_knowledge_base(raw, digest, previous)
+        except KnowledgeBaseError as e:
+            file_handler._report_error("Error Kritis", f"Format file data '{file_path}' tidak valid: {e}. {akibat}", headless)
+            return None
+        if use_cache:
+            _write_cache(path, kb)
+    # Temuan validasi ikut tersimpan di cache, jadi dilaporkan juga saat dimuat dari cache
+    for issue in kb.issues:
+        file_handler._report_info(f"⚠ {issue}", headless)
+    file_handler._report_info(f"✓ Data aplikasi berhasil dimuat dari {file_path}", headless)
+    return kb
+
+
+def main(argv=None):
+    """Memvalidasi basis pengetahuan, mis. `python knowledge_base.py gejala_penyakit.json`."""
+    parser = argparse.ArgumentParser(description="Validasi dan kompilasi basis pengetahuan.")
+    parser.add_argument("kb", nargs="?", default="gejala_penyakit.json", help="file basis pengetahuan")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.kb, 'rb') as file:
+            kb = compile_knowledge_base(file.read())
+    except (OSError, KnowledgeBaseError) as e:
+        print(f"✗ {args.kb}: {e}", file=sys.stderr)
+        return 1
+    for issue in kb.issues:
+        print(f"⚠ {issue}")
+    print(f"✓ {len(kb.gejala_list)} gejala, {len(kb.rules)} aturan, {len(kb.issues)} temuan")
+    return 1 if kb.issues else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,143 +1,308 @@
+import time
+# Titik awal pengukuran startup, dicatat sebelum modul lain diimpor
+_STARTUP_T0 = time.perf_counter()
+
+import argparse
+import queue
+import sqlite3
+import sys
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from datetime import datetime
 
 # Impor modul-modul yang sudah kita buat
 import file_handler
+import history_analytics
+import history_store
+import knowledge_base
+from history_index import HistoryIndex, NAMA_BULAN
 from gui_builder import GuiBuilder
-from export_manager import ExportManager
+from inference_engine import DiagnosisCancelled
+from inference_trace import InferenceTrace, NAMA_TINGKAT_JEJAK
+from diagnosis_cache import DiagnosisCache
+from kb_watcher import INTERVAL_PANTAU_KB_MS, KnowledgeBaseWatcher
+from metrics import INTERVAL_EKSPOR_METRIK, Metrics, MetricsExporter
+from startup_profile import ANGGARAN_STARTUP_MS, StartupTimer, format_report, import_times
+from symptom_picker import SymptomSelection
 
 class DiagnosisApp:
-    def __init__(self, root):
+    def __init__(self, root, startup_timer=None, startup_report=None, watch_kb=False, metrics=None):
         self.root = root
+        self.startup_timer = startup_timer or StartupTimer()
+        # Dipanggil setelah riwayat selesai dimuat (mode --startup-report)
+        self.startup_report = startup_report
+        # metrics.Metrics opsional (--metrik); None berarti tanpa instrumentasi
+        self.metrics = metrics
         self.root.title("Sistem Pakar Diagnosis Flu")
         self.root.geometry("900x700")
         self.root.minsize(800, 600)
 
         self.json_file = 'gejala_penyakit.json'
-        self.riwayat_file = 'riwayat_diagnosis.json'
+        self.riwayat_file = 'riwayat_diagnosis.jsonl'
+        self.legacy_riwayat_file = 'riwayat_diagnosis.json'
         
-        self.gejala_list, self.rules, self.solusi = file_handler.load_app_data(self.json_file)
-        if self.gejala_list is None:
+        kb = knowledge_base.load_knowledge_base(self.json_file)
+        if kb is None:
             self.root.destroy()
             return
+        self.kb = kb
+        self.gejala_list, self.rules, self.solusi = kb.gejala_list, kb.rules, kb.solusi
+        self.startup_timer.mark("data aplikasi")
             
-        self.riwayat = file_handler.load_history(self.riwayat_file)
-        self.filtered_riwayat = self.riwayat.copy()
+        # Riwayat dimuat di latar belakang setelah jendela tampil; sampai saat itu
+        # history_store bernilai None dan entri baru ditampung di _pending_riwayat.
+        self.history_store = None
+        self._pending_riwayat = []
+        # Seluruh riwayat di memori, terindeks per id entri, tanggal, dan teks
+        self.history_index = HistoryIndex()
+        self.filtered_riwayat = self.history_index.search()
+        self._filter_job = None
+        # Ringkasan analitik yang disimpan di samping riwayat; None sampai riwayat dimuat
+        self.analytics = None
+        self._analytics_rebuild = None
         
+        self.engine = kb.engine
+        if metrics is not None:
+            metrics.set_rules(kb.rules)
+        self.diagnosis_cache = DiagnosisCache(
+            self.json_file, self.engine, kb.gejala_ids, precompute=True, kb_hash=kb.digest, auto_reload=not watch_kb,
+            metrics=metrics
+        )
+        # Mode --watch-kb: file dipantau berkala dan aturan ditukar di antara dua diagnosis
+        self.kb_watcher = KnowledgeBaseWatcher(self.json_file, kb) if watch_kb else None
+        self._kb_reload = self._kb_pending = None
         self.facts = {gejala["id"]: False for gejala in self.gejala_list}
-        self.gejala_vars = {}
+        self.gejala_by_id = {gejala["id"]: gejala for gejala in self.gejala_list}
+        # Gejala yang dicentang di panel gejala
+        self.gejala_selection = SymptomSelection(self.gejala_list)
+        self._diagnosis_job = None
+        self.startup_timer.mark("mesin inferensi & cache")
         
-        self.export_manager = ExportManager()
+        self._export_manager = None
         self.gui_builder = GuiBuilder(self)
         
         self.gui_builder.create_main_tabs()
+        self.startup_timer.mark("antarmuka")
+        self.root.after_idle(self._on_window_shown)
+        if self.kb_watcher:
+            self.root.after(INTERVAL_PANTAU_KB_MS, self._poll_knowledge_base)
+
+    @property
+    def export_manager(self):
+        # Modul ekspor (dan reportlab) baru diimpor saat tombol ekspor pertama kali dipakai
+        if self._export_manager is None:
+            from export_manager import ExportManager
+            self._export_manager = ExportManager(self.root, self.metrics)
+        return self._export_manager
+
+    def _poll_knowledge_base(self):
+        if self._kb_reload is not None:
+            try:
+                self._kb_pending = self._kb_reload.get_nowait()
+                self._kb_reload = None
+            except queue.Empty:
+                pass
+        elif self._kb_pending is None and self.kb_watcher.changed():
+            # Membaca dan mengompilasi di thread latar belakang; aturan lama tetap dipakai sementara itu
+            results = self._kb_reload = queue.Queue()
+            threading.Thread(target=lambda: results.put(self.kb_watcher.reload()), daemon=True).start()
+        if self._kb_pending is not None and self._diagnosis_job is None:
+            self.apply_knowledge_base(*self._kb_pending)
+            self._kb_pending = None
+        busy = self._kb_reload is not None or self._kb_pending is not None
+        self.root.after(100 if busy else INTERVAL_PANTAU_KB_MS, self._poll_knowledge_base)
+
+    def apply_knowledge_base(self, kb, change):
+        """Menukar basis pengetahuan yang sedang dipakai; panel gejala dibangun ulang hanya bila katalognya berubah."""
+        self.diagnosis_cache.swap(kb)
+        self.kb = kb
+        self.engine = self.diagnosis_cache.engine
+        self.rules, self.solusi = self.engine.rules, self.engine.solusi
+        if change.catalogue_changed:
+            self.gejala_list = kb.gejala_list
+            self.gejala_by_id = {gejala["id"]: gejala for gejala in self.gejala_list}
+            self.facts = {gejala["id"]: False for gejala in self.gejala_list}
+            self.gui_builder.build_gejala_panel()
+        print(f"🔄 {change}")
+
+    def _on_window_shown(self):
+        self.startup_timer.mark("jendela tampil")
+        self._load_history_async()
+
+    def _load_history_async(self):
+        """Membuka store riwayat dan membangun indeksnya di thread latar belakang."""
+        results = queue.Queue()
+
+        def target():
+            try:
+                start = time.perf_counter()
+                store = history_store.open_history_store(self.riwayat_file, self.legacy_riwayat_file)
+                # Entri dibaca bertahap langsung ke tabel kolom indeks, tanpa daftar dict sementara
+                index = HistoryIndex(store.iter_entries())
+                if self.metrics is not None:
+                    self.metrics.observe("riwayat_muat", time.perf_counter() - start)
+                # Hanya entri yang ditulis sejak ringkasan terakhir disimpan yang dibaca ulang
+                analytics = history_analytics.HistoryAnalytics.load(history_analytics.analytics_path(self.riwayat_file))
+                if analytics.catch_up(store):
+                    self._save_analytics(analytics)
+                results.put((store, index, analytics))
+            except (OSError, sqlite3.Error) as e:
+                results.put(e)
+
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(50, self._poll_history_load, results)
+
+    def _poll_history_load(self, results):
+        try:
+            loaded = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_history_load, results)
+            return
+        if isinstance(loaded, Exception):
+            messagebox.showerror("Error", f"Gagal memuat riwayat: {str(loaded)}")
+            return
+        store, index, analytics = loaded
+        # Diagnosis yang dibuat selama pemuatan lebih baru dari semua entri tersimpan
+        pending, self._pending_riwayat = self._pending_riwayat, None
+        self.history_store, self.history_index, self.analytics = store, index, analytics
+        for entry in pending:
+            index.add(entry)
+        if pending:
+            try:
+                store.append_many(pending)
+            except (OSError, sqlite3.Error) as e:
+                messagebox.showerror("Error", f"Gagal menyimpan riwayat: {str(e)}")
+            self.update_analytics()
+        self.filtered_riwayat = self.search_riwayat()
+        self.update_riwayat_tree()
+        self.update_analitik_view()
+        print(f"✓ Riwayat dimuat: {len(self.history_index)} entri")
+        self.startup_timer.mark("riwayat dimuat")
+        if self.startup_report:
+            self.startup_report(self)
 
     def run_diagnosis(self):
         """
-        Menjalankan proses diagnosis dengan output log dan hasil yang lengkap.
+        Memulai diagnosis di thread pekerja. Log dan hasil disusun di thread
+        tersebut sebagai teks utuh, lalu dirender di thread Tk lewat root.after.
         """
-        gejala_terpilih = [gid for gid, var in self.gejala_vars.items() if var.get()]
+        if self._diagnosis_job is not None:
+            return
+        gejala_terpilih = self.gejala_selection.selected()
         if not gejala_terpilih:
             messagebox.showwarning("⚠️ Peringatan", "Pilih minimal satu gejala untuk melakukan diagnosis.")
             return
+        gejala_nama = [self.gejala_by_id[gid]["nama"] for gid in gejala_terpilih]
+        verbosity = NAMA_TINGKAT_JEJAK[self.trace_level_var.get()]
+
+        results = queue.Queue()
+        cancel_event = threading.Event()
+
+        def target():
+            try:
+                result = self.diagnosis_cache.diagnose(gejala_terpilih, cancel_event, verbosity)
+                trace = InferenceTrace.from_result(result, self.diagnosis_cache.engine.rules, gejala_nama, verbosity)
+                log = trace.render() if trace else "📝 Log inferensi dinonaktifkan (detail log: Mati).\n"
+                results.put((result, trace, log, self.format_result(result)))
+            except DiagnosisCancelled:
+                results.put(None)
+            except Exception as e:
+                results.put(e)
+
+        self._diagnosis_job = cancel_event
+        self._set_diagnosing(True)
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(20, self._poll_diagnosis, results, cancel_event, gejala_nama)
 
+    def cancel_diagnosis(self):
+        if self._diagnosis_job is None:
+            return
+        self._diagnosis_job.set()
+        self._diagnosis_job = None
+        self._set_diagnosing(False)
+        self._show_texts("⏹ Diagnosis dibatalkan.\n", "💡 Pilih gejala dan klik 'Mulai Diagnosis' untuk mencoba lagi.")
+
+    def _set_diagnosing(self, active):
+        if active:
+            self.diagnosis_button.config(text="⏹ Batalkan Diagnosis", command=self.cancel_diagnosis)
+            self.reset_button.config(state=tk.DISABLED)
+            self.root.config(cursor="watch")
+            self._show_texts("⏳ Mendiagnosis...\n", "⏳ Mendiagnosis...\n")
+        else:
+            self.diagnosis_button.config(text="🔍 Mulai Diagnosis", command=self.run_diagnosis)
+            self.reset_button.config(state=tk.NORMAL)
+            self.root.config(cursor="")
+
+    def _poll_diagnosis(self, results, cancel_event, gejala_nama):
+        try:
+            outcome = results.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self._poll_diagnosis, results, cancel_event, gejala_nama)
+            return
+        if cancel_event is not self._diagnosis_job:
+            # Sudah dibatalkan: tampilan sudah dikembalikan, hasil diabaikan
+            return
+        self._diagnosis_job = None
+        self._set_diagnosing(False)
+        if isinstance(outcome, Exception):
+            self._show_texts("", "")
+            messagebox.showerror("Error", f"Gagal menjalankan diagnosis: {str(outcome)}")
+            return
+        result, trace, log, hasil = outcome
+        # Cache memuat ulang aturan bila file basis pengetahuan berubah
+        self.engine = self.diagnosis_cache.engine
+        self.rules, self.solusi = self.engine.rules, self.engine.solusi
         self.facts = {gejala["id"]: False for gejala in self.gejala_list}
-        for gid in gejala_terpilih:
-            self.facts[gid] = True
-        
-        self.log_text.config(state=tk.NORMAL)
-        self.result_text.config(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
-        self.result_text.delete(1.0, tk.END)
+        for fact in result.facts:
+            self.facts[fact] = True
 
-        new_facts_found, conclusions, iteration_count = True, {}, 0
-        
-        self.log_text.insert(tk.END, "🔍 MEMULAI PROSES DIAGNOSIS\n")
-        self.log_text.insert(tk.END, "="*50 + "\n\n")
-        self.log_text.insert(tk.END, "📝 FAKTA AWAL (Gejala yang dipilih):\n")
-        for gid in gejala_terpilih:
-            gejala_obj = next((g for g in self.gejala_list if g["id"] == gid), None)
-            if gejala_obj:
-                self.log_text.insert(tk.END, f"   ✓ {gejala_obj['nama']}\n")
-        self.log_text.insert(tk.END, "\n" + "="*50 + "\n")
-        self.log_text.insert(tk.END, "🔄 PROSES FORWARD CHAINING:\n\n")
-
-        while new_facts_found:
-            new_facts_found = False
-            iteration_count += 1
-            self.log_text.insert(tk.END, f"📍 Iterasi {iteration_count}:\n")
-            
-            for rule_idx, rule in enumerate(self.rules, 1):
-                conclusion = rule["conclusion"]
-                if not self.facts.get(conclusion, False):
-                    if all(self.facts.get(cond, False) for cond in rule["conditions"]):
-                        self.facts[conclusion] = True
-                        new_facts_found = True
-                        if conclusion.startswith("kemungkinan_"):
-                            conclusions[conclusion] = rule.get("bobot", 1.0)
-                        
-                        conditions_text = ', '.join(rule['conditions'])
-                        self.log_text.insert(tk.END, f"   ✅ Rule {rule_idx}: JIKA ({conditions_text}) MAKA {conclusion}\n")
-                        self.log_text.insert(tk.END, f"      💡 Bobot keyakinan: {rule.get('bobot', 1.0)*100:.1f}%\n")
-            
-            if not new_facts_found:
-                self.log_text.insert(tk.END, "   ❌ Tidak ada rule baru yang dapat diterapkan\n")
-            
-            self.log_text.insert(tk.END, "\n")
-            if iteration_count > 50:
-                self.log_text.insert(tk.END, "⚠️ Batas iterasi tercapai, proses dihentikan.\n")
-                break
-
-        self.log_text.insert(tk.END, "="*50 + "\n")
-        self.log_text.insert(tk.END, "🏁 PROSES FORWARD CHAINING SELESAI\n")
-        self.log_text.insert(tk.END, f"📊 Total iterasi: {iteration_count}\n")
-        self.log_text.insert(tk.END, f"📋 Kesimpulan ditemukan: {len(conclusions)}\n")
-        
-        diagnosis_results = sorted(
-            [(c.replace("kemungkinan_", "").replace("_", " ").title(), conf) for c, conf in conclusions.items()],
-            key=lambda x: x[1], reverse=True
-        )
-        
-        recommendations = [self.solusi[key] for key in self.solusi if self.facts.get(key, False)]
-        
-        self.result_text.insert(tk.END, "🩺 HASIL DIAGNOSIS\n" + "="*40 + "\n\n")
-        
+        self._show_texts(log, hasil)
+        added = self.simpan_riwayat(result, gejala_nama, trace)
+        self.update_riwayat_tree(prepended=added)
+        self.result_text.see(tk.INSERT)
+
+    def _show_texts(self, log, hasil):
+        """Mengganti isi panel log dan hasil, masing-masing dengan satu insert."""
+        for widget, text in ((self.log_text, log), (self.result_text, hasil)):
+            widget.config(state=tk.NORMAL)
+            widget.delete(1.0, tk.END)
+            widget.insert(tk.END, text)
+            widget.config(state=tk.DISABLED)
+
+    @staticmethod
+    def format_result(result):
+        """Menyusun teks hasil diagnosis, rekomendasi, dan disclaimer."""
+        diagnosis_results = result.diagnosis_results
+        recommendations = result.recommendations
+
+        lines = ["🩺 HASIL DIAGNOSIS\n" + "="*40 + "\n\n"]
         if diagnosis_results:
-            self.result_text.insert(tk.END, "📊 Diagnosis yang Terdeteksi:\n")
+            lines.append("📊 Diagnosis yang Terdeteksi:\n")
             for i, (diagnosis, confidence) in enumerate(diagnosis_results, 1):
                 confidence_pct = confidence * 100
                 emoji = "🔴" if confidence_pct >= 80 else "🟡" if confidence_pct >= 60 else "🟢"
                 interpretasi = "Sangat mungkin" if confidence_pct >= 80 else "Kemungkinan besar" if confidence_pct >= 60 else "Mungkin" if confidence_pct >= 40 else "Kemungkinan kecil"
-                self.result_text.insert(tk.END, f"{i}. {emoji} {diagnosis}\n")
-                self.result_text.insert(tk.END, f"   Tingkat Keyakinan: {confidence_pct:.1f}%\n")
-                self.result_text.insert(tk.END, f"   Interpretasi: {interpretasi}\n\n")
+                lines.append(f"{i}. {emoji} {diagnosis}\n")
+                lines.append(f"   Tingkat Keyakinan: {confidence_pct:.1f}%\n")
+                lines.append(f"   Interpretasi: {interpretasi}\n\n")
         else:
-            self.result_text.insert(tk.END, "❌ Tidak ada diagnosis spesifik yang dapat disimpulkan.\n")
-            self.result_text.insert(tk.END, "💡 Gejala tidak cukup spesifik atau tidak cocok dengan pola penyakit.\n\n")
+            lines.append("❌ Tidak ada diagnosis spesifik yang dapat disimpulkan.\n")
+            lines.append("💡 Gejala tidak cukup spesifik atau tidak cocok dengan pola penyakit.\n\n")
 
         if recommendations:
-            self.result_text.insert(tk.END, "💡 REKOMENDASI PENGOBATAN:\n" + "-" * 30 + "\n")
-            for i, rec in enumerate(recommendations, 1): self.result_text.insert(tk.END, f"{i}. {rec}\n")
-            self.result_text.insert(tk.END, "\n")
+            lines.append("💡 REKOMENDASI PENGOBATAN:\n" + "-" * 30 + "\n")
+            lines.extend(f"{i}. {rec}\n" for i, rec in enumerate(recommendations, 1))
+            lines.append("\n")
         else:
-            self.result_text.insert(tk.END, "💡 REKOMENDASI UMUM:\n" + "-" * 20 + "\n")
-            self.result_text.insert(tk.END, "• Istirahat yang cukup\n• Banyak minum air putih\n• Konsultasi dokter jika gejala memburuk\n\n")
+            lines.append("💡 REKOMENDASI UMUM:\n" + "-" * 20 + "\n")
+            lines.append("• Istirahat yang cukup\n• Banyak minum air putih\n• Konsultasi dokter jika gejala memburuk\n\n")
 
-        self.result_text.insert(tk.END, "⚠️ DISCLAIMER:\n")
-        self.result_text.insert(tk.END, "Hasil ini hanya referensi awal. Selalu konsultasikan dengan tenaga medis profesional.\n")
-        
-        self.log_text.config(state=tk.DISABLED)
-        self.result_text.config(state=tk.DISABLED)
-        
-        diagnosis_str = ", ".join([f"{d} ({c*100:.1f}%)" for d, c in diagnosis_results]) or "Tidak ada diagnosis"
-        max_confidence = max([c for _, c in diagnosis_results], default=0)
-        self.simpan_riwayat(diagnosis_str, max_confidence)
-        self.update_riwayat_tree()
-        self.result_text.see(tk.INSERT)
+        lines.append("⚠️ DISCLAIMER:\n")
+        lines.append("Hasil ini hanya referensi awal. Selalu konsultasikan dengan tenaga medis profesional.\n")
+        return "".join(lines)
 
     def reset_form(self):
-        for var in self.gejala_vars.values(): var.set(False)
+        self.gejala_selection.clear()
         self.log_text.config(state=tk.NORMAL)
         self.result_text.config(state=tk.NORMAL)
         self.log_text.delete(1.0, tk.END)
@@ -149,65 +314,204 @@ class DiagnosisApp:
         self.log_text.config(state=tk.DISABLED)
         self.result_text.config(state=tk.DISABLED)
 
-    def simpan_riwayat(self, diagnosis, confidence):
-        gejala_terpilih_nama = [g["nama"] for g in self.gejala_list if self.gejala_vars.get(g["id"]) and self.gejala_vars[g["id"]].get()]
-        rekomendasi = [self.solusi[key] for key in self.solusi if self.facts.get(key, False)]
-        riwayat_entry = {
-            "tanggal": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "gejala": gejala_terpilih_nama, "diagnosis": diagnosis,
-            "tingkat_keyakinan": confidence, "rekomendasi": rekomendasi
-        }
-        self.riwayat.insert(0, riwayat_entry)
-        self.filtered_riwayat = self.riwayat.copy()
-        file_handler.save_history(self.riwayat_file, self.riwayat)
-
-    def update_riwayat_tree(self):
-        for item in self.tree.get_children(): self.tree.delete(item)
-        for entry in self.filtered_riwayat:
-            self.tree.insert('', 'end', values=(
-                entry["tanggal"], entry["diagnosis"], f"{entry['tingkat_keyakinan']*100:.1f}%"
-            ))
-        total = len(self.riwayat)
+    def simpan_riwayat(self, result, gejala_nama, trace=None):
+        riwayat_entry = file_handler.create_history_entry(gejala_nama, result, jejak=trace)
+        before = len(self.filtered_riwayat)
+        self.history_index.add(riwayat_entry)
+        self.filtered_riwayat = self.search_riwayat()
+        if self.history_store is None:
+            self._pending_riwayat.append(riwayat_entry)
+            return len(self.filtered_riwayat) - before
+        try:
+            start = time.perf_counter()
+            self.history_store.append(riwayat_entry)
+            if self.metrics is not None:
+                self.metrics.observe("riwayat_simpan", time.perf_counter() - start)
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror("Error", f"Gagal menyimpan riwayat: {str(e)}")
+        else:
+            self.update_analytics()
+        # Jumlah baris baru di depan hasil filter, untuk pembaruan Treeview inkremental
+        return len(self.filtered_riwayat) - before
+
+    def update_riwayat_tree(self, prepended=0):
+        if prepended:
+            self.history_view.rows = self.filtered_riwayat
+            self.history_view.notify_prepended(prepended)
+        else:
+            self.history_view.set_rows(self.filtered_riwayat)
+        total = len(self.history_index)
         filtered = len(self.filtered_riwayat)
+        if self.history_store is None:
+            self.info_label.config(text="⏳ Memuat riwayat...")
+            return
         info = f"📊 Total: {total} entri" if total == filtered else f"📊 Menampilkan: {filtered} dari {total} entri"
         self.info_label.config(text=info)
 
     def filter_riwayat(self, *args):
-        search_text = self.search_var.get().lower()
-        month_filter = self.month_filter_var.get()
-        month_map = {'Januari': '01', 'Februari': '02', 'Maret': '03', 'April': '04', 'Mei': '05', 'Juni': '06', 'Juli': '07', 'Agustus': '08', 'September': '09', 'Oktober': '10', 'November': '11', 'Desember': '12'}
-        
-        self.filtered_riwayat = [
-            entry for entry in self.riwayat
-            if (search_text in entry['diagnosis'].lower()) and
-                (month_filter == 'Semua' or entry['tanggal'][5:7] == month_map.get(month_filter))
-        ]
+        # Debounce: pencarian baru dijalankan setelah pengguna berhenti mengetik sejenak
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(250, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        self.filtered_riwayat = self.search_riwayat()
         self.update_riwayat_tree()
 
+    def search_riwayat(self):
+        """Menjawab filter yang sedang aktif dari indeks riwayat."""
+        return self.history_index.search(
+            self.search_var.get(),
+            month=NAMA_BULAN.get(self.month_filter_var.get()),
+            date_from=self.date_from_var.get().strip(),
+            date_to=self.date_to_var.get().strip(),
+        )
+
     def clear_filters(self):
         self.search_var.set('')
         self.month_filter_var.set('Semua')
+        self.date_from_var.set('')
+        self.date_to_var.set('')
 
     def hapus_riwayat(self):
-        if not self.riwayat:
+        if self.history_store is None:
+            messagebox.showinfo("Informasi", "Riwayat masih dimuat, silakan coba lagi sebentar lagi.")
+            return
+        if not len(self.history_index):
             messagebox.showinfo("Informasi", "Tidak ada riwayat untuk dihapus.")
             return
         if not messagebox.askyesno("Konfirmasi Hapus", "Apakah Anda yakin ingin menghapus SEMUA riwayat?\n\nTindakan ini tidak dapat dibatalkan."):
             return
-        self.riwayat, self.filtered_riwayat = [], []
-        file_handler.save_history(self.riwayat_file, self.riwayat)
+        try:
+            self.history_store.clear()
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror("Error", f"Gagal menghapus riwayat: {str(e)}")
+            return
+        self.history_index.clear()
+        self.update_analytics(rebuild=True)
+        self.filtered_riwayat = self.search_riwayat()
         self.update_riwayat_tree()
         messagebox.showinfo("Berhasil", "Semua riwayat diagnosis telah dihapus.")
 
+    def hapus_entri(self):
+        """Menghapus entri riwayat yang dipilih di Treeview (iid item adalah id entri)."""
+        if self.history_store is None:
+            messagebox.showinfo("Informasi", "Riwayat masih dimuat, silakan coba lagi sebentar lagi.")
+            return
+        entry_ids = [int(iid) for iid in self.tree.selection()]
+        if not entry_ids:
+            messagebox.showinfo("Informasi", "Pilih entri riwayat yang akan dihapus.")
+            return
+        if not messagebox.askyesno("Konfirmasi Hapus", f"Hapus {len(entry_ids)} entri riwayat terpilih?"):
+            return
+        try:
+            self.history_store.delete(entry_ids)
+        except (OSError, sqlite3.Error) as e:
+            messagebox.showerror("Error", f"Gagal menghapus riwayat: {str(e)}")
+            return
+        for entry_id in entry_ids:
+            entry = self.history_index.get(entry_id)
+            if entry is not None:
+                self.history_index.remove(entry_id)
+                if self.analytics is not None:
+                    self.analytics.remove(entry)
+        self.update_analytics()
+        self.filtered_riwayat = self.search_riwayat()
+        self.update_riwayat_tree()
+
+    @staticmethod
+    def _save_analytics(analytics):
+        try:
+            analytics.save()
+        except OSError as e:
+            print(f"⚠ Gagal menyimpan ringkasan analitik: {e}")
+
+    def update_analytics(self, rebuild=False):
+        """Menyusulkan ringkasan analitik dengan entri baru di store (atau menghitung ulang), lalu menyimpannya."""
+        if self.analytics is None:
+            return
+        try:
+            if rebuild:
+                self.analytics.rebuild(self.history_store)
+            else:
+                self.analytics.catch_up(self.history_store)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠ Gagal memperbarui ringkasan analitik: {e}")
+            return
+        self._save_analytics(self.analytics)
+        self.update_analitik_view()
+
+    def rebuild_analitik(self):
+        """Menghitung ulang ringkasan analitik dari seluruh riwayat di thread latar belakang."""
+        if self.analytics is None or self._analytics_rebuild is not None:
+            return
+        results = self._analytics_rebuild = queue.Queue()
+        store, file_path = self.history_store, self.analytics.file_path
+
+        def target():
+            try:
+                analytics = history_analytics.HistoryAnalytics(file_path)
+                analytics.rebuild(store)
+                results.put(analytics)
+            except (OSError, sqlite3.Error) as e:
+                results.put(e)
+
+        self.rebuild_analitik_button.config(state=tk.DISABLED)
+        self.analitik_label.config(text="⏳ Membangun ulang ringkasan...")
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(50, self._poll_analytics_rebuild, results)
+
+    def _poll_analytics_rebuild(self, results):
+        try:
+            analytics = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._poll_analytics_rebuild, results)
+            return
+        self._analytics_rebuild = None
+        self.rebuild_analitik_button.config(state=tk.NORMAL)
+        if isinstance(analytics, Exception):
+            messagebox.showerror("Error", f"Gagal membangun ulang ringkasan: {str(analytics)}")
+            self.update_analitik_view()
+            return
+        # Entri yang disimpan selama penghitungan ulang disusulkan dari watermark-nya
+        self.analytics = analytics
+        self.update_analytics()
+
+    def update_analitik_view(self):
+        """Mengisi tab analitik dari ringkasan; hanya bila tab tersebut sedang dibuka."""
+        if self.analytics is None or self._analytics_rebuild is not None:
+            return
+        if self.notebook.select() != str(self.tab_analitik):
+            return
+        analytics = self.analytics
+        nama_bulan = {nomor: nama for nama, nomor in NAMA_BULAN.items()}
+        tables = self.analitik_tables
+        for tree in tables.values():
+            tree.delete(*tree.get_children())
+
+        def teratas(ranked):
+            return ", ".join(f"{nama} ({jumlah})" for nama, jumlah in ranked[:3])
+
+        for month, count, ranked in analytics.recent_months():
+            label = f"{nama_bulan.get(month[5:], month[5:])} {month[:4]}"
+            tables['bulan'].insert('', 'end', values=(label, count, teratas(ranked)))
+        for day, count, ranked in analytics.recent_days():
+            tables['hari'].insert('', 'end', values=(day, count, teratas(ranked)))
+        for gejala, count in analytics.top_symptoms():
+            tables['gejala'].insert('', 'end', values=(gejala, count, f"{count / analytics.total * 100:.1f}%"))
+        distribution = analytics.confidence_distribution()
+        peak = max((count for _, _, count in distribution), default=0) or 1
+        for low, high, count in reversed(distribution):
+            tables['keyakinan'].insert('', 'end', values=(f"{low}-{high}%", count, "█" * round(count / peak * 30)))
+        self.analitik_label.config(text=f"📈 Ringkasan dari {analytics.total} entri riwayat")
+
     def show_riwayat_detail(self, event):
-        selected_item_id = self.tree.focus()
-        if not selected_item_id: return
-        tanggal_pilihan = self.tree.item(selected_item_id)['values'][0]
-        detail_data = next((r for r in self.riwayat if r['tanggal'] == tanggal_pilihan), None)
+        detail_data = self.history_view.entry_for(self.tree.focus())
         
         if detail_data:
             win_detail = tk.Toplevel(self.root)
-            win_detail.title(f"📋 Detail Diagnosis - {tanggal_pilihan}")
+            win_detail.title(f"📋 Detail Diagnosis - {detail_data['tanggal']}")
             win_detail.geometry("500x550")
             win_detail.transient(self.root)
             win_detail.grab_set()
@@ -222,12 +526,74 @@ class DiagnosisApp:
             
             text_widget.insert(tk.END, konten)
             text_widget.config(state=tk.DISABLED)
-            ttk.Button(win_detail, text="Tutup", command=win_detail.destroy).pack(pady=10)
+            button_frame = ttk.Frame(win_detail)
+            button_frame.pack(pady=10)
+            if detail_data.get('jejak'):
+                ttk.Button(button_frame, text="🔍 Jejak Inferensi", command=lambda: self.show_jejak(win_detail, detail_data)).pack(side='left', padx=5)
+            ttk.Button(button_frame, text="Tutup", command=win_detail.destroy).pack(side='left', padx=5)
+
+    def show_jejak(self, parent, detail_data):
+        """Memutar ulang log inferensi dari jejak yang tersimpan, tanpa menjalankan inferensi lagi."""
+        win_jejak = tk.Toplevel(parent)
+        win_jejak.title(f"🔍 Jejak Inferensi - {detail_data['tanggal']}")
+        win_jejak.geometry("600x500")
+        win_jejak.transient(parent)
+        text_widget = scrolledtext.ScrolledText(win_jejak, wrap=tk.WORD, font=("Courier New", 9))
+        text_widget.pack(padx=15, pady=15, fill="both", expand=True)
+        text_widget.insert(tk.END, InferenceTrace.from_dict(detail_data['jejak']).render())
+        text_widget.config(state=tk.DISABLED)
+        ttk.Button(win_jejak, text="Tutup", command=win_jejak.destroy).pack(pady=10)
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # Mode tanpa GUI: python main.py batch [input.jsonl] [-o hasil.jsonl] ...
+        import batch_cli
+        sys.exit(batch_cli.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "layanan":
+        # Layanan HTTP/JSON lokal: python main.py layanan [--port 8765] ...
+        import diagnosis_service
+        sys.exit(diagnosis_service.main(sys.argv[2:]))
+
+    parser = argparse.ArgumentParser(description="Sistem Pakar Diagnosis Flu")
+    parser.add_argument("--watch-kb", action="store_true",
+                        help="pantau gejala_penyakit.json dan muat ulang aturan tanpa menutup aplikasi")
+    parser.add_argument("--metrik", metavar="FILE",
+                        help="aktifkan metrik dan tulis berkala dalam format teks Prometheus ke FILE")
+    parser.add_argument("--metrik-json", metavar="FILE", help="aktifkan metrik dan tulis snapshot JSON ke FILE")
+    parser.add_argument("--metrik-interval", type=float, default=INTERVAL_EKSPOR_METRIK, metavar="DETIK",
+                        help=f"selang penulisan file metrik (bawaan {INTERVAL_EKSPOR_METRIK} detik)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="ukur fase startup dan waktu impor, cetak laporan, lalu keluar")
+    parser.add_argument("--startup-budget", type=float, default=ANGGARAN_STARTUP_MS, metavar="MS",
+                        help=f"anggaran hingga jendela tampil (bawaan {ANGGARAN_STARTUP_MS} ms)")
+    args = parser.parse_args()
+
+    timer = StartupTimer(_STARTUP_T0)
+    timer.mark("impor modul")
+    exit_code = 0
+
+    def report_and_exit(app):
+        global exit_code
+        print(format_report(app.startup_timer, import_times("main"), args.startup_budget, "jendela tampil"))
+        if app.startup_timer.elapsed_ms("jendela tampil") > args.startup_budget:
+            exit_code = 1
+        app.root.destroy()
+
+    metrics = exporter = None
+    if args.metrik or args.metrik_json:
+        metrics = Metrics()
+        exporter = MetricsExporter(metrics, args.metrik, args.metrik_json, args.metrik_interval).start()
+
     print("🏥 Memulai Sistem Pakar Diagnosis Flu")
     root = tk.Tk()
-    app = DiagnosisApp(root)
+    app = DiagnosisApp(root, timer, report_and_exit if args.startup_report else None, watch_kb=args.watch_kb, metrics=metrics)
     root.mainloop()
+    if exporter is not None:
+        exporter.stop()
+
+    if hasattr(app, "diagnosis_cache"):
+        stats = app.diagnosis_cache.stats()
+        print(f"📊 Cache diagnosis: {stats['hits']} hit, {stats['misses']} miss ({stats['hit_rate']*100:.1f}% hit)")
 
     print("👋 Aplikasi ditutup. Terima kasih!")
+    sys.exit(exit_code)
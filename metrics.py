@@ -0,0 +1,186 @@
+import json
+import os
+import threading
+import time
+
+# Batas atas bucket histogram waktu (detik)
+BUCKET_WAKTU = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+# Selang penulisan file metrik (detik)
+INTERVAL_EKSPOR_METRIK = 15
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Histogram kumulatif bergaya Prometheus dengan bucket tetap."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=BUCKET_WAKTU):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self):
+        return {"jumlah": self.count, "total_detik": round(self.sum, 6),
+                "bucket": {f"{bound:g}": count for bound, count in self.cumulative()}}
+
+
+class Metrics:
+    """
+    Metrik opsional untuk mesin inferensi, riwayat, dan ekspor.
+
+    Penghitung per aturan (evaluasi, yaitu diagnosis yang memeriksa setidaknya
+    satu kondisi aturan tersebut, dan penembakan) direkonstruksi dari hasil
+    diagnosis lewat InferenceEngine.rule_activity, sehingga loop forward
+    chaining sendiri tidak diinstrumentasi. Bila metrik tidak diaktifkan,
+    pemanggil cukup memegang None dan tidak ada biaya tambahan.
+    """
+
+    def __init__(self, rules=()):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.conclusions = None
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        """Mengganti daftar aturan; penghitung per aturan direset bila kesimpulannya berbeda."""
+        conclusions = [rule["conclusion"] for rule in rules]
+        with self._lock:
+            if conclusions != self.conclusions:
+                self.conclusions = conclusions
+                self.rule_evaluations = [0] * len(conclusions)
+                self.rule_firings = [0] * len(conclusions)
+
+    def inc(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name, seconds):
+        with self._lock:
+            self._observe(name, seconds)
+
+    def _observe(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def record_diagnosis(self, engine, result, seconds, cached=False):
+        """
+        Mencatat satu diagnosis beserta aktivitas per aturannya, juga untuk
+        hasil dari cache (aktivitasnya direkonstruksi dari hasil yang sama).
+        Hanya waktunya yang dibedakan: inferensi yang benar-benar dijalankan
+        masuk histogram `inferensi`, jawaban cache masuk histogram `cache_hit`.
+        """
+        evaluated, fired, checks = engine.rule_activity(result)
+        with self._lock:
+            if len(self.conclusions) != len(engine.rules):
+                return
+            for idx in evaluated:
+                self.rule_evaluations[idx] += 1
+            for idx in fired:
+                self.rule_firings[idx] += 1
+            counters = self.counters
+            for name, amount in (("diagnosis", 1), ("diagnosis_cache_hit", int(cached)), ("iterasi", result.iterations),
+                                 ("pemeriksaan_kondisi", checks), ("batas_iterasi_tercapai", int(result.limit_reached))):
+                counters[name] = counters.get(name, 0) + amount
+            self._observe("cache_hit" if cached else "inferensi", seconds)
+
+    def snapshot(self):
+        """Salinan metrik sebagai dict yang siap ditulis ke JSON."""
+        with self._lock:
+            return {
+                "waktu": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "penghitung": dict(self.counters),
+                "histogram": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+                "aturan": [
+                    {"rule": idx + 1, "kesimpulan": conclusion, "evaluasi": evaluations, "penembakan": firings}
+                    for idx, (conclusion, evaluations, firings)
+                    in enumerate(zip(self.conclusions, self.rule_evaluations, self.rule_firings))
+                ],
+                "tidak_pernah_ditembakkan": [idx + 1 for idx, firings in enumerate(self.rule_firings) if not firings],
+            }
+
+    def to_prometheus(self):
+        """Metrik dalam format teks eksposisi Prometheus."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                lines += [f"# TYPE sistem_pakar_{name}_total counter", f"sistem_pakar_{name}_total {value}"]
+            for title, values in (("evaluasi", self.rule_evaluations), ("penembakan", self.rule_firings)):
+                lines.append(f"# TYPE sistem_pakar_aturan_{title}_total counter")
+                lines.extend(
+                    f'sistem_pakar_aturan_{title}_total{{rule="{idx + 1}",kesimpulan="{_escape_label(conclusion)}"}} {value}'
+                    for idx, (conclusion, value) in enumerate(zip(self.conclusions, values))
+                )
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"sistem_pakar_{name}_detik"
+                lines.append(f"# TYPE {metric} histogram")
+                lines.extend(f'{metric}_bucket{{le="{bound:g}"}} {count}' for bound, count in histogram.cumulative())
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum:.6f}")
+                lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, prometheus_file=None, json_file=None):
+        """Menulis file metrik secara atomik (tulis ke .tmp lalu ganti)."""
+        for path, render in ((prometheus_file, self.to_prometheus),
+                             (json_file, lambda: json.dumps(self.snapshot(), indent=2, ensure_ascii=False))):
+            if not path:
+                continue
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                file.write(render())
+            os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """Thread latar belakang yang menulis file metrik setiap `interval` detik dan sekali lagi saat dihentikan."""
+
+    def __init__(self, metrics, prometheus_file=None, json_file=None, interval=INTERVAL_EKSPOR_METRIK):
+        self.metrics = metrics
+        self.prometheus_file = prometheus_file
+        self.json_file = json_file
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            self.metrics.write(self.prometheus_file, self.json_file)
+        except OSError as e:
+            print(f"⚠ Gagal menulis metrik: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._write()
@@ -0,0 +1,140 @@
+import json
+import os
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import file_handler
+
+# Jumlah baris per row group; satu row group disusun di memori sekaligus
+UKURAN_ROW_GROUP = 20000
+# File status ekspor inkremental di dalam direktori tujuan
+FILE_WATERMARK = "_watermark.json"
+
+SKEMA = pa.schema([
+    pa.field("id", pa.int64(), nullable=False),
+    pa.field("tanggal", pa.timestamp("s")),
+    pa.field("diagnosis", pa.string()),
+    pa.field("daftar_diagnosis", pa.list_(pa.struct([("nama", pa.string()), ("keyakinan", pa.float64())]))),
+    pa.field("tingkat_keyakinan", pa.float64()),
+    pa.field("gejala", pa.list_(pa.string())),
+    pa.field("rekomendasi", pa.list_(pa.string())),
+])
+
+
+class ParquetCancelled(Exception):
+    """Ekspor Parquet dihentikan oleh pengguna."""
+
+
+def _tanggal(text):
+    # Tanggal berformat lain (data lama) diekspor sebagai null
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def _diagnosis_column(diagnoses):
+    # Teks diagnosis sangat berulang: setiap teks unik cukup diurai sekali, lalu
+    # kolom list<struct> disusun langsung dari array datar dan offset-nya
+    labels = {}
+    offsets, names, weights = [0], [], []
+    for diagnosis in diagnoses:
+        parsed = labels.get(diagnosis)
+        if parsed is None:
+            parsed = labels[diagnosis] = file_handler.parse_diagnosis_labels(diagnosis)
+        for nama, keyakinan in parsed:
+            names.append(nama)
+            weights.append(keyakinan)
+        offsets.append(len(names))
+    values = pa.StructArray.from_arrays([pa.array(names, pa.string()), pa.array(weights, pa.float64())],
+                                        fields=list(SKEMA.field("daftar_diagnosis").type.value_type))
+    return pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), values, type=SKEMA.field("daftar_diagnosis").type)
+
+
+def _table(entries):
+    diagnoses = [entry["diagnosis"] for entry in entries]
+    return pa.table({
+        "id": [entry["id"] for entry in entries],
+        "tanggal": [_tanggal(entry["tanggal"]) for entry in entries],
+        "diagnosis": diagnoses,
+        "daftar_diagnosis": _diagnosis_column(diagnoses),
+        "tingkat_keyakinan": [float(entry["tingkat_keyakinan"]) for entry in entries],
+        "gejala": [entry["gejala"] for entry in entries],
+        "rekomendasi": [entry["rekomendasi"] for entry in entries],
+    }, schema=SKEMA)
+
+
+def write_parquet(entries, filename, total=None, progress=None, cancel_event=None, row_group_size=UKURAN_ROW_GROUP):
+    """
+    Menulis entri riwayat ke file Parquet, satu row group per `row_group_size`
+    entri. Gejala dan rekomendasi tetap berupa kolom list, tanggal bertipe
+    timestamp, dan label diagnosis juga tersedia sebagai list (nama,
+    keyakinan). Seperti ekspor CSV, file ditulis ke `<nama>.part` lalu
+    diganti namanya. Mengembalikan jumlah entri yang ditulis.
+    """
+    part_file = f"{filename}.part"
+    written = 0
+    try:
+        with pq.ParquetWriter(part_file, SKEMA) as writer:
+            chunk = []
+            for entry in entries:
+                chunk.append(entry)
+                if len(chunk) >= row_group_size:
+                    writer.write_table(_table(chunk), row_group_size=row_group_size)
+                    written += len(chunk)
+                    chunk.clear()
+                    if progress:
+                        progress(written, total)
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ParquetCancelled()
+            if chunk:
+                writer.write_table(_table(chunk), row_group_size=row_group_size)
+                written += len(chunk)
+        os.replace(part_file, filename)
+    except BaseException:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    if progress:
+        progress(written, total)
+    return written
+
+
+def export_incremental(store, directory, row_group_size=UKURAN_ROW_GROUP):
+    """
+    Mengekspor hanya entri yang ditambahkan ke `store` sejak ekspor inkremental
+    sebelumnya ke `directory`, sebagai file bagian baru `riwayat-<nomor>.parquet`.
+
+    Watermark store (lihat history_store.*.read_appended) disimpan di
+    `_watermark.json` setelah file bagian selesai ditulis; bila proses terhenti
+    di antaranya, ekspor berikutnya menulis ulang bagian yang sama. Entri yang
+    dihapus setelah diekspor tetap ada di bagian lama. ValueError bila store
+    sudah dikosongkan/ditulis ulang atau direktori berisi ekspor riwayat lain.
+    Mengembalikan (jumlah entri, file bagian atau None).
+    """
+    os.makedirs(directory, exist_ok=True)
+    state_file = os.path.join(directory, FILE_WATERMARK)
+    riwayat = os.path.abspath(store.file_path)
+    state = {"riwayat": riwayat, "watermark": None, "bagian": 0, "jumlah": 0}
+    if os.path.exists(state_file):
+        with open(state_file, 'r', encoding='utf-8') as file:
+            state = json.load(file)
+        if state["riwayat"] != riwayat:
+            raise ValueError(f"direktori {directory} berisi ekspor dari {state['riwayat']}")
+
+    entries, watermark = store.read_appended(state["watermark"])
+    filename = None
+    if entries:
+        state["bagian"] += 1
+        filename = os.path.join(directory, f"riwayat-{state['bagian']:06d}.parquet")
+        write_parquet(entries, filename, len(entries), row_group_size=row_group_size)
+        state["jumlah"] += len(entries)
+    state["watermark"] = watermark
+    state["diperbarui"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    tmp_path = f"{state_file}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, state_file)
+    return len(entries), filename
@@ -0,0 +1,294 @@
+import multiprocessing
+import os
+import queue
+from collections import Counter
+from datetime import datetime
+from itertools import islice
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.platypus import Frame, Paragraph, Spacer, Table, TableStyle
+
+import file_handler
+
+COL_WIDTHS = [90, 170, 60, 180]
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+
+class ReportCancelled(Exception):
+    """Pembuatan laporan dihentikan oleh pengguna."""
+
+
+class _PageWriter:
+    """Menata flowable langsung ke canvas halaman demi halaman (margin sama dengan SimpleDocTemplate)."""
+
+    def __init__(self, filename):
+        # Kompresi halaman menjaga stream halaman yang ditahan reportlab hingga save() tetap kecil
+        self.canvas = pdf_canvas.Canvas(filename, pagesize=letter, pageCompression=1)
+        self.width, self.height = letter
+        self.pages = 0
+        self._new_frame()
+
+    def _new_frame(self):
+        self.frame = Frame(inch, inch, self.width - 2 * inch, self.height - 2 * inch)
+
+    def place(self, flowable):
+        """Menggambar flowable; bila tidak muat, dipotong dan sisanya dibawa ke halaman berikutnya."""
+        while flowable is not None:
+            if self.frame.add(flowable, self.canvas, trySplit=1):
+                return
+            parts = self.split(flowable)
+            if not parts:
+                if self.frame._atTop:
+                    raise ValueError("Elemen laporan terlalu besar untuk satu halaman.")
+                self.next_page()
+                continue
+            self.frame.add(parts[0], self.canvas, trySplit=1)
+            flowable = parts[1] if len(parts) > 1 else None
+            if flowable is not None:
+                self.next_page()
+
+    def available_height(self):
+        """Sisa tinggi yang masih bisa diisi pada halaman saat ini."""
+        return self.frame._y - self.frame._y1p
+
+    def split(self, flowable):
+        """Memotong flowable sesuai sisa ruang frame saat ini."""
+        return self.frame.split(flowable, self.canvas)
+
+    def next_page(self):
+        self.canvas.showPage()
+        self.pages += 1
+        self._new_frame()
+
+    def save(self):
+        self.canvas.save()
+
+
+def _styles():
+    styles = getSampleStyleSheet()
+    cell_style = ParagraphStyle(name='CellStyle', parent=styles['Normal'], alignment=0, leading=12)
+    header_style = ParagraphStyle(name='HeaderStyle', parent=styles['Normal'], fontName='Helvetica-Bold', textColor=colors.whitesmoke, alignment=0, leading=12)
+    return styles, cell_style, header_style
+
+
+def _history_row(entry, cell_style):
+    gejala_summary = ', '.join(entry['gejala'][:3])
+    if len(entry['gejala']) > 3:
+        gejala_summary += f" (+{len(entry['gejala'])-3} lainnya)"
+    return [
+        Paragraph(escape(entry['tanggal'][:16]), cell_style),
+        Paragraph(escape(entry['diagnosis']), cell_style),
+        Paragraph(f"{entry['tingkat_keyakinan']*100:.1f}%", cell_style),
+        Paragraph(escape(gejala_summary), cell_style)
+    ]
+
+
+def _row_height(cells, bottom_padding=3):
+    """Tinggi baris tabel: sel tertinggi ditambah padding atas/bawah bawaan Table."""
+    return max(cell.wrap(width - 12, 1 << 20)[1] for cell, width in zip(cells, COL_WIDTHS)) + 3 + bottom_padding
+
+
+def _write_history_table(writer, entries, total, cell_style, header_style, progress, cancel_event):
+    """
+    Menulis tabel riwayat per halaman: hanya baris satu halaman yang ada di memori.
+
+    Tinggi setiap baris diukur sekali lalu baris dikumpulkan sampai halaman
+    penuh, sehingga Table tidak perlu memotong dan mengukur ulang sel-selnya.
+    """
+    headers = [Paragraph(h, header_style) for h in ['Tanggal', 'Diagnosis', 'Keyakinan', 'Gejala Utama']]
+    header_height = _row_height(headers, bottom_padding=12)
+    rows, heights, done = [], [], 0
+
+    def flush():
+        table = Table([headers] + rows, colWidths=COL_WIDTHS, rowHeights=[header_height] + heights, repeatRows=1)
+        table.setStyle(TABLE_STYLE)
+        writer.place(table)
+        if progress:
+            progress(done, total)
+        if cancel_event is not None and cancel_event.is_set():
+            raise ReportCancelled()
+
+    available = writer.available_height() - header_height
+    for entry in entries:
+        row = _history_row(entry, cell_style)
+        height = _row_height(row)
+        if height > available and (rows or not writer.frame._atTop):
+            if rows:
+                flush()
+                rows, heights = [], []
+            writer.next_page()
+            available = writer.available_height() - header_height
+        rows.append(row)
+        heights.append(height)
+        available -= height
+        done += 1
+    if rows:
+        flush()
+    return done
+
+
+def _summary_tables(entries, total, cell_style, header_style, progress, cancel_event):
+    """Menghitung jumlah kasus per diagnosis dan per bulan dalam satu lintasan."""
+    per_diagnosis, confidence_sum, per_month = Counter(), Counter(), Counter()
+    done = 0
+    for entry in entries:
+        labels = file_handler.parse_diagnosis_labels(entry['diagnosis']) or [(entry['diagnosis'], 0.0)]
+        for nama, bobot in labels:
+            per_diagnosis[nama] += 1
+            confidence_sum[nama] += bobot
+        per_month[entry['tanggal'][:7]] += 1
+        done += 1
+        if done % 1000 == 0:
+            if progress:
+                progress(done, total)
+            if cancel_event is not None and cancel_event.is_set():
+                raise ReportCancelled()
+
+    def make_table(headers, rows, col_widths):
+        table = Table(
+            [[Paragraph(h, header_style) for h in headers]] + [[Paragraph(escape(str(c)), cell_style) for c in row] for row in rows],
+            colWidths=col_widths, repeatRows=1
+        )
+        table.setStyle(TABLE_STYLE)
+        return table
+
+    diagnosis_rows = [
+        (nama, jumlah, f"{confidence_sum[nama] / jumlah * 100:.1f}%")
+        for nama, jumlah in per_diagnosis.most_common()
+    ]
+    month_rows = sorted(per_month.items(), reverse=True)
+    return done, [
+        make_table(['Diagnosis', 'Jumlah Kasus', 'Rata-rata Keyakinan'], diagnosis_rows, [250, 100, 120]),
+        Spacer(1, 18),
+        make_table(['Bulan', 'Jumlah Diagnosis'], month_rows, [250, 100]),
+    ]
+
+
+def generate_pdf_report(entries, filename, total=None, summary_only=False, progress=None, cancel_event=None):
+    """
+    Membuat laporan PDF riwayat diagnosis.
+
+    Mode lengkap menulis tabel riwayat halaman demi halaman sehingga memori
+    yang dipakai tidak bergantung pada panjang riwayat. Mode ringkasan hanya
+    berisi jumlah kasus per diagnosis dan per bulan. File ditulis ke
+    `<nama>.part` lalu diganti namanya setelah selesai.
+    """
+    styles, cell_style, header_style = _styles()
+    part_file = f"{filename}.part"
+    try:
+        writer = _PageWriter(part_file)
+        writer.place(Paragraph("Ringkasan Riwayat Diagnosis Flu" if summary_only else "Riwayat Diagnosis Flu", styles['Title']))
+        writer.place(Spacer(1, 12))
+        writer.place(Paragraph(f"Diekspor pada: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+        writer.place(Spacer(1, 12))
+        if summary_only:
+            count, flowables = _summary_tables(entries, total, cell_style, header_style, progress, cancel_event)
+            writer.place(Paragraph(f"Total entri: {count}", styles['Normal']))
+            writer.place(Spacer(1, 12))
+            for flowable in flowables:
+                writer.place(flowable)
+        else:
+            count = _write_history_table(writer, entries, total, cell_style, header_style, progress, cancel_event)
+        writer.save()
+        os.replace(part_file, filename)
+    except BaseException:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    if progress:
+        progress(count, total)
+    return count
+
+
+def _iter_chunks(chunks, cancel_event):
+    """Membaca potongan entri dari queue proses induk sampai tanda akhir (None)."""
+    while True:
+        try:
+            chunk = chunks.get(timeout=0.1)
+        except queue.Empty:
+            if cancel_event.is_set():
+                raise ReportCancelled()
+            continue
+        if chunk is None:
+            return
+        yield from chunk
+
+
+def _report_process(chunks, events, cancel_event, filename, total, summary_only):
+    try:
+        count = generate_pdf_report(
+            _iter_chunks(chunks, cancel_event), filename, total, summary_only,
+            lambda done, _total: events.put(('progress', done)), cancel_event
+        )
+        events.put(('done', count))
+    except ReportCancelled:
+        events.put(('cancelled', None))
+    except Exception as e:
+        events.put(('error', str(e)))
+
+
+def generate_in_process(entries, filename, total=None, summary_only=False, progress=None, cancel_event=None, chunk_size=500):
+    """
+    Menjalankan generate_pdf_report di proses terpisah agar tata letak PDF
+    tidak bersaing dengan thread GUI. Entri dikirim per potongan lewat queue
+    berkapasitas tetap, sehingga riwayat tidak pernah disalin seluruhnya.
+    Dipanggil dari thread latar belakang; memunculkan ReportCancelled bila dibatalkan.
+    """
+    chunks = multiprocessing.Queue(maxsize=4)
+    events = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    # Jangan menahan proses induk saat keluar demi potongan yang tidak pernah dibaca
+    chunks.cancel_join_thread()
+    process = multiprocessing.Process(
+        target=_report_process, args=(chunks, events, stop, filename, total, summary_only), daemon=True
+    )
+    process.start()
+    source = iter(entries)
+    chunk = list(islice(source, chunk_size))
+    feeding = True
+    try:
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                stop.set()
+            if feeding and not stop.is_set():
+                try:
+                    chunks.put(chunk or None, timeout=0.1)
+                    feeding = bool(chunk)
+                    chunk = list(islice(source, chunk_size)) if feeding else []
+                except queue.Full:
+                    pass
+            try:
+                kind, value = events.get(timeout=0 if feeding else 0.1)
+            except queue.Empty:
+                if not process.is_alive() and events.empty():
+                    raise RuntimeError("Proses pembuatan PDF berhenti tanpa hasil.")
+                continue
+            if kind == 'progress':
+                if progress:
+                    progress(value, total)
+            elif kind == 'done':
+                return value
+            elif kind == 'cancelled':
+                raise ReportCancelled()
+            else:
+                raise RuntimeError(value)
+    finally:
+        stop.set()
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
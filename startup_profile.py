@@ -0,0 +1,76 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Anggaran waktu (ms) sejak main.py mulai diimpor hingga jendela utama tampil
+ANGGARAN_STARTUP_MS = 1000
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+class StartupTimer:
+    """Mencatat waktu selesainya setiap fase startup aplikasi."""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter()))
+
+    def elapsed_ms(self, phase):
+        """Waktu kumulatif (ms) hingga fase `phase` selesai, atau None bila belum tercatat."""
+        for name, stamp in self.marks:
+            if name == phase:
+                return (stamp - self.start) * 1000
+        return None
+
+    def phases(self):
+        """Daftar (fase, durasi_ms, kumulatif_ms) sesuai urutan pencatatan."""
+        result, previous = [], self.start
+        for name, stamp in self.marks:
+            result.append((name, (stamp - previous) * 1000, (stamp - self.start) * 1000))
+            previous = stamp
+        return result
+
+
+def import_times(module='main', top=10):
+    """
+    Mengimpor `module` di interpreter baru dengan `-X importtime` dan
+    mengembalikan `top` modul dengan waktu impor kumulatif terbesar
+    sebagai daftar (nama, self_ms, kumulatif_ms).
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    rows = []
+    for line in process.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match and match.group(4) != module:
+            rows.append((match.group(4), int(match.group(1)) / 1000, int(match.group(2)) / 1000))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:top]
+
+
+def format_report(timer, imports, budget_ms, budget_phase):
+    """Menyusun laporan startup berupa teks beserta status anggarannya."""
+    lines = ["⏱ LAPORAN STARTUP", "=" * 50]
+    for name, duration, cumulative in timer.phases():
+        lines.append(f"  {name:<28}{duration:>9.1f} ms{cumulative:>10.1f} ms")
+    if imports:
+        lines.append("")
+        lines.append("📦 Impor terlama (-X importtime, kumulatif):")
+        for name, self_ms, cumulative_ms in imports:
+            lines.append(f"  {name:<36}{cumulative_ms:>9.1f} ms (sendiri {self_ms:.1f} ms)")
+    elapsed = timer.elapsed_ms(budget_phase)
+    lines.append("")
+    if elapsed is None:
+        lines.append(f"⚠ Fase '{budget_phase}' tidak tercatat.")
+    elif elapsed > budget_ms:
+        lines.append(f"❌ '{budget_phase}' {elapsed:.1f} ms melebihi anggaran {budget_ms:.0f} ms")
+    else:
+        lines.append(f"✓ '{budget_phase}' {elapsed:.1f} ms (anggaran {budget_ms:.0f} ms)")
+    return "\n".join(lines)
@@ -0,0 +1,336 @@
+import re
+import tkinter as tk
+from array import array
+from bisect import bisect_left
+from tkinter import ttk
+
+# Kategori untuk gejala tanpa field "kategori"
+KATEGORI_BAWAAN = "Gejala Lainnya"
+# Katalog sebesar ini atau lebih kecil ditampilkan dengan semua kategori terbuka
+BATAS_BUKA_OTOMATIS = 40
+# Jeda sebelum tooltip muncul dan sebelum filter diterapkan saat mengetik
+TUNDA_TOOLTIP_MS = 400
+TUNDA_FILTER_MS = 150
+
+_KATA = re.compile(r'\w+')
+
+
+class SymptomSelection:
+    """
+    Model gejala terpilih: satu set id yang dibaca dan diubah langsung oleh
+    panel gejala, tanpa satu variabel Tk per gejala. selected() mengembalikan
+    id dalam urutan katalog.
+    """
+
+    def __init__(self, gejala_list=()):
+        self._selected = set()
+        self._listeners = []
+        self.set_catalogue(gejala_list)
+
+    def set_catalogue(self, gejala_list):
+        """Mengganti katalog; pilihan untuk gejala yang sudah tidak ada dibuang."""
+        self._order = {gejala["id"]: i for i, gejala in enumerate(gejala_list)}
+        self._selected &= self._order.keys()
+        self._notify(None)
+
+    def __contains__(self, gejala_id):
+        return gejala_id in self._selected
+
+    def __len__(self):
+        return len(self._selected)
+
+    def selected(self):
+        return sorted(self._selected, key=self._order.__getitem__)
+
+    def set(self, gejala_id, value):
+        if value:
+            self._selected.add(gejala_id)
+        else:
+            self._selected.discard(gejala_id)
+        self._notify([gejala_id])
+
+    def toggle(self, gejala_id):
+        self.set(gejala_id, gejala_id not in self._selected)
+
+    def clear(self):
+        changed, self._selected = self._selected, set()
+        self._notify(changed)
+
+    def subscribe(self, listener):
+        """`listener(changed)` dipanggil setiap kali pilihan berubah; `changed` berisi id yang berubah, atau None bila katalog diganti."""
+        self._listeners.append(listener)
+
+    def _notify(self, changed):
+        for listener in self._listeners:
+            listener(changed)
+
+
+class SymptomNameIndex:
+    """
+    Indeks kata nama gejala (dan id-nya) untuk pencarian sambil mengetik.
+
+    Setiap kata disimpan terurut bersama nomor gejalanya, sehingga satu kata
+    kueri dicocokkan sebagai awalan dengan pencarian biner. Semua kata kueri
+    harus cocok, mis. "nyer ot" menemukan "Nyeri Otot".
+    """
+
+    def __init__(self, gejala_list):
+        tokens = sorted(
+            (word, i) for i, gejala in enumerate(gejala_list)
+            for word in set(_KATA.findall(f"{gejala['nama']} {gejala['id'].replace('_', ' ')}".lower()))
+        )
+        self._words = [word for word, _ in tokens]
+        self._positions = array('l', (i for _, i in tokens))
+
+    def search(self, query):
+        """Nomor gejala (urutan katalog) yang cocok dengan `query`, atau None bila kueri kosong."""
+        words = _KATA.findall(query.lower())
+        if not words:
+            return None
+        matches = None
+        for word in words:
+            lo = bisect_left(self._words, word)
+            hi = bisect_left(self._words, word + '\uffff')
+            found = set(self._positions[lo:hi])
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        return sorted(matches)
+
+
+class Tooltip:
+    """Satu jendela tooltip yang dipakai ulang oleh semua widget; hanya disembunyikan, tidak pernah dihancurkan."""
+
+    def __init__(self, root):
+        self.root = root
+        self.window = None
+        self.label = None
+        self._job = None
+
+    def _ensure_window(self):
+        if self.window is None:
+            self.window = tk.Toplevel(self.root)
+            self.window.wm_overrideredirect(True)
+            self.window.withdraw()
+            self.label = tk.Label(self.window, background="#FFFACD", relief="solid", borderwidth=1,
+                                  font=("Arial", 9), padx=5, pady=3, justify='left', wraplength=320)
+            self.label.pack()
+
+    def schedule(self, text, x, y):
+        self.hide()
+        self._job = self.root.after(TUNDA_TOOLTIP_MS, self.show, text, x, y)
+
+    def show(self, text, x, y):
+        self._job = None
+        self._ensure_window()
+        self.label.config(text=text)
+        self.window.wm_geometry(f"+{x}+{y}")
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self):
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+        if self.window is not None:
+            self.window.withdraw()
+
+
+class SymptomPicker(ttk.Frame):
+    """
+    Panel pemilihan gejala berbasis satu Treeview.
+
+    Kategori diambil dari data (urutan kemunculan pertama di katalog). Item
+    gejala baru dibuat saat kategorinya dibuka atau saat cocok dengan kueri
+    pencarian, sehingga katalog ratusan gejala tidak membuat ratusan widget.
+    Klik atau spasi mencentang gejala; status centang disimpan di
+    SymptomSelection.
+    """
+
+    def __init__(self, parent, gejala_list, selection, tooltip):
+        super().__init__(parent)
+        self.selection = selection
+        self.tooltip = tooltip
+        self._hover = None
+        self._filter_job = None
+
+        search_frame = ttk.Frame(self)
+        search_frame.pack(fill='x', padx=5, pady=(5, 0))
+        ttk.Label(search_frame, text="🔎 Cari gejala:").pack(side='left', padx=5)
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=30)
+        self.search_entry.pack(side='left', padx=5)
+        self.count_label = ttk.Label(search_frame, text="", font=("Arial", 9))
+        self.count_label.pack(side='right', padx=5)
+
+        tree_frame = ttk.Frame(self)
+        tree_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        self.tree = ttk.Treeview(tree_frame, show='tree', selectmode='browse', height=12)
+        scrollbar = ttk.Scrollbar(tree_frame, orient='vertical', command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+
+        self.search_var.trace('w', self._schedule_filter)
+        self.search_entry.bind('<Return>', self._toggle_first_match)
+        self.search_entry.bind('<Down>', self._focus_tree)
+        self.tree.bind('<<TreeviewOpen>>', self._on_open)
+        self.tree.bind('<Button-1>', self._on_click)
+        self.tree.bind('<space>', self._on_space)
+        self.tree.bind('<Motion>', self._on_motion)
+        self.tree.bind('<Leave>', lambda e: self._hide_tooltip())
+        selection.subscribe(self._on_selection_changed)
+        self.set_catalogue(gejala_list)
+
+    def set_catalogue(self, gejala_list):
+        """Mengganti katalog gejala (mis. setelah basis pengetahuan dimuat ulang)."""
+        self.gejala_list = list(gejala_list)
+        self.by_id = {gejala["id"]: gejala for gejala in self.gejala_list}
+        self.categories = {}
+        for i, gejala in enumerate(self.gejala_list):
+            self.categories.setdefault(self._kategori(gejala), []).append(i)
+        self.name_index = SymptomNameIndex(self.gejala_list)
+        self.selection.set_catalogue(self.gejala_list)
+        self._render()
+
+    @staticmethod
+    def _kategori(gejala):
+        return gejala.get("kategori") or KATEGORI_BAWAAN
+
+    @staticmethod
+    def _category_iid(kategori):
+        return f"k:{kategori}"
+
+    @staticmethod
+    def _symptom_iid(gejala_id):
+        return f"g:{gejala_id}"
+
+    def _symptom_text(self, gejala):
+        return f"{'☑' if gejala['id'] in self.selection else '☐'} {gejala['nama']}"
+
+    def _category_text(self, kategori, positions):
+        chosen = sum(1 for i in positions if self.gejala_list[i]["id"] in self.selection)
+        return f"📌 {kategori} ({chosen}/{len(positions)})"
+
+    def _render(self):
+        """Menyusun ulang pohon: semua kategori, dengan item gejala hanya untuk kategori terbuka atau hasil pencarian."""
+        self._hide_tooltip()
+        self.tree.delete(*self.tree.get_children())
+        matches = self.name_index.search(self.search_var.get())
+        if matches is not None:
+            matched = set(matches)
+        expand = matches is not None or len(self.gejala_list) <= BATAS_BUKA_OTOMATIS
+        for kategori, positions in self.categories.items():
+            if matches is not None:
+                positions_shown = [i for i in positions if i in matched]
+                if not positions_shown:
+                    continue
+            else:
+                positions_shown = positions
+            iid = self._category_iid(kategori)
+            self.tree.insert('', 'end', iid=iid, text=self._category_text(kategori, positions), open=expand)
+            if expand:
+                self._insert_symptoms(iid, positions_shown)
+            else:
+                # Anak sementara agar tanda buka tampil; item sebenarnya dibuat saat kategori dibuka
+                self.tree.insert(iid, 'end', iid=f"{iid}:memuat", text="⏳")
+        self._update_count()
+
+    def _insert_symptoms(self, parent, positions):
+        for i in positions:
+            gejala = self.gejala_list[i]
+            self.tree.insert(parent, 'end', iid=self._symptom_iid(gejala["id"]), text=self._symptom_text(gejala))
+
+    def _on_open(self, event):
+        parent = self.tree.focus()
+        placeholder = f"{parent}:memuat"
+        if parent.startswith("k:") and self.tree.exists(placeholder):
+            self.tree.delete(placeholder)
+            self._insert_symptoms(parent, self.categories[parent[2:]])
+
+    def _gejala_for(self, iid):
+        return self.by_id.get(iid[2:]) if iid.startswith("g:") else None
+
+    def _on_click(self, event):
+        # Klik pada tanda buka/tutup kategori ditangani Treeview sendiri
+        if self.tree.identify_element(event.x, event.y).endswith('indicator'):
+            return None
+        gejala = self._gejala_for(self.tree.identify_row(event.y))
+        if gejala is None:
+            return None
+        self.tree.focus(self._symptom_iid(gejala["id"]))
+        self.tree.selection_set(self._symptom_iid(gejala["id"]))
+        self.selection.toggle(gejala["id"])
+        return 'break'
+
+    def _on_space(self, event):
+        gejala = self._gejala_for(self.tree.focus())
+        if gejala is not None:
+            self.selection.toggle(gejala["id"])
+        return 'break'
+
+    def _on_selection_changed(self, changed):
+        if changed is None:
+            # Katalog diganti: set_catalogue menyusun ulang pohon sendiri
+            return
+        # Hanya item gejala yang berubah (bila sudah dibuat) dan kategorinya yang diperbarui
+        kategori_changed = set()
+        for gejala_id in changed:
+            gejala = self.by_id.get(gejala_id)
+            if gejala is None:
+                continue
+            kategori_changed.add(self._kategori(gejala))
+            iid = self._symptom_iid(gejala_id)
+            if self.tree.exists(iid):
+                self.tree.item(iid, text=self._symptom_text(gejala))
+        for kategori in kategori_changed:
+            iid = self._category_iid(kategori)
+            if self.tree.exists(iid):
+                self.tree.item(iid, text=self._category_text(kategori, self.categories[kategori]))
+        self._update_count()
+
+    def _update_count(self):
+        self.count_label.config(text=f"{len(self.selection)} dari {len(self.gejala_list)} gejala dipilih")
+
+    def _schedule_filter(self, *args):
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(TUNDA_FILTER_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        self._render()
+
+    def _toggle_first_match(self, event):
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+            self._apply_filter()
+        matches = self.name_index.search(self.search_var.get())
+        if matches:
+            self.selection.toggle(self.gejala_list[matches[0]]["id"])
+        return 'break'
+
+    def _focus_tree(self, event):
+        for category in self.tree.get_children():
+            children = self.tree.get_children(category)
+            if children and self._gejala_for(children[0]) is not None:
+                self.tree.focus_set()
+                self.tree.focus(children[0])
+                self.tree.selection_set(children[0])
+                break
+        return 'break'
+
+    def _on_motion(self, event):
+        row = self.tree.identify_row(event.y)
+        if row == self._hover:
+            return
+        self._hover = row
+        gejala = self._gejala_for(row)
+        if gejala is None:
+            self.tooltip.hide()
+        else:
+            self.tooltip.schedule(gejala.get("deskripsi", "Tidak ada deskripsi"), event.x_root + 15, event.y_root + 10)
+
+    def _hide_tooltip(self):
+        self._hover = None
+        self.tooltip.hide()
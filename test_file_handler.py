@@ -0,0 +1,78 @@
+import multiprocessing
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import file_handler
+
+
+def _make_ids(count):
+    return [file_handler.new_entry_id() for _ in range(count)]
+
+
+class FrozenClock:
+    """Jam palsu: waktu hanya maju saat time.sleep dipanggil."""
+
+    def __init__(self, start=1767225600.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += 0.001
+
+
+class NewEntryIdTest(unittest.TestCase):
+    def setUp(self):
+        file_handler._reset_entry_ids()
+
+    def tearDown(self):
+        file_handler._reset_entry_ids()
+
+    def test_ids_increase_within_process(self):
+        ids = _make_ids(5000)
+        self.assertEqual(ids, sorted(set(ids)))
+
+    def test_sequence_exhaustion_waits_for_next_millisecond(self):
+        clock = FrozenClock()
+        with mock.patch.object(file_handler.time, 'time', clock.time), \
+                mock.patch.object(file_handler.time, 'sleep', clock.sleep):
+            ids = _make_ids(3000)
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertGreater(clock.now, FrozenClock().now)
+
+    def test_same_millisecond_different_nodes(self):
+        # Dua proses dengan pid yang sama di byte bawahnya, pada milidetik yang sama
+        clock = FrozenClock()
+        ids = set()
+        with mock.patch.object(file_handler.time, 'time', clock.time), \
+                mock.patch.object(file_handler.time, 'sleep', clock.sleep):
+            for node in (0x101, 0x201):
+                file_handler._reset_entry_ids()
+                file_handler.set_entry_node(node)
+                clock.now = FrozenClock().now
+                ids.update(_make_ids(300))
+        self.assertEqual(len(ids), 600)
+
+    def test_unique_across_pool_workers(self):
+        counter = multiprocessing.Value('i', file_handler.entry_node())
+        with ProcessPoolExecutor(4, initializer=file_handler.assign_worker_node, initargs=(counter,)) as pool:
+            batches = list(pool.map(_make_ids, [2000] * 16))
+        ids = [entry_id for batch in batches for entry_id in batch]
+        self.assertEqual(len(ids), len(set(ids)))
+
+    @unittest.skipUnless(hasattr(file_handler.os, 'register_at_fork'), "fork tidak tersedia")
+    def test_forked_children_do_not_reuse_parent_node(self):
+        file_handler.set_entry_node(7)
+        with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context('fork')) as pool:
+            inherited = list(pool.map(_child_node_inherited, range(4)))
+        self.assertEqual(inherited, [False] * 4)
+
+
+def _child_node_inherited(_):
+    return file_handler._id_node is not None
+
+
+if __name__ == "__main__":
+    unittest.main()
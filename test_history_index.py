@@ -0,0 +1,72 @@
+import unittest
+
+from history_index import HistoryIndex
+
+
+def _entry(entry_id, tanggal, diagnosis="Flu Biasa (60.0%)", gejala=("Demam", "Batuk")):
+    return {"id": entry_id, "tanggal": tanggal, "gejala": list(gejala), "diagnosis": diagnosis,
+            "tingkat_keyakinan": 0.6, "rekomendasi": ["Istirahat"]}
+
+
+class HistoryIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.entries = [
+            _entry(1, "2025-01-05 08:00:00"),
+            _entry(2, "2025-02-10 09:00:00", "Flu Berat (85.0%)", ("Nyeri Otot", "Lemas")),
+            _entry(3, "2025-02-11 10:00:00", "Alergi (70.0%)", ("Bersin", "Pilek")),
+            _entry(4, "2025-03-01 11:00:00"),
+        ]
+        # Urutan aplikasi: terbaru di depan
+        self.index = HistoryIndex(reversed(self.entries))
+
+    def ids(self, results):
+        return [entry["id"] for entry in results]
+
+    def test_search_filters(self):
+        self.assertEqual(self.ids(self.index.search()), [4, 3, 2, 1])
+        self.assertEqual(self.ids(self.index.search("flu")), [4, 2, 1])
+        self.assertEqual(self.ids(self.index.search("lemas")), [2])
+        self.assertEqual(self.ids(self.index.search(month="02")), [3, 2])
+        self.assertEqual(self.ids(self.index.search(date_from="2025-02-11", date_to="2025-03")), [4, 3])
+        self.assertEqual(self.ids(self.index.search("flu", month="02")), [2])
+        self.assertEqual(self.ids(self.index.search("tidak ada")), [])
+
+    def test_get_and_remove(self):
+        self.assertEqual(self.index.get(3)["diagnosis"], "Alergi (70.0%)")
+        self.assertEqual(self.index.remove(3)["id"], 3)
+        self.assertIsNone(self.index.get(3))
+        self.assertIsNone(self.index.remove(3))
+        self.assertEqual(len(self.index), 3)
+        results = self.index.search()
+        self.assertEqual(self.ids(results), [4, 2, 1])
+        self.assertEqual([results[i]["id"] for i in range(len(results))], [4, 2, 1])
+        self.assertEqual(results[-1]["id"], 1)
+        self.assertEqual(self.ids(self.index.search(month="02")), [2])
+
+    def test_add_after_search_keeps_snapshot(self):
+        self.index.remove(2)
+        results = self.index.search()
+        filtered = self.index.search("flu")
+        self.index.add(_entry(5, "2025-03-02 12:00:00"))
+        # Hasil yang sudah dibuat tetap berisi entri saat pencarian dilakukan
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.ids(results), [4, 3, 1])
+        self.assertEqual([results[i]["id"] for i in range(len(results))], [4, 3, 1])
+        self.assertEqual(self.ids(filtered), [4, 1])
+        self.assertEqual(self.ids(self.index.search()), [5, 4, 3, 1])
+        self.assertEqual(self.ids(self.index.search("flu")), [5, 4, 1])
+
+    def test_many_removals_match_linear_filter(self):
+        entries = [_entry(i, f"2025-04-{i % 28 + 1:02d} 10:00:00") for i in range(1, 301)]
+        index = HistoryIndex(reversed(entries))
+        alive = [entry["id"] for entry in reversed(entries)]
+        for entry_id in range(7, 301, 7):
+            index.remove(entry_id)
+            alive.remove(entry_id)
+        results = index.search()
+        self.assertEqual(self.ids(results), alive)
+        self.assertEqual([results[i]["id"] for i in range(len(results))], alive)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import history_store
+
+
+def _entry(entry_id, tanggal="2025-01-01 10:00:00", diagnosis="Flu Biasa (60.0%)"):
+    return {"id": entry_id, "tanggal": tanggal, "gejala": ["Demam"], "diagnosis": diagnosis,
+            "tingkat_keyakinan": 0.6, "rekomendasi": ["Istirahat"]}
+
+
+class StoreRoundTripMixin:
+    extension = None
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, f"riwayat{self.extension}")
+        self.store = history_store.open_history_store(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self._dir.cleanup()
+
+    def reopen(self):
+        self.store.close()
+        self.store = history_store.open_history_store(self.path)
+
+    def ids(self):
+        return [entry["id"] for entry in self.store.iter_entries()]
+
+    def test_append_and_reload_newest_first(self):
+        self.store.append(_entry(1))
+        self.store.append_many([_entry(2), _entry(3, diagnosis="Alergi (70.0%)")])
+        self.reopen()
+        self.assertEqual(self.ids(), [3, 2, 1])
+        self.assertEqual(self.store.load()[0], _entry(3, diagnosis="Alergi (70.0%)"))
+
+    def test_delete_and_clear(self):
+        self.store.append_many([_entry(1), _entry(2), _entry(3)])
+        self.store.delete([2])
+        self.reopen()
+        self.assertEqual(self.ids(), [3, 1])
+        self.store.clear()
+        self.assertEqual(self.ids(), [])
+
+    def test_read_appended_from_watermark(self):
+        entries, watermark = self.store.read_appended(None)
+        self.assertEqual(entries, [])
+        self.store.append_many([_entry(1), _entry(2)])
+        entries, watermark = self.store.read_appended(watermark)
+        self.assertEqual([entry["id"] for entry in entries], [1, 2])
+        self.store.append(_entry(3))
+        entries, watermark = self.store.read_appended(watermark)
+        self.assertEqual([entry["id"] for entry in entries], [3])
+        self.assertEqual(self.store.read_appended(watermark), ([], watermark))
+
+
+class JsonlStoreTest(StoreRoundTripMixin, unittest.TestCase):
+    extension = ".jsonl"
+
+    def lines(self):
+        with open(self.path, 'r', encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def test_delete_appends_tombstone(self):
+        self.store.append_many([_entry(1), _entry(2)])
+        self.store.delete([1])
+        self.assertEqual(self.lines()[-1], {"hapus": 1})
+        self.assertEqual(self.ids(), [2])
+
+    def test_read_appended_drops_tombstoned_entries(self):
+        _, watermark = self.store.read_appended(None)
+        self.store.append_many([_entry(1), _entry(2)])
+        self.store.delete([1])
+        entries, _ = self.store.read_appended(watermark)
+        self.assertEqual([entry["id"] for entry in entries], [2])
+
+    def test_read_appended_rejects_stale_watermark(self):
+        self.store.append_many([_entry(1), _entry(2)])
+        watermark = self.store.watermark()
+        self.store.clear()
+        with self.assertRaises(ValueError):
+            self.store.read_appended(watermark)
+
+    def test_torn_tail_is_truncated_on_open(self):
+        self.store.append(_entry(1))
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write('{"id": 2, "tanggal": "2025')
+        self.reopen()
+        self.assertEqual(self.ids(), [1])
+        self.store.append(_entry(3))
+        self.assertEqual(self.ids(), [3, 1])
+
+    def test_legacy_entries_get_ids_once(self):
+        legacy = [{k: v for k, v in _entry(0).items() if k != "id"} for _ in range(2)]
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(entry) + '\n' for entry in legacy)
+        self.reopen()
+        self.assertEqual(self.ids(), [-2, -1])
+        with mock.patch.object(history_store, '_atomic_write') as rewrite:
+            self.reopen()
+        rewrite.assert_not_called()
+
+    def test_tombstone_first_line_is_not_rewritten(self):
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({"hapus": 9}) + '\n' + json.dumps(_entry(1)) + '\n')
+        with mock.patch.object(history_store, '_atomic_write') as rewrite:
+            self.reopen()
+        rewrite.assert_not_called()
+        self.assertEqual(self.ids(), [1])
+
+    def test_legacy_upgrade_skips_tombstones(self):
+        legacy = {k: v for k, v in _entry(0).items() if k != "id"}
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({"hapus": 9}) + '\n' + json.dumps(legacy) + '\n')
+        self.reopen()
+        self.assertEqual(self.lines(), [{"hapus": 9}, dict(legacy, id=-1)])
+
+
+class SqliteStoreTest(StoreRoundTripMixin, unittest.TestCase):
+    extension = ".db"
+
+
+class JsonStoreTest(StoreRoundTripMixin, unittest.TestCase):
+    extension = ".json"
+
+
+class MigrationTest(unittest.TestCase):
+    def test_interrupted_migration_is_not_duplicated(self):
+        with tempfile.TemporaryDirectory() as directory:
+            legacy_file = os.path.join(directory, "riwayat_diagnosis.json")
+            legacy = [{k: v for k, v in _entry(0, f"2025-01-0{day} 10:00:00").items() if k != "id"}
+                      for day in (3, 2, 1)]
+            with open(legacy_file, 'w', encoding='utf-8') as file:
+                json.dump(legacy, file)
+            path = os.path.join(directory, "riwayat.jsonl")
+            real_replace = os.replace
+
+            def crash(src, dst):
+                if src == legacy_file:
+                    raise KeyboardInterrupt
+                return real_replace(src, dst)
+
+            with mock.patch.object(history_store.os, 'replace', crash):
+                with self.assertRaises(KeyboardInterrupt):
+                    history_store.open_history_store(path, legacy_file)
+            store = history_store.open_history_store(path, legacy_file)
+            self.assertEqual([entry["tanggal"][:10] for entry in store.iter_entries()],
+                             ["2025-01-03", "2025-01-02", "2025-01-01"])
+            self.assertTrue(os.path.exists(f"{legacy_file}.migrated"))
+            store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import contextlib
+import io
+import itertools
+import json
+import os
+import tempfile
+import unittest
+
+import knowledge_base
+from bitset_engine import compile_rules
+from inference_engine import InferenceEngine
+from knowledge_base import KnowledgeBaseError, compile_knowledge_base
+
+KB_FILE = "gejala_penyakit.json"
+
+
+def _kb_data():
+    with open(KB_FILE, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _compile(data):
+    return compile_knowledge_base(json.dumps(data).encode('utf-8'))
+
+
+class StructureTest(unittest.TestCase):
+    def assertStructureError(self, data, fragment):
+        with self.assertRaises(KnowledgeBaseError) as caught:
+            _compile(data)
+        self.assertIn(fragment, str(caught.exception))
+
+    def test_non_string_condition_is_a_structural_error(self):
+        for bad in (["demam"], {"id": "demam"}, 3, None):
+            data = _kb_data()
+            data["aturan"][1]["conditions"].append(bad)
+            self.assertStructureError(data, "rule 2")
+
+    def test_other_structural_errors(self):
+        data = _kb_data()
+        data["aturan"][0]["conclusion"] = ["kemungkinan_flu"]
+        self.assertStructureError(data, "rule 1")
+        data = _kb_data()
+        data["aturan"][2]["bobot"] = 1.5
+        self.assertStructureError(data, "rule 3")
+        data = _kb_data()
+        data["gejala"].append(dict(data["gejala"][0]))
+        self.assertStructureError(data, "muncul lebih dari sekali")
+
+    def test_load_reports_structural_error_instead_of_crashing(self):
+        data = _kb_data()
+        data["aturan"][0]["conditions"] = [{"id": "demam"}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "kb.json")
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                self.assertIsNone(knowledge_base.load_knowledge_base(path, headless=True))
+        self.assertIn("rule 1", stderr.getvalue())
+
+
+class ValidationTest(unittest.TestCase):
+    def kinds(self, kb):
+        return sorted({issue.kind for issue in kb.issues})
+
+    def test_shipped_knowledge_base_is_clean(self):
+        self.assertEqual(_compile(_kb_data()).issues, [])
+
+    def test_unknown_symbol_with_suggestion(self):
+        data = _kb_data()
+        data["aturan"][0]["conditions"].append("mengigil")
+        kb = _compile(data)
+        self.assertIn("simbol", self.kinds(kb))
+        self.assertIn("tak_terjangkau", self.kinds(kb))
+        self.assertTrue(any("'menggigil'" in str(issue) for issue in kb.issues))
+
+    def test_cycle_and_unused_solution(self):
+        data = _kb_data()
+        data["aturan"] += [
+            {"conditions": ["demam", "gejala_a"], "conclusion": "gejala_b"},
+            {"conditions": ["gejala_b"], "conclusion": "gejala_a"},
+        ]
+        data["solusi"]["saran_tidak_dipakai"] = "Tidak pernah disimpulkan"
+        kb = _compile(data)
+        self.assertEqual(self.kinds(kb), ["siklus", "solusi", "tak_terjangkau"])
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "kb.json")
+        data = _kb_data()
+        data["aturan"][0]["conditions"].append("mengigil")
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(data, file)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def load(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            kb = knowledge_base.load_knowledge_base(self.path, headless=True)
+        return kb, stderr.getvalue()
+
+    def test_warm_start_matches_cold_compile_and_reports_issues(self):
+        cold, cold_log = self.load()
+        warm, warm_log = self.load()
+        self.assertIn("mengigil", cold_log)
+        self.assertIn("mengigil", warm_log)
+        self.assertEqual(list(warm.rules), list(cold.rules))
+        self.assertEqual([str(issue) for issue in warm.issues], [str(issue) for issue in cold.issues])
+        gejala = ["nyeri_otot", "sakit_kepala", "lemas"]
+        self.assertEqual(warm.engine.diagnose(gejala).diagnosis_str, cold.engine.diagnose(gejala).diagnosis_str)
+
+    def test_cache_is_plain_json_and_tampering_recompiles(self):
+        self.load()
+        cache_dir = os.path.join(self._dir.name, knowledge_base.DIREKTORI_CACHE)
+        (name,) = os.listdir(cache_dir)
+        cache_path = os.path.join(cache_dir, name)
+        with open(cache_path, 'r', encoding='utf-8') as file:
+            self.assertEqual(json.load(file)["versi"], knowledge_base.VERSI_CACHE)
+        with open(cache_path, 'w', encoding='utf-8') as file:
+            file.write('{"versi": 2, "digest": "')
+        kb, _ = self.load()
+        self.assertEqual(len(kb.rules), len(_kb_data()["aturan"]))
+
+
+class EngineAgreementTest(unittest.TestCase):
+    def test_all_engines_agree_on_every_symptom_combination(self):
+        data = _kb_data()
+        kb = _compile(data)
+        plain = InferenceEngine(data["aturan"], data["solusi"])
+        bitset = compile_rules(data["gejala"], data["aturan"], data["solusi"])
+        combos = [set(combo) for n in range(len(kb.gejala_ids) + 1)
+                  for combo in itertools.combinations(kb.gejala_ids, n)]
+        batch = bitset.diagnose_batch(bitset.encode_rows(combos))
+        for gejala, from_bitset in zip(combos, batch):
+            expected = plain.diagnose(gejala)
+            compiled = kb.engine.diagnose(gejala)
+            for result in (compiled, from_bitset):
+                self.assertEqual(result.diagnosis_str, expected.diagnosis_str, gejala)
+                self.assertEqual(result.recommendations, expected.recommendations, gejala)
+                self.assertEqual(result.iterations, expected.iterations, gejala)
+            self.assertEqual(compiled.fired, expected.fired, gejala)
+
+    def test_goal_query_agrees_with_full_diagnosis(self):
+        kb = _compile(_kb_data())
+        goals = sorted({rule["conclusion"] for rule in kb.rules})
+        for n in range(4):
+            for gejala in itertools.combinations(kb.gejala_ids, n):
+                facts = kb.engine.diagnose(gejala).facts
+                results = kb.engine.query_many(goals, set(gejala))
+                self.assertEqual({goal for goal, result in results.items() if result.supported},
+                                 {goal for goal in goals if goal in facts}, gejala)
+
+
+if __name__ == "__main__":
+    unittest.main()
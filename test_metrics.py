@@ -0,0 +1,61 @@
+import itertools
+import unittest
+
+import knowledge_base
+from diagnosis_cache import DiagnosisCache
+from metrics import Metrics
+
+KB_FILE = "gejala_penyakit.json"
+
+
+class DiagnosisMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.kb = knowledge_base.load_knowledge_base(KB_FILE, headless=True, use_cache=False)
+        self.metrics = Metrics(self.kb.rules)
+
+    def _cache(self, precompute):
+        return DiagnosisCache(KB_FILE, self.kb.engine, self.kb.gejala_ids, precompute=precompute,
+                              kb_hash=self.kb.digest, auto_reload=False, metrics=self.metrics)
+
+    def test_precomputed_cache_records_rule_activity(self):
+        # Seperti GUI: tabel kebenaran penuh, jadi setiap diagnosis dijawab dari cache
+        cache = self._cache(precompute=True)
+        gejala = ["nyeri_otot", "sakit_kepala", "lemas"]
+        for _ in range(3):
+            cache.diagnose(gejala)
+        snapshot = self.metrics.snapshot()
+        counters = snapshot["penghitung"]
+        self.assertEqual(counters["diagnosis"], 3)
+        self.assertEqual(counters["diagnosis_cache_hit"], 3)
+        self.assertGreater(counters["iterasi"], 0)
+        self.assertGreater(counters["pemeriksaan_kondisi"], 0)
+        self.assertEqual(snapshot["histogram"]["cache_hit"]["jumlah"], 3)
+        self.assertNotIn("inferensi", snapshot["histogram"])
+        fired = [rule["rule"] for rule in snapshot["aturan"] if rule["penembakan"]]
+        self.assertTrue(fired)
+        self.assertTrue(all(rule["penembakan"] % 3 == 0 for rule in snapshot["aturan"]))
+        for rule in fired:
+            self.assertNotIn(rule, snapshot["tidak_pernah_ditembakkan"])
+
+    def test_hits_and_misses_count_the_same_activity(self):
+        cache = self._cache(precompute=False)
+        combos = list(itertools.combinations(self.kb.gejala_ids, 3))[:40]
+        for gejala in combos + combos:
+            cache.diagnose(gejala)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["penghitung"]["diagnosis_cache_hit"], len(combos))
+        self.assertEqual(snapshot["histogram"]["inferensi"]["jumlah"], len(combos))
+        self.assertEqual(snapshot["histogram"]["cache_hit"]["jumlah"], len(combos))
+        self.assertTrue(all(rule["penembakan"] % 2 == 0 and rule["evaluasi"] % 2 == 0
+                            for rule in snapshot["aturan"]))
+
+    def test_evaluations_include_rules_that_did_not_fire(self):
+        cache = self._cache(precompute=False)
+        # Satu gejala saja tidak memenuhi aturan apa pun, tetapi aturan yang memakainya tetap diperiksa
+        cache.diagnose(["demam"])
+        aturan = self.metrics.snapshot()["aturan"]
+        self.assertTrue(any(rule["evaluasi"] and not rule["penembakan"] for rule in aturan))
+
+
+if __name__ == "__main__":
+    unittest.main()